@@ -0,0 +1,413 @@
+import argparse
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+
+import numpy as np
+from mysql.connector import Error
+
+from query_metrics import track_operation
+from sales_rollup import month_start, next_month
+
+
+# ========================= 월별 거래 보관 파일 =========================
+PAYMENT_METHODS = ('Cash', 'Card', 'Mobile Payment')  # payment_method ENUM 순서 (보관 파일에는 번호로 저장)
+FETCH_SIZE = 50000  # 보관할 거래를 읽을 때 한 번에 가져오는 행 수
+NULL_ID = -1  # NULL 컬럼(직원 ID, 단가)을 정수 배열에 저장할 때 쓰는 값
+
+HEADER_COLUMNS = ('transaction_id', 'transaction_date', 'store_id', 'employee_id', 'total_amount',
+                  'payment_method', 'journal_id')
+DETAIL_COLUMNS = ('detail_id', 'detail_transaction_id', 'product_id', 'quantity', 'unit_price', 'subtotal')
+
+
+def _month_key(month):
+    return f"{month:%Y-%m}"
+
+
+def _header_arrays(rows):
+    """ 거래 헤더 행 목록 → 컬럼별 배열 """
+    ids, dates, stores, employees, totals, methods, journals = zip(*rows) if rows else ((),) * 7
+    return {
+        'transaction_id': np.array(ids, dtype=np.int64),
+        'transaction_date': np.array(dates, dtype='datetime64[s]'),
+        'store_id': np.array(stores, dtype=np.int64),
+        'employee_id': np.array([NULL_ID if value is None else value for value in employees], dtype=np.int64),
+        'total_amount': np.array(totals, dtype=np.int64),
+        'payment_method': np.array([PAYMENT_METHODS.index(value) for value in methods], dtype=np.int8),
+        'journal_id': np.array([(value or '').encode('ascii') for value in journals], dtype='S32'),
+    }
+
+
+def _detail_arrays(rows):
+    """ 거래 상세 행 목록 → 컬럼별 배열 """
+    ids, transaction_ids, products, quantities, prices, subtotals = zip(*rows) if rows else ((),) * 6
+    return {
+        'detail_id': np.array(ids, dtype=np.int64),
+        'detail_transaction_id': np.array(transaction_ids, dtype=np.int64),
+        'product_id': np.array(products, dtype=np.int64),
+        'quantity': np.array(quantities, dtype=np.int64),
+        'unit_price': np.array([NULL_ID if value is None else value for value in prices], dtype=np.int64),
+        'subtotal': np.array(subtotals, dtype=np.int64),
+    }
+
+
+def _merge(new, old, key, columns):
+    """ 같은 키가 있으면 new 쪽 행을 남기고 합친 뒤 키 순서로 정렬 """
+    merged = {column: np.concatenate([new[column], old[column]]) for column in columns}
+    _, first = np.unique(merged[key], return_index=True)  # 정렬된 키 순서의 첫 위치 (new 가 앞)
+    return {column: values[first] for column, values in merged.items()}
+
+
+def _read_month(pool, month):
+    """ 한 달치 거래 헤더/상세를 같은 스냅샷에서 읽어 컬럼별 배열로 반환 """
+    start, end = month_start(month), next_month(month_start(month))
+    headers, details = [], []
+    with pool.connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                # 같은 트랜잭션(REPEATABLE READ)의 두 조회는 같은 스냅샷을 보므로 헤더와 상세가 어긋나지 않음
+                query = """
+                    SELECT transaction_id, transaction_date, store_id, employee_id, total_amount, payment_method, journal_id
+                    FROM transaction
+                    WHERE transaction_date >= %s AND transaction_date < %s
+                    ORDER BY transaction_id
+                """
+                cursor.execute(query, (start, end))
+                while True:
+                    rows = cursor.fetchmany(FETCH_SIZE)
+                    if not rows:
+                        break
+                    headers.extend(rows)
+
+                query = """
+                    SELECT td.transaction_detail_id, td.transaction_id, td.product_id, td.quantity, td.unit_price, td.subtotal
+                    FROM transaction t
+                    JOIN transaction_details td ON t.transaction_id = td.transaction_id
+                    WHERE t.transaction_date >= %s AND t.transaction_date < %s
+                    ORDER BY td.transaction_id, td.transaction_detail_id
+                """
+                cursor.execute(query, (start, end))
+                while True:
+                    rows = cursor.fetchmany(FETCH_SIZE)
+                    if not rows:
+                        break
+                    details.extend(rows)
+            conn.commit()
+        except Error:
+            conn.rollback()
+            raise
+    return _header_arrays(headers), _detail_arrays(details)
+
+
+def _delete_transactions(pool, transaction_ids, batch_size):
+    """ 보관한 거래를 ID 목록으로 배치마다 삭제 (상세는 FK ON DELETE CASCADE) """
+    deleted = 0
+    for offset in range(0, len(transaction_ids), batch_size):
+        batch = transaction_ids[offset:offset + batch_size]
+        placeholders = ", ".join(["%s"] * len(batch))
+        with pool.connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(f"DELETE FROM transaction WHERE transaction_id IN ({placeholders})", batch)
+                    deleted += cursor.rowcount
+                conn.commit()
+            except Error:
+                conn.rollback()
+                raise
+    return deleted
+
+
+@track_operation()
+def archive_month(pool, archive, month, batch_size=1000):
+    """ 한 달치 거래를 보관 파일로 옮기고 운영 테이블에서 삭제 (재실행해도 안전)
+
+    - 이미 보관 파일이 있으면 늦게 들어온 거래(저널 반영 등)를 합쳐 다시 씀
+    - 파일을 다 쓰고 다시 읽어 확인한 뒤에만 삭제하며, 읽은 거래 ID 만 지우므로 그 사이 등록된 거래는 남음
+    반환값: (옮긴 거래 수, 옮긴 상세 행 수)
+    """
+    month = month_start(month)
+    headers, details = _read_month(pool, month)
+    if not len(headers['transaction_id']):
+        return 0, 0
+
+    archive.write(month, headers, details)
+    stored = archive.load(month)
+    if not np.isin(headers['transaction_id'], stored['transaction_id']).all():
+        raise RuntimeError(f"{_month_key(month)} 보관 파일 확인에 실패해 운영 테이블을 지우지 않았습니다.")
+
+    _delete_transactions(pool, headers['transaction_id'].tolist(), batch_size)
+    return len(headers['transaction_id']), len(details['detail_id'])
+
+
+def archive_closed_months(pool, archive, keep_months=3, today=None, log=print):
+    """ 최근 keep_months 개월(이번 달 포함)을 제외한 지난 달의 거래를 오래된 달부터 모두 보관
+
+    반환값: {월: (옮긴 거래 수, 옮긴 상세 행 수)}
+    """
+    today = today or date.today()
+    index = today.year * 12 + today.month - keep_months  # 보관하지 않을 가장 오래된 달 (0 부터 센 월 번호)
+    cutoff = date(index // 12, index % 12 + 1, 1)
+    with pool.connection() as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT MIN(transaction_date) FROM transaction WHERE transaction_date < %s", (cutoff,))
+        oldest = cursor.fetchone()[0]
+
+    results = {}
+    month = month_start(oldest) if oldest is not None else cutoff
+    while month < cutoff:
+        results[month] = archive_month(pool, archive, month)
+        if results[month][0]:
+            log(f"{_month_key(month)}: 거래 {results[month][0]:,}건, 상세 {results[month][1]:,}행 보관")
+        month = next_month(month)
+    return results
+
+
+class TransactionArchive:
+    """ 월별 거래 보관 파일(directory/transactions-YYYY-MM.npz) 묶음
+
+    - 파일마다 헤더/상세 컬럼을 NumPy 배열로 압축 저장 (거래 ID, 상세는 (거래 ID, 상세 ID) 순으로 정렬)
+    - manifest.json 에 월별 건수와 거래 ID 범위를 두어 필요한 달의 파일만 읽음
+    - 최근 읽은 max_partitions 개 파일은 메모리에 보관 (파일이 바뀌면 다시 읽음)
+    """
+
+    def __init__(self, directory='archive', max_partitions=4):
+        self.directory = directory
+        self.max_partitions = max_partitions
+        self._partitions = OrderedDict()  # 월 → (파일 수정 시각, 배열 dict)
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    # ---------- 파일 ----------
+    def _path(self, month):
+        return os.path.join(self.directory, f"transactions-{_month_key(month)}.npz")
+
+    def _manifest_path(self):
+        return os.path.join(self.directory, 'manifest.json')
+
+    def manifest(self):
+        """ {'YYYY-MM': {'transactions', 'details', 'min_id', 'max_id', 'bytes'}} """
+        try:
+            with open(self._manifest_path(), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def months(self):
+        """ 보관된 달 목록 (오래된 순) """
+        return [month_start(key) for key in sorted(self.manifest())]
+
+    def boundary(self):
+        """ 보관된 마지막 달의 다음 달 1일 (이 날짜 이후 거래는 모두 운영 테이블에 있음, 보관된 달이 없으면 None) """
+        months = self.months()
+        return next_month(months[-1]) if months else None
+
+    def write(self, month, headers, details):
+        """ 한 달치 배열을 기존 파일과 합쳐 임시 파일에 쓴 뒤 교체하고 manifest 갱신 """
+        month = month_start(month)
+        if os.path.exists(self._path(month)):
+            old = self.load(month)
+            headers = _merge(headers, old, 'transaction_id', HEADER_COLUMNS)
+            details = _merge(details, old, 'detail_id', DETAIL_COLUMNS)
+            order = np.lexsort((details['detail_id'], details['detail_transaction_id']))
+            details = {column: values[order] for column, values in details.items()}
+
+        path = self._path(month)
+        with open(path + '.tmp', 'wb') as f:
+            np.savez_compressed(f, **headers, **details)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + '.tmp', path)
+
+        with self._lock:
+            manifest = self.manifest()
+            manifest[_month_key(month)] = {
+                'transactions': int(len(headers['transaction_id'])),
+                'details': int(len(details['detail_id'])),
+                'min_id': int(headers['transaction_id'].min()),
+                'max_id': int(headers['transaction_id'].max()),
+                'bytes': os.path.getsize(path),
+            }
+            with open(self._manifest_path() + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+            os.replace(self._manifest_path() + '.tmp', self._manifest_path())
+            self._partitions.pop(month, None)
+
+    def load(self, month):
+        """ 한 달치 보관 배열 dict (없으면 빈 배열) """
+        month = month_start(month)
+        path = self._path(month)
+        try:
+            modified = os.path.getmtime(path)
+        except FileNotFoundError:
+            return {**_header_arrays([]), **_detail_arrays([])}
+
+        with self._lock:
+            cached = self._partitions.get(month)
+            if cached is not None and cached[0] == modified:
+                self._partitions.move_to_end(month)
+                return cached[1]
+
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files}
+        with self._lock:
+            self._partitions[month] = (modified, arrays)
+            self._partitions.move_to_end(month)
+            while len(self._partitions) > self.max_partitions:
+                self._partitions.popitem(last=False)
+        return arrays
+
+    # ---------- 조회 ----------
+    def find_transaction(self, transaction_id):
+        """ 거래 ID 가 보관된 달과 헤더 위치 (없으면 (None, None)), ID 범위가 맞는 달의 파일만 읽음 """
+        for key, entry in sorted(self.manifest().items(), reverse=True):
+            if not entry['min_id'] <= transaction_id <= entry['max_id']:
+                continue
+            data = self.load(month_start(key))
+            index = int(np.searchsorted(data['transaction_id'], transaction_id))
+            if index < len(data['transaction_id']) and data['transaction_id'][index] == transaction_id:
+                return month_start(key), index
+        return None, None
+
+    @track_operation()
+    def transaction_receipt(self, pool, transaction_id):
+        """ 보관된 거래의 영수증 (fetch_transaction_receipt 와 같은 형식, 이름은 현재 참조 테이블에서 조회) """
+        month, index = self.find_transaction(transaction_id)
+        if month is None:
+            return None
+        data = self.load(month)
+        start, end = np.searchsorted(data['detail_transaction_id'], [transaction_id, transaction_id + 1])
+        product_ids = data['product_id'][start:end].tolist()
+        employee_id = int(data['employee_id'][index])
+
+        with pool.connection() as conn, conn.cursor() as cursor:
+            query = """
+                -- name: archived_receipt_names
+                SELECT
+                    (SELECT name FROM store WHERE store_id = %s),
+                    (SELECT name FROM employee WHERE employee_id = %s)
+            """
+            cursor.execute(query, (int(data['store_id'][index]), employee_id))
+            store_name, employee_name = cursor.fetchone()
+            names = {}
+            if product_ids:
+                placeholders = ", ".join(["%s"] * len(set(product_ids)))
+                cursor.execute(f"SELECT product_id, name FROM product WHERE product_id IN ({placeholders})",
+                               sorted(set(product_ids)))
+                names = dict(cursor.fetchall())
+
+        lines = [
+            (product_id, names.get(product_id), quantity, None if unit_price == NULL_ID else unit_price, subtotal)
+            for product_id, quantity, unit_price, subtotal in zip(
+                product_ids, data['quantity'][start:end].tolist(),
+                data['unit_price'][start:end].tolist(), data['subtotal'][start:end].tolist())
+        ]
+        return {
+            'transaction_id': transaction_id,
+            'transaction_date': data['transaction_date'][index].item(),
+            'payment_method': PAYMENT_METHODS[int(data['payment_method'][index])],
+            'total_amount': int(data['total_amount'][index]),
+            'store_name': store_name,
+            'employee_name': employee_name,
+            'lines': lines,
+            'total_quantity': sum(line[2] for line in lines),
+        }
+
+    def employee_transactions(self, month, employee_id):
+        """ 보관된 한 달 중 직원이 처리한 거래 [(거래 ID, 거래일자, 총액)] (최신순) """
+        data = self.load(month)
+        rows = np.flatnonzero(data['employee_id'] == employee_id)
+        order = rows[np.lexsort((data['transaction_id'][rows], data['transaction_date'][rows].astype(np.int64)))[::-1]]
+        return list(zip(data['transaction_id'][order].tolist(), data['transaction_date'][order].tolist(),
+                        data['total_amount'][order].tolist()))
+
+    def employee_pages(self, pool, employee_id, page_size=20):
+        """ 보관 경계(boundary) 이전 거래 목록 페이지 제너레이터 (최신순, 보관 파일 + 운영 테이블에 남은 늦은 거래)
+
+        운영 테이블의 경계 이후 거래 목록 다음에 이어 붙여 쓰며, 필요한 달의 파일만 차례로 읽음
+        """
+        boundary = self.boundary()
+        if boundary is None:
+            return
+        with pool.connection() as conn, conn.cursor() as cursor:
+            query = """
+                SELECT transaction_id, transaction_date, total_amount
+                FROM transaction
+                WHERE employee_id = %s AND transaction_date < %s
+            """
+            cursor.execute(query, (employee_id, boundary))
+            late = cursor.fetchall()
+
+        by_month = {}
+        for row in late:
+            by_month.setdefault(month_start(row[1]), []).append(row)
+        months = sorted(set(self.months()) | by_month.keys(), reverse=True)
+
+        page = []
+        for month in months:
+            rows = self.employee_transactions(month, employee_id) + by_month.get(month, [])
+            rows.sort(key=lambda row: (row[1], row[0]), reverse=True)
+            for row in rows:
+                page.append(row)
+                if len(page) == page_size:
+                    yield page
+                    page = []
+        if page:
+            yield page
+
+    def sales_totals(self, month=None):
+        """ 보관된 거래의 (월, 매장, 직원)별 판매 금액/수량 합계 (month 가 없으면 보관된 전체 기간)
+
+        반환값: [(월, 매장 ID, 직원 ID, 총 판매 금액, 총 수량)]
+        """
+        months = self.months() if month is None else [month_start(month)]
+        totals = []
+        for partition in months:
+            data = self.load(partition)
+            headers = np.searchsorted(data['transaction_id'], data['detail_transaction_id'])
+            employees = data['employee_id'][headers]
+            stores = data['store_id'][headers]
+            mask = employees != NULL_ID
+            if not mask.any():
+                continue
+            pairs, inverse = np.unique(np.stack([stores[mask], employees[mask]], axis=1), axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            sales = np.bincount(inverse, weights=data['subtotal'][mask]).astype(np.int64)
+            quantity = np.bincount(inverse, weights=data['quantity'][mask]).astype(np.int64)
+            for (store_id, employee_id), total_sales, total_quantity in zip(pairs.tolist(), sales.tolist(), quantity.tolist()):
+                totals.append((partition, store_id, employee_id, total_sales, total_quantity))
+        return totals
+
+
+# ========================= 실행 코드 =========================
+if __name__ == '__main__':
+    from cvs import connect, read_archive_config
+
+    options = read_archive_config() or {'directory': 'archive', 'keep_months': 3}
+    parser = argparse.ArgumentParser(description='지난 달 거래를 월별 압축 보관 파일로 옮김 (app.ini 의 [archive] 설정)')
+    parser.add_argument('command', nargs='?', choices=('run', 'list'), default='run')
+    parser.add_argument('--keep-months', type=int, default=options['keep_months'],
+                        help='운영 테이블에 남길 최근 개월 수 (이번 달 포함)')
+    parser.add_argument('--directory', default=options['directory'])
+    args = parser.parse_args()
+
+    archive = TransactionArchive(args.directory)
+    if args.command == 'list':
+        for key, entry in sorted(archive.manifest().items()):
+            print(f"{key}: 거래 {entry['transactions']:,}건, 상세 {entry['details']:,}행, "
+                  f"거래 ID {entry['min_id']}~{entry['max_id']}, {entry['bytes'] / 1024:,.1f} KB")
+        raise SystemExit(0)
+
+    pool = connect()
+    if pool is None:
+        raise SystemExit(1)
+
+    try:
+        results = archive_closed_months(pool, archive, args.keep_months)
+        moved = sum(count for count, _ in results.values())
+        print(f"보관 완료: 거래 {moved:,}건 (기준: 최근 {args.keep_months}개월은 운영 테이블에 유지)")
+    except Error as error:
+        print(f"거래 보관 중 오류 발생: {error}")
+        raise SystemExit(1)
+    finally:
+        pool.close()
@@ -0,0 +1,362 @@
+import argparse
+import json
+import math
+import random
+import time
+from datetime import datetime, timedelta
+
+from mysql.connector import Error
+
+from cvs import (apply_deliveries, checkout, inventory_pages, order_pages, read_config, read_pool_config,
+                 read_storage_config, transaction_pages)
+from db_pool import ConnectionPool
+from migrate import migrate
+from query_metrics import QueryMetrics, statement_verb
+from receipts import ReceiptCache, fetch_order_receipt, fetch_transaction_receipt
+from sales_rollup import fetch_top_employees, month_start, rebuild_sales_rollup
+from sqlite_backend import SQLitePool
+
+
+# ========================= 합성 데이터 생성 =========================
+TABLES = (
+    'import_checkpoint', 'employee_sales_monthly', 'transaction_details', 'transaction',
+    'stock', 'order_details', 'order_table', 'product', 'employee', 'store', 'supplier',
+)
+CATEGORIES = ('라면', '과자', '음료', '유제품', '도시락', '생활용품', '주류', '아이스크림')
+SURNAMES = ('김', '이', '박', '최', '정', '강', '조', '윤', '장', '임')
+GIVEN_NAMES = ('철수', '영희', '민수', '지훈', '서연', '하늘', '도윤', '수빈', '예준', '지우')
+ROLES = ('Manager', 'Cashier', 'Stocker')
+PAYMENT_METHODS = ('Cash', 'Card', 'Mobile Payment')
+
+# 규모 1 기준 데이터 양 (--scales 로 배수 지정)
+BASE_SIZES = {
+    'suppliers': 20,
+    'stores': 10,
+    'employees_per_store': 5,
+    'products': 500,
+    'stock_per_store': 200,
+    'orders': 2000,
+    'transactions': 20000,
+}
+
+
+def reset_data(pool):
+    """ 벤치마크 DB 의 모든 데이터 삭제 """
+    with pool.connection() as conn, conn.cursor() as cursor:
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+        for table in TABLES:
+            cursor.execute(f"TRUNCATE TABLE {table}")
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+        conn.commit()
+
+
+def _insert_many(cursor, query, rows, batch_size=1000):
+    for start in range(0, len(rows), batch_size):
+        cursor.executemany(query, rows[start:start + batch_size])
+
+
+def generate_dataset(pool, scale=1, seed=42, now=None):
+    """ 같은 seed 와 scale 이면 항상 같은 데이터를 만드는 합성 데이터 생성기
+
+    반환값: 벤치마크에서 무작위 대상을 고르기 위한 ID 목록 묶음
+    """
+    rng = random.Random(seed)
+    now = now or datetime(2025, 1, 1)
+    sizes = {name: int(value * scale) for name, value in BASE_SIZES.items()}
+    sizes['employees_per_store'] = BASE_SIZES['employees_per_store']
+    sizes['stock_per_store'] = min(BASE_SIZES['stock_per_store'], sizes['products'])
+
+    suppliers = [(i, f"공급업체{i:05d}", f"02-{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}", f"서울시 {i}번지")
+                 for i in range(1, sizes['suppliers'] + 1)]
+    stores = [(i, f"GS25 {i:05d}호점", f"서울시 {rng.choice(('강남구', '마포구', '종로구', '송파구'))}")
+              for i in range(1, sizes['stores'] + 1)]
+
+    employees = []
+    store_employees = {}
+    employee_id = 0
+    for store_id, _, _ in stores:
+        for _ in range(sizes['employees_per_store']):
+            employee_id += 1
+            name = rng.choice(SURNAMES) + rng.choice(GIVEN_NAMES)
+            hire_date = (now - timedelta(days=rng.randint(30, 2000))).date()
+            employees.append((employee_id, store_id, name, rng.choice(ROLES), hire_date))
+            store_employees.setdefault(store_id, []).append(employee_id)
+
+    products = []
+    prices = {}
+    supplier_products = {}
+    for product_id in range(1, sizes['products'] + 1):
+        supplier_id = rng.randint(1, sizes['suppliers'])
+        price = rng.randrange(500, 20000, 100)
+        products.append((product_id, f"상품{product_id:07d}", rng.choice(CATEGORIES), price, supplier_id))
+        prices[product_id] = price
+        supplier_products.setdefault(supplier_id, []).append(product_id)
+
+    stock = []
+    store_products = {}
+    for store_id, _, _ in stores:
+        chosen = rng.sample(range(1, sizes['products'] + 1), sizes['stock_per_store'])
+        store_products[store_id] = chosen
+        stock.extend((store_id, product_id, 1_000_000) for product_id in chosen)
+
+    orders, order_details = [], []
+    supplier_ids = list(supplier_products)
+    for order_id in range(1, sizes['orders'] + 1):
+        store_id = rng.randint(1, sizes['stores'])
+        supplier_id = rng.choice(supplier_ids)
+        order_date = now - timedelta(minutes=rng.randint(0, 365 * 24 * 60))
+        status = rng.choices(('Pending', 'Shipped', 'Delivered'), weights=(2, 1, 7))[0]
+        applied_at = order_date if status == 'Delivered' else None
+        orders.append((order_id, store_id, supplier_id, order_date, status, applied_at))
+        for product_id in rng.sample(supplier_products[supplier_id], min(3, len(supplier_products[supplier_id]))):
+            order_details.append((order_id, product_id, rng.randint(1, 50)))
+
+    transactions, transaction_details = [], []
+    for transaction_id in range(1, sizes['transactions'] + 1):
+        store_id = rng.randint(1, sizes['stores'])
+        lines = rng.sample(store_products[store_id], rng.randint(1, 5))
+        total = 0
+        for product_id in lines:
+            quantity = rng.randint(1, 3)
+            transaction_details.append((transaction_id, product_id, quantity, prices[product_id], quantity * prices[product_id]))
+            total += quantity * prices[product_id]
+        transaction_date = now - timedelta(minutes=rng.randint(0, 365 * 24 * 60))
+        transactions.append((transaction_id, store_id, rng.choice(store_employees[store_id]), transaction_date,
+                             total, rng.choice(PAYMENT_METHODS)))
+
+    with pool.connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                _insert_many(cursor, "INSERT INTO supplier (supplier_id, name, contact, address) VALUES (%s, %s, %s, %s)", suppliers)
+                _insert_many(cursor, "INSERT INTO store (store_id, name, location) VALUES (%s, %s, %s)", stores)
+                _insert_many(cursor, "INSERT INTO employee (employee_id, store_id, name, role, hire_date) VALUES (%s, %s, %s, %s, %s)", employees)
+                _insert_many(cursor, "INSERT INTO product (product_id, name, category, price, supplier_id) VALUES (%s, %s, %s, %s, %s)", products)
+                _insert_many(cursor, "INSERT INTO stock (store_id, product_id, quantity) VALUES (%s, %s, %s)", stock)
+                _insert_many(cursor, "INSERT INTO order_table (order_id, store_id, supplier_id, order_date, status, stock_applied_at) VALUES (%s, %s, %s, %s, %s, %s)", orders)
+                _insert_many(cursor, "INSERT INTO order_details (order_id, product_id, quantity) VALUES (%s, %s, %s)", order_details)
+                _insert_many(cursor, "INSERT INTO transaction (transaction_id, store_id, employee_id, transaction_date, total_amount, payment_method) VALUES (%s, %s, %s, %s, %s, %s)", transactions)
+                _insert_many(cursor, "INSERT INTO transaction_details (transaction_id, product_id, quantity, unit_price, subtotal) VALUES (%s, %s, %s, %s, %s)", transaction_details)
+            conn.commit()
+        except Error:
+            conn.rollback()
+            raise
+
+    rebuild_sales_rollup(pool)
+
+    return {
+        'sizes': sizes,
+        'now': now,
+        'store_ids': [store[0] for store in stores],
+        'store_employees': store_employees,
+        'store_products': store_products,
+        'order_keys': [(order[1], order[2]) for order in orders],
+        'pending_order_ids': [order[0] for order in orders if order[4] != 'Delivered'],
+        'order_count': len(orders),
+        'transaction_count': len(transactions),
+    }
+
+
+# ========================= 측정 =========================
+def percentile(values, pct):
+    """ nearest-rank 백분위수 """
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(1, min(len(ordered), math.ceil(pct / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def _deliver_pending(pool, order_ids):
+    """ 배송 반영 측정용: Pending/Shipped 주문 일부를 Delivered 로 바꿈 (측정 시간에서 제외) """
+    if not order_ids:
+        return
+    placeholders = ", ".join(["%s"] * len(order_ids))
+    with pool.connection() as conn, conn.cursor() as cursor:
+        cursor.execute(f"UPDATE order_table SET status = 'Delivered' WHERE order_id IN ({placeholders})", order_ids)
+        conn.commit()
+
+
+def build_operations(pool, data, rng):
+    """ 메뉴 기능별 비대화식 실행 함수 (이름 → (준비 함수, 측정 함수)) """
+    all_employees = [employee for employees in data['store_employees'].values() for employee in employees]
+    pending = list(data['pending_order_ids'])
+    rng.shuffle(pending)
+    month = month_start(data['now'] - timedelta(days=1))
+    receipts = ReceiptCache(pool)
+    reprint_ids = [rng.randint(1, data['transaction_count']) for _ in range(50)]  # 같은 영수증 재출력
+
+    def random_store():
+        return rng.choice(data['store_ids'])
+
+    def do_checkout():
+        store_id = random_store()
+        lines = [(product_id, 1) for product_id in rng.sample(data['store_products'][store_id], 5)]
+        employee_id = rng.choice(data['store_employees'][store_id])
+        checkout(pool, store_id, employee_id, rng.choice(PAYMENT_METHODS), lines)
+
+    def prepare_delivery():
+        batch, pending[:] = pending[:2], pending[2:]
+        _deliver_pending(pool, batch)
+
+    return {
+        'order_receipt': (None, lambda: fetch_order_receipt(pool, rng.randint(1, data['order_count']))),
+        'transaction_receipt': (None, lambda: fetch_transaction_receipt(pool, rng.randint(1, data['transaction_count']))),
+        'receipt_reprint': (None, lambda: receipts.transaction(rng.choice(reprint_ids))),
+        'order_list': (None, lambda: next(order_pages(pool, *rng.choice(data['order_keys'])), None)),
+        'transaction_list': (None, lambda: next(transaction_pages(pool, rng.choice(all_employees)), None)),
+        'inventory_list': (None, lambda: next(inventory_pages(pool, random_store()), None)),
+        'checkout': (None, do_checkout),
+        'apply_deliveries': (prepare_delivery, lambda: apply_deliveries(pool)),
+        'leaderboard': (None, lambda: fetch_top_employees(pool, month, rng.choice((None, random_store())), 10)),
+    }
+
+
+def run_benchmark(pool, data, iterations=200, seed=42, only=None):
+    """ 기능별로 iterations 번 실행해 지연 시간 백분위수(ms)와 처리량(ops/s) 측정 """
+    rng = random.Random(seed)
+    results = {}
+    for name, (prepare, operation) in build_operations(pool, data, rng).items():
+        if only and name not in only:
+            continue
+        operation()  # 워밍업 (커넥션 생성, 캐시 적재)
+        latencies = []
+        for _ in range(iterations):
+            if prepare:
+                prepare()
+            started = time.perf_counter()
+            operation()
+            latencies.append(time.perf_counter() - started)
+        total = sum(latencies)
+        results[name] = {
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p95_ms': percentile(latencies, 95) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000,
+            'ops_per_sec': len(latencies) / total if total else 0.0,
+        }
+    return results
+
+
+def print_results(scale, data, results):
+    sizes = data['sizes']
+    print(f"\n=== 규모 x{scale} (매장 {sizes['stores']}, 상품 {sizes['products']}, "
+          f"주문 {sizes['orders']}, 거래 {sizes['transactions']}) ===")
+    print(f"{'기능':<22} {'p50(ms)':>10} {'p95(ms)':>10} {'p99(ms)':>10} {'ops/s':>10}")
+    print("-" * 66)
+    for name, result in results.items():
+        print(f"{name:<22} {result['p50_ms']:>10.2f} {result['p95_ms']:>10.2f} {result['p99_ms']:>10.2f} {result['ops_per_sec']:>10.1f}")
+
+
+# ========================= 실행 계획 점검 =========================
+FULL_SCAN_TYPES = ('ALL', 'index')  # EXPLAIN type 이 이 값이면 테이블(또는 인덱스) 전체를 읽음
+
+
+def check_plans(database, data, seed=42):
+    """ 벤치마크 기능을 한 번씩 실행하며 실제로 실행된 쿼리를 모아 EXPLAIN
+
+    반환값: [(기능, 쿼리 이름, 전체 스캔 테이블 목록, EXPLAIN 행 목록)]
+    """
+    metrics = QueryMetrics(slow_query_ms=float('inf'), slow_log=None, capture=True)
+    pool = bench_pool(database, metrics=metrics)
+    try:
+        for prepare, operation in build_operations(pool, data, random.Random(seed)).values():
+            if prepare:
+                prepare()
+            operation()
+    finally:
+        pool.close()
+
+    results = []
+    pool = bench_pool(database)
+    try:
+        with pool.connection() as conn, conn.cursor() as cursor:
+            for (operation, statement), (query, params) in sorted(metrics.captured.items()):
+                if statement_verb(query) not in ('select', 'update', 'delete', 'insert'):
+                    continue
+                if params and isinstance(params[0], (list, tuple)):
+                    continue  # executemany 의 다중 행 INSERT
+                cursor.execute(f"EXPLAIN {query}", params)
+                columns = [column[0] for column in cursor.description]
+                plan = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                scans = [
+                    row['table'] for row in plan
+                    if row.get('type') in FULL_SCAN_TYPES and row.get('select_type') != 'INSERT'
+                    and row.get('table') and not row['table'].startswith('<')  # 파생 테이블(<derived2>)은 제외
+                ]
+                results.append((operation, statement, scans, plan))
+    finally:
+        pool.close()
+    return results
+
+
+def print_plans(results):
+    print(f"\n{'기능.쿼리':<50} {'접근 방식':<40} 결과")
+    print("-" * 100)
+    for operation, statement, scans, plan in results:
+        access = ", ".join(f"{row['table']}:{row['type']}({row['key'] or '-'})" for row in plan if row.get('table'))
+        print(f"{operation + '.' + statement:<50} {access:<40} {'전체 스캔: ' + ', '.join(scans) if scans else 'OK'}")
+
+
+def bench_pool(database, backend='mysql', **overrides):
+    """ 벤치마크 전용 DB 에 연결하는 커넥션 풀 (운영 DB 는 거부, overrides 로 [pool] 설정 일부 변경)
+
+    backend 가 'sqlite' 면 database 는 SQLite 파일 경로
+    """
+    if backend == 'sqlite':
+        storage = read_storage_config()
+        if storage['backend'] == 'sqlite' and storage['path'] == database:
+            raise SystemExit(f"운영 DB({database})에서는 벤치마크를 실행할 수 없습니다. 별도 파일을 지정하세요.")
+        return SQLitePool(database, **{**read_pool_config(), **overrides})
+    config = read_config()
+    if database == config.get('database'):
+        raise SystemExit(f"운영 DB({database})에서는 벤치마크를 실행할 수 없습니다. 별도 DB 를 지정하세요.")
+    config['database'] = database
+    return ConnectionPool(config, **{**read_pool_config(), **overrides})
+
+
+# ========================= 실행 코드 =========================
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='합성 데이터 생성 및 메뉴 기능별 벤치마크')
+    parser.add_argument('--database', required=True, help='벤치마크 전용 DB 이름 (데이터를 모두 지우고 다시 생성)')
+    parser.add_argument('--backend', choices=('mysql', 'sqlite'), default='mysql',
+                        help='저장소 (sqlite 면 --database 는 SQLite 파일 경로)')
+    parser.add_argument('--scales', default='1,10', help='데이터 규모 배수 목록 (예: 1,10,100)')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--only', help='측정할 기능 이름 (쉼표 구분)')
+    parser.add_argument('--json', help='결과를 저장할 JSON 경로 (릴리스 간 비교용)')
+    parser.add_argument('--check-plans', action='store_true',
+                        help='측정 대신 각 기능의 쿼리를 EXPLAIN 해 전체 스캔이 있으면 실패 (첫 번째 규모 사용)')
+    args = parser.parse_args()
+    if args.check_plans and args.backend != 'mysql':
+        parser.error('--check-plans 는 MySQL 실행 계획(EXPLAIN)을 검사하므로 --backend mysql 에서만 사용할 수 있습니다.')
+
+    pool = bench_pool(args.database, args.backend)
+    only = set(args.only.split(',')) if args.only else None
+    report = {}
+    try:
+        migrate(pool, log=lambda message: None)
+        if args.check_plans:
+            reset_data(pool)
+            data = generate_dataset(pool, float(args.scales.split(',')[0]), args.seed)
+            results = check_plans(args.database, data, args.seed)
+            print_plans(results)
+            if any(scans for _, _, scans, _ in results):
+                raise SystemExit(1)
+            raise SystemExit(0)
+        for scale in [float(value) for value in args.scales.split(',')]:
+            reset_data(pool)
+            started = time.perf_counter()
+            data = generate_dataset(pool, scale, args.seed)
+            print(f"\n데이터 생성 (x{scale:g}): {time.perf_counter() - started:.1f}초")
+            results = run_benchmark(pool, data, args.iterations, args.seed, only)
+            print_results(f"{scale:g}", data, results)
+            report[f"{scale:g}"] = {'sizes': data['sizes'], 'results': results}
+    except Error as error:
+        print(f"벤치마크 중 오류 발생: {error}")
+        raise SystemExit(1)
+    finally:
+        pool.close()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,382 @@
+import argparse
+import csv
+import os
+import time
+from datetime import datetime
+
+from mysql.connector import Error
+
+from cvs import connect
+from ref_cache import REFERENCE_TABLES
+
+
+# ========================= 행 검증 =========================
+PAYMENT_METHODS = ('Cash', 'Card', 'Mobile Payment')
+
+
+def _text(row, column, required=True, max_length=None):
+    value = (row.get(column) or '').strip()
+    if not value:
+        if required:
+            raise ValueError(f"{column} 값이 비어 있습니다.")
+        return None
+    if max_length and len(value) > max_length:
+        raise ValueError(f"{column} 은(는) {max_length}자 이하여야 합니다.")
+    return value
+
+
+def _int(row, column, minimum=None, required=True):
+    value = _text(row, column, required)
+    if value is None:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"{column} 은(는) 정수여야 합니다: {value}")
+    if minimum is not None and number < minimum:
+        raise ValueError(f"{column} 은(는) {minimum} 이상이어야 합니다: {number}")
+    return number
+
+
+def _parse_supplier(row):
+    return (
+        _text(row, 'name', max_length=100),
+        _text(row, 'contact', required=False, max_length=50),
+        _text(row, 'address', required=False, max_length=100),
+    )
+
+
+def _parse_product(row):
+    supplier = _int(row, 'supplier_id', required=False)
+    if supplier is None:
+        supplier = _text(row, 'supplier_name')  # 공급업체명은 배치 검증 단계에서 ID 로 변환
+    return (
+        _text(row, 'name', max_length=100),
+        _text(row, 'category', max_length=50),
+        _int(row, 'price', minimum=0),
+        supplier,
+    )
+
+
+def _parse_stock(row):
+    return (
+        _int(row, 'store_id'),
+        _int(row, 'product_id'),
+        _int(row, 'quantity', minimum=0),
+    )
+
+
+def _parse_transaction(row):
+    payment_method = _text(row, 'payment_method')
+    if payment_method not in PAYMENT_METHODS:
+        raise ValueError(f"payment_method 는 {', '.join(PAYMENT_METHODS)} 중 하나여야 합니다: {payment_method}")
+    try:
+        transaction_date = datetime.fromisoformat(_text(row, 'transaction_date'))
+    except ValueError:
+        raise ValueError(f"transaction_date 형식이 잘못되었습니다: {row.get('transaction_date')}")
+    return (
+        _int(row, 'transaction_id', minimum=1),
+        _int(row, 'store_id'),
+        _int(row, 'employee_id', required=False),
+        transaction_date,
+        _int(row, 'total_amount', minimum=0),
+        payment_method,
+    )
+
+
+def _parse_transaction_details(row):
+    quantity = _int(row, 'quantity', minimum=1)
+    subtotal = _int(row, 'subtotal', minimum=0)
+    unit_price = _int(row, 'unit_price', minimum=0, required=False)
+    if unit_price is None:
+        unit_price = subtotal // quantity  # 판매 시점 단가 컬럼이 없는 CSV 는 소계에서 계산
+    return (
+        _int(row, 'transaction_id'),
+        _int(row, 'product_id'),
+        quantity,
+        unit_price,
+        subtotal,
+    )
+
+
+# 테이블별 적재 규칙
+#   parse: CSV 한 행 → 삽입할 값 튜플
+#   unique: (값 위치, 컬럼) - 파일 안과 DB 에서 중복 확인 (upsert 모드에서는 DB 중복 허용)
+#   foreign_keys: (값 위치, 참조 테이블, 참조 컬럼) - NULL 은 확인하지 않음
+#   upsert: ON DUPLICATE KEY UPDATE 로 갱신할 컬럼
+IMPORT_TABLES = {
+    'supplier': {
+        'parse': _parse_supplier,
+        'columns': ('name', 'contact', 'address'),
+        'unique': (0, 'name'),
+        'foreign_keys': (),
+        'upsert': ('contact', 'address'),
+    },
+    'product': {
+        'parse': _parse_product,
+        'columns': ('name', 'category', 'price', 'supplier_id'),
+        'unique': (0, 'name'),
+        'foreign_keys': ((3, 'supplier', 'supplier_id'),),
+        'upsert': ('category', 'price', 'supplier_id'),
+    },
+    'stock': {
+        'parse': _parse_stock,
+        'columns': ('store_id', 'product_id', 'quantity'),
+        'unique': None,  # (store_id, product_id) 중복은 파일 안은 import_csv, DB 는 _write_stock 에서 처리
+        'foreign_keys': ((0, 'store', 'store_id'), (1, 'product', 'product_id')),
+        'upsert': ('quantity',),
+    },
+    'transaction': {
+        'parse': _parse_transaction,
+        'columns': ('transaction_id', 'store_id', 'employee_id', 'transaction_date', 'total_amount', 'payment_method'),
+        'unique': (0, 'transaction_id'),
+        'foreign_keys': ((1, 'store', 'store_id'), (2, 'employee', 'employee_id')),
+        'upsert': ('store_id', 'employee_id', 'transaction_date', 'total_amount', 'payment_method'),
+    },
+    'transaction_details': {
+        'parse': _parse_transaction_details,
+        'columns': ('transaction_id', 'product_id', 'quantity', 'unit_price', 'subtotal'),
+        'unique': None,
+        'foreign_keys': ((0, 'transaction', 'transaction_id'), (1, 'product', 'product_id')),
+        'upsert': (),
+    },
+}
+
+
+def _existing(cursor, table, column, values):
+    """ values 중 table.column 에 이미 있는 값 집합 (IN 조회 한 번) """
+    values = list(set(values))
+    if not values:
+        return set()
+    placeholders = ", ".join(["%s"] * len(values))
+    cursor.execute(f"SELECT {column} FROM {table} WHERE {column} IN ({placeholders})", values)
+    return {row[0] for row in cursor.fetchall()}
+
+
+def _resolve_supplier_names(cursor, batch):
+    """ product 행의 공급업체명을 supplier_id 로 변환 (없으면 검증 오류) """
+    names = [values[3] for _, values in batch if isinstance(values[3], str)]
+    if not names:
+        return batch, []
+    placeholders = ", ".join(["%s"] * len(set(names)))
+    cursor.execute(f"SELECT name, supplier_id FROM supplier WHERE name IN ({placeholders})", list(set(names)))
+    ids = dict(cursor.fetchall())
+
+    resolved, rejects = [], []
+    for line_no, values in batch:
+        if isinstance(values[3], str):
+            if values[3] not in ids:
+                rejects.append((line_no, f"공급업체명이 존재하지 않습니다: {values[3]}"))
+                continue
+            values = (*values[:3], ids[values[3]])
+        resolved.append((line_no, values))
+    return resolved, rejects
+
+
+def _check_batch(cursor, table, batch, upsert):
+    """ 배치 단위 제약 조건 확인 (FK, DB 에 이미 있는 이름/ID) → (통과한 행, 거부된 행) """
+    spec = IMPORT_TABLES[table]
+    rejects = []
+    if table == 'product':
+        batch, rejects = _resolve_supplier_names(cursor, batch)
+
+    missing = {}
+    for position, ref_table, ref_column in spec['foreign_keys']:
+        values = [values[position] for _, values in batch if values[position] is not None]
+        missing[position] = set(values) - _existing(cursor, ref_table, ref_column, values)
+
+    duplicated = set()
+    if spec['unique'] and not upsert:
+        position, column = spec['unique']
+        duplicated = _existing(cursor, table, column, [values[position] for _, values in batch])
+
+    accepted = []
+    for line_no, values in batch:
+        reason = None
+        for position, ref_table, ref_column in spec['foreign_keys']:
+            if values[position] in missing[position]:
+                reason = f"{ref_table}.{ref_column} 에 없는 값입니다: {values[position]}"
+                break
+        if reason is None and spec['unique'] and values[spec['unique'][0]] in duplicated:
+            reason = f"이미 존재하는 {spec['unique'][1]} 입니다: {values[spec['unique'][0]]}"
+        if reason:
+            rejects.append((line_no, reason))
+        else:
+            accepted.append((line_no, values))
+    return accepted, rejects
+
+
+# ========================= 적재 =========================
+def _write_stock(cursor, rows, upsert):
+    """ stock 은 (매장, 상품)별 한 행(유일 인덱스)이므로 기존 행은 갱신(upsert) 또는 거부, 새 행은 일괄 추가 """
+    pairs = {(values[0], values[1]): values for _, values in rows}  # 파일 안의 중복은 import_csv 에서 거부
+    query = "INSERT INTO stock (store_id, product_id, quantity) VALUES (%s, %s, %s)"
+    if upsert:
+        # 확인 후 추가하지 않고 유일 인덱스 충돌로 갱신하므로 동시에 적재해도 중복 행이 생기지 않음
+        cursor.executemany(f"{query} ON DUPLICATE KEY UPDATE quantity = VALUES(quantity)", list(pairs.values()))
+        return []
+
+    placeholders = ", ".join(["(%s, %s)"] * len(pairs))
+    cursor.execute(
+        f"SELECT store_id, product_id FROM stock WHERE (store_id, product_id) IN ({placeholders})",
+        [value for pair in pairs for value in pair],
+    )
+    existing = set(cursor.fetchall())
+    rejects = [(line_no, f"이미 재고 행이 있습니다: 매장 {values[0]}, 상품 {values[1]}")
+               for line_no, values in rows if (values[0], values[1]) in existing]
+    new_rows = [values for pair, values in pairs.items() if pair not in existing]
+    if new_rows:
+        cursor.executemany(query, new_rows)  # 그 사이 다른 적재가 추가한 행은 유일 인덱스 오류로 배치 롤백
+    return rejects
+
+
+def _write_batch(cursor, table, rows, upsert):
+    """ 검증된 행을 다중 행 INSERT 한 번으로 적재 (upsert 면 ON DUPLICATE KEY UPDATE) → 추가로 거부된 행 """
+    if table == 'stock':
+        return _write_stock(cursor, rows, upsert)
+
+    spec = IMPORT_TABLES[table]
+    columns = spec['columns']
+    query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    if upsert and spec['upsert']:
+        updates = ", ".join(f"{column} = VALUES({column})" for column in spec['upsert'])
+        query += f" ON DUPLICATE KEY UPDATE {updates}"
+    cursor.executemany(query, [values for _, values in rows])
+    return []
+
+
+def _load_checkpoint(cursor, source):
+    cursor.execute("SELECT last_line FROM import_checkpoint WHERE source = %s", (source,))
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def _save_checkpoint(cursor, source, line_no):
+    query = """
+        INSERT INTO import_checkpoint (source, last_line) VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE last_line = VALUES(last_line)
+    """
+    cursor.execute(query, (source, line_no))
+
+
+def import_csv(pool, table, path, upsert=False, batch_size=1000, reject_path=None, progress=None, cache=None):
+    """ CSV 파일을 스트리밍으로 읽어 배치 단위로 검증 후 적재
+
+    - 배치마다 적재와 체크포인트(import_checkpoint) 저장을 같은 트랜잭션으로 커밋하므로
+      중단 후 다시 실행하면 마지막으로 커밋된 줄 다음부터 이어서 적재
+    - 거부된 행은 배치마다 모아 두었다가 커밋한 뒤 reject_path CSV 에 줄 번호와 사유를 기록
+      (중단 후 이어서 적재해도 같은 줄이 두 번 기록되지 않음)
+    - cache(ReferenceCache)가 있으면 커밋한 배치의 공급업체/상품을 캐시 사본과 검색 색인에 바로 반영
+    반환값: {'loaded', 'rejected', 'skipped', 'seconds', 'rows_per_sec'}
+    """
+    spec = IMPORT_TABLES[table]
+    source = f"{table}:{os.path.abspath(path)}"
+    started = time.monotonic()
+    loaded = rejected = skipped = 0
+    seen = set()  # 파일 안의 중복 확인용 (stock 은 (매장, 상품))
+    pending_rejects = []  # 아직 커밋되지 않은 배치의 거부 행
+
+    with pool.connection() as conn, conn.cursor() as cursor:
+        resume_after = _load_checkpoint(cursor, source)
+
+    reject_file = open(reject_path, 'a', newline='', encoding='utf-8') if reject_path else None
+    reject_writer = csv.writer(reject_file) if reject_file else None
+
+    def write_rejects(rejects):
+        nonlocal rejected
+        rejected += len(rejects)
+        if reject_writer:
+            reject_writer.writerows(rejects)
+
+    def flush(batch, last_line):
+        nonlocal loaded
+        with pool.connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    accepted, rejects = _check_batch(cursor, table, batch, upsert)
+                    batch_rejects = _write_batch(cursor, table, accepted, upsert) if accepted else []
+                    _save_checkpoint(cursor, source, last_line)
+                conn.commit()
+            except Error:
+                conn.rollback()
+                raise
+        if cache is not None and table in REFERENCE_TABLES:
+            cache.refresh_rows(table, [values[0] for _, values in accepted], by_name=True)
+        write_rejects(sorted(pending_rejects + rejects + batch_rejects))
+        pending_rejects.clear()
+        loaded += len(accepted) - len(batch_rejects)
+        if progress:
+            elapsed = time.monotonic() - started
+            progress(loaded, rejected, loaded / elapsed if elapsed else 0.0)
+
+    try:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            batch = []
+            line_no = 1  # 1번 줄은 헤더
+            for line_no, row in enumerate(csv.DictReader(f), start=2):
+                if line_no <= resume_after:
+                    skipped += 1
+                    continue
+                try:
+                    values = spec['parse'](row)
+                except ValueError as error:
+                    pending_rejects.append((line_no, str(error)))
+                    continue
+                if spec['unique'] or table == 'stock':
+                    key = values[spec['unique'][0]] if spec['unique'] else (values[0], values[1])
+                    if key in seen:
+                        label = spec['unique'][1] if spec['unique'] else '(store_id, product_id)'
+                        pending_rejects.append((line_no, f"파일 안에서 중복된 {label} 입니다: {key}"))
+                        continue
+                    seen.add(key)
+                batch.append((line_no, values))
+                if len(batch) >= batch_size:
+                    flush(batch, line_no)
+                    batch = []
+            if batch or line_no > resume_after:
+                flush(batch, line_no)
+    finally:
+        if reject_file:
+            reject_file.close()
+
+    seconds = time.monotonic() - started
+    return {
+        'loaded': loaded,
+        'rejected': rejected,
+        'skipped': skipped,
+        'seconds': seconds,
+        'rows_per_sec': loaded / seconds if seconds else 0.0,
+    }
+
+
+# ========================= 실행 코드 =========================
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='CSV 대량 적재 (supplier, product, stock, transaction, transaction_details)')
+    parser.add_argument('table', choices=list(IMPORT_TABLES))
+    parser.add_argument('path', help='CSV 파일 경로 (첫 줄은 컬럼명)')
+    parser.add_argument('--upsert', action='store_true', help='이미 있는 행은 갱신')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--rejects', help='거부된 행을 기록할 CSV 경로 (기본: <파일>.rejects.csv)')
+    args = parser.parse_args()
+
+    pool = connect()
+    if pool is None:
+        raise SystemExit(1)
+
+    def show_progress(loaded, rejected, rate):
+        print(f"\r적재 {loaded:,}행, 거부 {rejected:,}행, {rate:,.0f}행/초", end='', flush=True)
+
+    try:
+        result = import_csv(pool, args.table, args.path, args.upsert, args.batch_size,
+                            args.rejects or f"{args.path}.rejects.csv", show_progress)
+    except (Error, OSError) as error:
+        print(f"\n적재 중 오류 발생: {error} (다시 실행하면 마지막 체크포인트부터 이어서 적재)")
+        raise SystemExit(1)
+    finally:
+        pool.close()
+
+    print()
+    print(f"완료: 적재 {result['loaded']:,}행, 거부 {result['rejected']:,}행, 건너뜀(이전 실행) {result['skipped']:,}행")
+    print(f"소요 시간 {result['seconds']:.1f}초, {result['rows_per_sec']:,.0f}행/초")
+    if args.table in ('transaction', 'transaction_details'):
+        print("과거 거래를 적재했다면 메뉴 10번에서 판매 집계를 재구축하세요.")
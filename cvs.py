@@ -1,7 +1,36 @@
-from mysql.connector import MySQLConnection, Error
+import random
+import sys
+import time
+from datetime import date, timedelta
+from itertools import chain
+
+from mysql.connector import Error, errorcode
 from configparser import ConfigParser
 
+from db_pool import ConnectionPool
+from replicas import ReplicaRouter
+from sqlite_backend import SQLitePool
+from query_metrics import QueryMetrics, track_operation
+from listing import keyset_pages
+from receipts import ReceiptCache
+from ref_cache import REFERENCE_TABLES, ReferenceCache
+from sale_journal import JournalSyncer, SaleJournal
+from sales_rollup import add_sale_to_rollup, fetch_top_employees, month_start, rebuild_sales_rollup, verify_sales_rollup
+
+PAGE_SIZE = 20  # 목록 화면 한 페이지의 행 수
+RETRYABLE_ERRORS = (errorcode.ER_LOCK_DEADLOCK, errorcode.ER_LOCK_WAIT_TIMEOUT)  # 결제를 다시 시도할 잠금 충돌 오류
+MAX_INT = 2 ** 31 - 1  # ID/수량 컬럼(INT)의 최대값
+
 # ========================= MySQL 연결 및 설정 =========================
+def read_storage_config(filename='app.ini', section='storage'):
+    """ app.ini 파일의 [storage] 섹션에서 저장소 종류를 읽어오는 함수 (없으면 MySQL) """
+    config = ConfigParser()
+    config.read(filename)
+    return {
+        'backend': config.get(section, 'backend', fallback='mysql'),
+        'path': config.get(section, 'path', fallback='cvs.db'),
+    }
+
 def read_config(filename='app.ini', section='mysql'):    
     """ app.ini 파일에서 데이터베이스 연결 정보를 읽어오는 함수 """
     config = ConfigParser()
@@ -15,46 +44,470 @@ def read_config(filename='app.ini', section='mysql'):
         raise Exception(f'{section} section not found in the {filename} file')
     return data
 
-def connect():
-    """ MySQL 데이터베이스 연결 """
+def read_replica_configs(filename='app.ini', prefix='replica:', primary='mysql'):
+    """ app.ini 파일의 [replica:이름] 섹션들에서 복제본 접속 정보를 읽어오는 함수 → [(이름, 접속 정보)]
+
+    복제본 섹션에 없는 항목(database, user, password 등)은 [mysql] 값을 그대로 사용
+    """
+    config = ConfigParser()
+    config.read(filename)
+    base = dict(config.items(primary)) if config.has_section(primary) else {}
+    return [(section[len(prefix):], {**base, **dict(config.items(section))})
+            for section in config.sections() if section.startswith(prefix)]
+
+def read_routing_config(filename='app.ini', section='routing'):
+    """ app.ini 파일의 [routing] 섹션에서 복제본 라우팅 설정을 읽어오는 함수 (없으면 기본값) """
+    config = ConfigParser()
+    config.read(filename)
+    return {
+        'max_lag': config.getfloat(section, 'max_lag', fallback=5.0),
+        'check_interval': config.getfloat(section, 'check_interval', fallback=10.0),
+    }
+
+def read_pool_config(filename='app.ini', section='pool'):
+    """ app.ini 파일의 [pool] 섹션에서 커넥션 풀 설정을 읽어오는 함수 (없으면 기본값) """
+    config = ConfigParser()
+    config.read(filename)
+    options = {}
+    if config.has_section(section):
+        for key in ('pool_size', 'max_overflow', 'reconnect_attempts'):
+            if config.has_option(section, key):
+                options[key] = config.getint(section, key)
+        for key in ('pool_timeout', 'idle_timeout', 'reconnect_backoff'):
+            if config.has_option(section, key):
+                options[key] = config.getfloat(section, key)
+        if config.has_option(section, 'pre_ping'):
+            options['pre_ping'] = config.getboolean(section, 'pre_ping')
+    return options
+
+def read_cache_config(filename='app.ini', section='cache'):
+    """ app.ini 파일의 [cache] 섹션에서 참조 데이터 캐시 설정을 읽어오는 함수 (없으면 기본값) """
+    config = ConfigParser()
+    config.read(filename)
+    options = {}
+    if config.has_section(section):
+        if config.has_option(section, 'ttl'):
+            options['ttl'] = config.getfloat(section, 'ttl')
+        if config.has_option(section, 'max_rows'):
+            options['max_rows'] = config.getint(section, 'max_rows')
+        if config.has_option(section, 'search_limit'):
+            options['search_limit'] = config.getint(section, 'search_limit')
+        if config.has_option(section, 'connect_timeout'):
+            options['connect_timeout'] = config.getint(section, 'connect_timeout')
+    return options
+
+def read_receipt_config(filename='app.ini', section='receipts'):
+    """ app.ini 파일의 [receipts] 섹션에서 영수증 캐시 설정을 읽어오는 함수 (없으면 기본값) """
+    config = ConfigParser()
+    config.read(filename)
+    options = {}
+    if config.has_option(section, 'max_entries'):
+        options['max_entries'] = config.getint(section, 'max_entries')
+    return options
+
+def read_metrics_config(filename='app.ini', section='metrics'):
+    """ app.ini 파일의 [metrics] 섹션에서 쿼리 계측 설정을 읽어오는 함수 (섹션이 없으면 계측하지 않음) """
+    config = ConfigParser()
+    config.read(filename)
+    if not config.has_section(section) or not config.getboolean(section, 'enabled', fallback=True):
+        return None
+    return {
+        'slow_query_ms': config.getfloat(section, 'slow_query_ms', fallback=200.0),
+        'slow_log': config.get(section, 'slow_log', fallback='slow_query.log'),
+        'explain': config.getboolean(section, 'explain', fallback=False),
+        'port': config.getint(section, 'port', fallback=0),
+    }
+
+def read_replenish_config(filename='app.ini', section='replenish'):
+    """ app.ini 파일의 [replenish] 섹션에서 자동 발주 기준을 읽어오는 함수 (없는 항목은 기본값) """
+    config = ConfigParser()
+    config.read(filename)
+    return {
+        'window_days': config.getint(section, 'window_days', fallback=28),
+        'lead_time_days': config.getint(section, 'lead_time_days', fallback=3),
+        'safety_days': config.getint(section, 'safety_days', fallback=2),
+        'review_days': config.getint(section, 'review_days', fallback=7),
+        'pack_size': config.getint(section, 'pack_size', fallback=1),
+    }
+
+def read_journal_config(filename='app.ini', section='journal'):
+    """ app.ini 파일의 [journal] 섹션에서 로컬 판매 저널 설정을 읽어오는 함수 (섹션이 없으면 사용하지 않음) """
+    config = ConfigParser()
+    config.read(filename)
+    if not config.has_section(section) or not config.getboolean(section, 'enabled', fallback=True):
+        return None
+    return {
+        'path': config.get(section, 'path', fallback='sales_journal.db'),
+        'sync_interval': config.getfloat(section, 'sync_interval', fallback=2.0),
+        'batch_size': config.getint(section, 'batch_size', fallback=100),
+    }
+
+def read_archive_config(filename='app.ini', section='archive'):
+    """ app.ini 파일의 [archive] 섹션에서 월별 거래 보관 설정을 읽어오는 함수 (섹션이 없으면 사용하지 않음) """
+    config = ConfigParser()
+    config.read(filename)
+    if not config.has_section(section) or not config.getboolean(section, 'enabled', fallback=True):
+        return None
+    return {
+        'directory': config.get(section, 'directory', fallback='archive'),
+        'keep_months': config.getint(section, 'keep_months', fallback=3),
+    }
+
+def read_server_config(filename='app.ini', section='server'):
+    """ app.ini 파일의 [server] 섹션에서 POS 서버 설정을 읽어오는 함수 (없으면 기본값) """
+    config = ConfigParser()
+    config.read(filename)
+    return {
+        'host': config.get(section, 'host', fallback='127.0.0.1'),
+        'port': config.getint(section, 'port', fallback=9009),
+        'workers': config.getint(section, 'workers', fallback=8),
+        'writers': config.getint(section, 'writers', fallback=2),
+        'max_batch': config.getint(section, 'max_batch', fallback=32),
+        'max_wait_ms': config.getfloat(section, 'max_wait_ms', fallback=5.0),
+        'report_interval': config.getfloat(section, 'report_interval', fallback=10.0),
+        'max_pipeline': config.getint(section, 'max_pipeline', fallback=64),
+    }
+
+def read_cube_config(filename='app.ini', section='cube'):
+    """ app.ini 파일의 [cube] 섹션에서 매출 대시보드용 판매 큐브 설정을 읽어오는 함수 (섹션이 없으면 사용하지 않음) """
+    config = ConfigParser()
+    config.read(filename)
+    if not config.has_section(section) or not config.getboolean(section, 'enabled', fallback=True):
+        return None
+    return {
+        'days': config.getint(section, 'days', fallback=400),
+        'overlap': config.getint(section, 'overlap', fallback=1000),
+    }
+
+def connect(allow_offline=False):
+    """ 커넥션 풀 생성 (각 기능은 풀에서 커넥션을 빌려 쓰고 반납)
+
+    [storage] backend 가 sqlite 면 MySQL 서버 없이 path 의 SQLite 파일을 DB 로 사용
+    [replica:이름] 섹션이 있으면 조회를 복제본으로 나눠 보내는 ReplicaRouter 를 반환 (pool.reader() 로 조회용 풀을 얻음)
+    allow_offline: 시작 시 연결에 실패해도 풀을 반환 (로컬 저널 모드, 연결은 나중에 다시 시도)
+    """
     try:
-        print('Connecting to MySQL database...')
-        config = read_config()
-        conn = MySQLConnection(**config)
-        return conn
+        storage = read_storage_config()
+        print(f"Connecting to {'SQLite database ' + storage['path'] if storage['backend'] == 'sqlite' else 'MySQL database'}...")
+        metrics = None
+        metrics_config = read_metrics_config()
+        if metrics_config:
+            port = metrics_config.pop('port')
+            metrics = QueryMetrics(**metrics_config)
+            if port:
+                metrics.serve(port)  # http://127.0.0.1:<port>/metrics 로 수집
+        if storage['backend'] == 'sqlite':
+            pool = SQLitePool(storage['path'], metrics=metrics, **read_pool_config())
+        else:
+            pool = ConnectionPool(read_config(), metrics=metrics, **read_pool_config())
+            replica_configs = read_replica_configs()
+            if replica_configs:
+                pool = ReplicaRouter(pool, replica_configs, metrics=metrics, **read_routing_config(), **read_pool_config())
+        try:
+            pool.release(pool.acquire())  # 시작 시 연결 가능 여부 확인
+        except Error as error:
+            if not allow_offline:
+                raise
+            print(f"MySQL 에 연결할 수 없어 로컬 저널 모드로 시작합니다. ({error})")
+        return pool
     except Error as error:
         print(error)
         return None
 
+def show_pool_stats(pool):
+    """ 커넥션 풀 사용 통계 출력 """
+    stats = pool.stats()
+    print("\n=== 커넥션 풀 통계 ===")
+    print(f"열린 커넥션: {stats['opened']} (사용 중 {stats['in_use']}, 유휴 {stats['idle']})")
+    print(f"대여 횟수: {stats['checkouts']}, 반납 횟수: {stats['checkins']}")
+    print(f"평균 대기 시간: {stats['wait_time_avg'] * 1000:.2f} ms, 최대 대기 시간: {stats['wait_time_max'] * 1000:.2f} ms")
+    print(f"신규 연결: {stats['connects']}, 재연결: {stats['reconnects']}, 폐기: {stats['discards']}, 대기 초과: {stats['timeouts']}")
+    if isinstance(pool, ReplicaRouter):
+        routing = pool.replica_stats()
+        print(f"\n--- 복제본 (주 DB 에서 처리한 조회: {routing['primary_reads']}건) ---")
+        for replica in routing['replicas']:
+            state = '정상' if replica['healthy'] else f"제외 ({replica['error']})"
+            lag = '-' if replica['lag'] is None else f"{replica['lag']}초"
+            print(f"{replica['name']} ({replica['host']}): {state}, 복제 지연 {lag}, 조회 {replica['reads']}건")
+    print("-" * 50)
+
+def show_query_metrics(pool):
+    """ 쿼리별 실행 통계 출력 및 스냅샷(JSON/Prometheus) 파일 저장 """
+    if pool.metrics is None:
+        print("쿼리 계측이 꺼져 있습니다. app.ini 에 [metrics] 섹션을 추가하세요.")
+        return
+
+    snapshot = pool.metrics.snapshot()
+    print("\n=== 쿼리 실행 통계 (총 시간 순) ===")
+    print(f"{'기능.쿼리':<50} {'횟수':>7} {'행 수':>9} {'평균(ms)':>9} {'p95(ms)':>9} {'최대(ms)':>9}")
+    print("-" * 98)
+    for item in sorted(snapshot['statements'], key=lambda item: item['total_ms'], reverse=True):
+        name = f"{item['operation']}.{item['statement']}"
+        print(f"{name:<50} {item['count']:>7} {item['rows']:>9} {item['avg_ms']:>9.2f} {item['p95_ms']:>9.2f} {item['max_ms']:>9.2f}")
+    print("-" * 98)
+    print(f"느린 쿼리: {snapshot['slow_queries']}건 (기준 {pool.metrics.slow_query_ms:g} ms, 로그: {pool.metrics.slow_log})")
+
+    path = input("스냅샷을 저장할 파일 경로 (.json 또는 .prom, 엔터=건너뛰기) >>> ").strip()
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(pool.metrics.to_prometheus() if path.endswith('.prom') else pool.metrics.to_json())
+        print(f"{path} 에 저장했습니다.")
+
+def manage_ref_cache(cache, receipts):
+    """ 참조 데이터 캐시 / 영수증 캐시 통계 출력 및 수동 무효화 """
+    stats = cache.stats()
+    print("\n=== 참조 데이터 캐시 통계 ===")
+    print(f"적중: {stats['hits']}, 적재: {stats['misses']}, DB 직접 검색: {stats['bypasses']}, 적중률: {stats['hit_ratio']:.1%}")
+    print(f"무효화 횟수: {stats['invalidations']}, DB 장애로 만료된 사본 사용: {stats['stale']}")
+    for table, rows in stats['tables'].items():
+        print(f"  {table}: {rows}행 캐시됨")
+    stats = receipts.stats()
+    print(f"영수증 캐시: {stats['entries']}건 (적중 {stats['hits']}, 조회 {stats['misses']}, "
+          f"적중률 {stats['hit_ratio']:.1%}, 밀려남 {stats['evictions']})")
+    print("-" * 50)
+
+    table = input("무효화할 테이블 (store/supplier/employee/product, receipts=영수증, all=전체, 엔터=건너뛰기) >>> ").strip()
+    if table == "all":
+        cache.invalidate()
+        receipts.invalidate()
+        print("전체 캐시를 비웠습니다.")
+    elif table == "receipts":
+        receipts.invalidate()
+        print("영수증 캐시를 비웠습니다.")
+    elif table in REFERENCE_TABLES:
+        cache.invalidate(table)
+        print(f"{table} 캐시를 비웠습니다.")
+
+def show_journal_status(syncer):
+    """ 로컬 판매 저널 상태 (미반영/반영/실패 건수, 재고 충돌) 출력 및 즉시 반영 """
+    status = syncer.status()
+    counts = status['journal']
+    print("\n=== 로컬 판매 저널 ===")
+    print(f"미반영: {counts['pending']}, 반영: {counts['synced']}, 실패: {counts['failed']}, 재고 충돌: {counts['conflicts']}")
+    print(f"마지막 반영: {status['last_sync'] or '-'}, 마지막 오류: {status['last_error'] or '-'}")
+
+    conflicts = syncer.journal.conflicts()
+    if conflicts:
+        print("\n--- 재고가 부족한 상태로 반영된 판매 (재고는 0 으로 맞춤) ---")
+        for entry_id, transaction_id, created_at, items in conflicts:
+            details = ", ".join(
+                f"상품 ID {product_id}: 재고 {'미등록' if current is None else current}개, 판매 {quantity}개"
+                for product_id, current, quantity in items
+            )
+            print(f"{created_at} 거래 ID {transaction_id} ({entry_id}): {details}")
+
+    failures = syncer.journal.failures()
+    if failures:
+        print("\n--- 반영 실패 ---")
+        for entry_id, created_at, error in failures:
+            print(f"{created_at} {entry_id}: {error}")
+    print("-" * 50)
+
+    if failures and input("실패한 판매를 다시 반영 대기로 돌릴까요? (원인을 고친 뒤, y/N) >>> ").strip().lower() == 'y':
+        print(f"{syncer.journal.requeue_failed()}건을 다시 반영 대기로 돌렸습니다.")
+
+    if input("지금 서버에 반영할까요? (y/N) >>> ").strip().lower() == 'y':
+        try:
+            synced, conflicted, failed = syncer.sync_now()
+        except Error as error:
+            print(f"반영 중 오류 발생: {error}")
+            return
+        print(f"반영 {synced}건 (재고 충돌 {conflicted}건, 실패 {failed}건)")
+
+def choose_from_pages(pages, render, prompt):
+    """ 페이지 단위로 목록을 출력하고 번호를 선택받음 (엔터: 다음 페이지, q: 취소) → 선택한 행 또는 None """
+    idx = 0
+    for page in pages:
+        choices = {}  # 현재 페이지의 선택지만 보관
+        for row in page:
+            idx += 1
+            print(f"{idx}. {render(row)}")
+            choices[idx] = row
+
+        while True:
+            answer = input(prompt).strip()
+            if answer == "":
+                break
+            if answer == "q":
+                return None
+            try:
+                choice = int(answer)
+            except ValueError:
+                print(" 숫자로 입력하세요.")
+                continue
+            if choice in choices:
+                return choices[choice]
+            print(" 현재 페이지에 있는 번호를 입력하세요.")
+
+    print(" 더 이상 목록이 없습니다.")
+    return None
+
 # ========================= 1️ 발주 및 영수증 조회 =========================
-def place_order(conn):
-    """ 스토어에서 상품을 발주 (스토어 ID, 상품 ID, 수량 입력) """
-    store_id = int(input("스토어 ID 입력 >>> "))
-    product_id = int(input("상품 ID 입력 >>> "))
-    quantity = int(input("주문 수량 입력 >>> "))
+class UnknownProductError(ValueError):
+    """ 발주 품목 중 등록되지 않은 상품이 있을 때 발생하는 오류 """
+
+    def __init__(self, product_ids):
+        self.product_ids = product_ids
+        super().__init__("등록되지 않은 상품 ID: " + ", ".join(str(product_id) for product_id in product_ids))
+
+
+@track_operation()
+def create_purchase_order(pool, store_id, lines):
+    """ 여러 품목 발주 (상품의 공급업체별로 주문서 헤더를 하나씩 만들고 상세는 일괄 INSERT, 하나의 트랜잭션)
+
+    왕복 횟수는 품목 수와 무관하게 (공급업체 조회 1회 + 공급업체 수만큼 헤더 INSERT + 상세 INSERT 1회)
+    lines: [(상품 ID, 수량), ...] (같은 상품은 합침)
+    반환값: {공급업체 ID: 주문 ID}
+    """
+    items = merge_basket(lines)
+    if not items:
+        raise ValueError("발주 품목이 비어 있습니다.")
+
+    product_ids = list(items)
+    placeholders = ", ".join(["%s"] * len(product_ids))
+
+    with pool.connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                #  품목별 공급업체 조회
+                query = f"SELECT product_id, supplier_id FROM product WHERE product_id IN ({placeholders}) -- name: order_suppliers"
+                cursor.execute(query, product_ids)
+                suppliers = dict(cursor.fetchall())
+
+                missing = [product_id for product_id in product_ids if product_id not in suppliers]
+                if missing:
+                    raise UnknownProductError(missing)
+
+                #  공급업체별 주문서 헤더 추가 (입력 순서대로)
+                order_ids = {}
+                query = "INSERT INTO order_table (store_id, supplier_id, order_date, status) VALUES (%s, %s, NOW(), 'Pending') -- name: insert_order_header"
+                for product_id in product_ids:
+                    supplier_id = suppliers[product_id]
+                    if supplier_id not in order_ids:
+                        cursor.execute(query, (store_id, supplier_id))
+                        order_ids[supplier_id] = cursor.lastrowid
+
+                #  주문 상세 일괄 추가 (executemany → 다중 행 INSERT 한 번)
+                query = "INSERT INTO order_details (order_id, product_id, quantity) VALUES (%s, %s, %s) -- name: insert_order_details"
+                cursor.executemany(query, [
+                    (order_ids[suppliers[product_id]], product_id, quantity)
+                    for product_id, quantity in items.items()
+                ])
+            conn.commit()
+        except (Error, UnknownProductError):
+            conn.rollback()
+            raise
+
+    return order_ids
+
+
+@track_operation()
+def place_order(pool, cache):
+    """ 스토어에서 여러 상품을 한 번에 발주 (스토어 검색 → 품목 담기 → 공급업체별 주문서 생성) """
+    try:
+        #  스토어 검색 & 선택 (캐시 검색)
+        store_keyword = input("검색할 스토어명을 입력하세요 >>> ")
+        stores = cache.search('store', store_keyword)
+
+        if not stores:
+            print(" 검색된 스토어가 없습니다.")
+            return
+
+        print("\n=== 검색된 가맹점 목록 ===")
+        for store in stores:
+            print(f"ID: {store[0]}, 매장명: {store[1]}")
 
-    query = "INSERT INTO order_details (order_id, product_id, quantity) VALUES (%s, %s, %s)"
-    args = (store_id, product_id, quantity)
+        store_id = int(input("스토어 ID를 선택하세요 >>> "))
 
-    with conn.cursor() as cursor:
-        cursor.execute(query, args)
-    conn.commit()
+        #  발주 품목 담기 (상품 캐시 검색 & 선택, 빈 입력 시 종료)
+        lines = []
+        while True:
+            product_keyword = input("검색할 상품명을 입력하세요 (엔터 입력 시 담기 종료) >>> ").strip()
+            if not product_keyword:
+                break
 
-    print("발주가 완료되었습니다!")
+            products = cache.search('product', product_keyword)
+
+            if not products:
+                print(" 검색된 상품이 없습니다.")
+                continue
+
+            print("\n=== 검색된 상품 목록 ===")
+            for product in products:
+                print(f"ID: {product[0]}, 상품명: {product[1]}, 가격: {product[2]}원")
+
+            product_id = int(input("상품 ID를 선택하세요 >>> "))
+            quantity = int(input("주문 수량 입력 >>> "))
+            lines.append((product_id, quantity))
+            print(f" 발주 목록에 담았습니다. (현재 {len(lines)}개 품목)")
+
+        if not lines:
+            print(" 발주 품목이 없습니다.")
+            return
+
+        try:
+            order_ids = create_purchase_order(pool, store_id, lines)
+        except ValueError as error:
+            print(f" {error}")
+            return
+
+        print(f"발주가 완료되었습니다! (주문서 {len(order_ids)}건)")
+        for supplier_id, order_id in order_ids.items():
+            print(f" 공급업체 ID {supplier_id}: 주문 ID {order_id}")
+
+    except Error as error:
+        print(f" 발주 처리 중 오류 발생: {error}")
 
 from datetime import datetime
 
-def get_order_receipt(conn):
-    """ 주문 상세 영수증 조회 (가게 검색 → 공급업체 검색 & 선택 → 주문 목록 출력 → 상세 조회) """
+@track_operation()
+def order_pages(pool, store_id, supplier_id, page_size=PAGE_SIZE):
+    """ 가게 & 공급업체의 주문 목록 (최신순, (주문일자, 주문 ID) keyset 페이지 제너레이터) """
+    query = """
+        SELECT 
+            o.order_id, 
+            o.order_date, 
+            o.status
+        FROM order_table o
+        WHERE o.store_id = %s AND o.supplier_id = %s {after}
+        ORDER BY o.order_date DESC, o.order_id DESC
+        LIMIT %s
+    """
+    return keyset_pages(pool, query, (store_id, supplier_id), ('o.order_date', 'o.order_id'), (1, 0),
+                        page_size=page_size, descending=True)
+
+
+def print_order_receipt(receipt):
+    """ 주문 영수증 (헤더 + 품목) 출력 """
+    if receipt is None:
+        print("해당 주문의 상세 정보를 찾을 수 없습니다.")
+        return
+    print("\n=== 주문 상세 영수증 ===")
+    print(f"주문 ID: {receipt['order_id']}")
+    print(f"주문일자: {receipt['order_date']}")
+    print(f"상태: {receipt['status']}")
+    print(f"가게: {receipt['store_name']}")
+    print(f"공급업체: {receipt['supplier_name']}")
+    for product_id, name, quantity in receipt['lines']:
+        print(f"  {name} (ID {product_id}) x {quantity}")
+    print(f"총 수량: {receipt['total_quantity']}")
+    print("-" * 50)  # 가독성을 위한 구분선
+
+
+@track_operation()
+def get_order_receipt(pool, cache, receipts):
+    """ 주문 상세 영수증 조회 (주문 ID 직접 입력, 또는 가게 검색 → 공급업체 검색 & 선택 → 주문 목록 출력 → 상세 조회) """
+
+    #   주문 ID 를 알면 바로 조회 (재출력)
+    order_id = input("주문 ID를 입력하세요 (엔터: 가게/공급업체로 검색) >>> ").strip()
+    if order_id:
+        print_order_receipt(receipts.order(int(order_id)))
+        return
 
-    #   가게 이름 검색 (LIKE 검색)
+    #   가게 이름 검색 (캐시 검색)
     store_keyword = input("검색할 가게명을 입력하세요 (예: 'GS' 입력 시 GS25 검색) >>> ").strip()
 
-    query = "SELECT store_id, name FROM store WHERE name LIKE %s"
-    param = (f"%{store_keyword}%",)
-    with conn.cursor() as cursor:
-        cursor.execute(query, param)
-        stores = cursor.fetchall()
+    stores = cache.search('store', store_keyword)
 
     if not stores:
         print("검색된 가게가 없습니다.")
@@ -66,14 +519,10 @@ def get_order_receipt(conn):
 
     store_id = int(input("스토어 ID를 선택하세요 >>> "))
 
-    #   공급업체 이름 검색 (LIKE 검색)
+    #   공급업체 이름 검색 (캐시 검색)
     supplier_keyword = input("검색할 공급업체명을 입력하세요 (예: '농심' 입력 시 농심 검색) >>> ").strip()
 
-    query = "SELECT supplier_id, name FROM supplier WHERE name LIKE %s"
-    param = (f"%{supplier_keyword}%",)
-    with conn.cursor() as cursor:
-        cursor.execute(query, param)
-        suppliers = cursor.fetchall()
+    suppliers = cache.search('supplier', supplier_keyword)
 
     if not suppliers:
         print(" 검색된 공급업체가 없습니다.")
@@ -96,88 +545,54 @@ def get_order_receipt(conn):
         except ValueError:
             print(" 숫자로 입력하세요.")
 
-    #   선택한 가게 & 공급업체 관련 주문 목록 출력
-    query = """
-        SELECT 
-            o.order_id, 
-            o.order_date, 
-            o.status
-        FROM order_table o
-        WHERE o.store_id = %s AND o.supplier_id = %s
-        ORDER BY o.order_date DESC
-    """
-
-    with conn.cursor() as cursor:
-        cursor.execute(query, (store_id, supplier_id))
-        orders = cursor.fetchall()
+    #   선택한 가게 & 공급업체 관련 주문 목록 출력 (최신순, (주문일자, 주문 ID) keyset 페이지)
+    pages = order_pages(pool, store_id, supplier_id)
+    first_page = next(pages, None)
 
-    if not orders:
+    if not first_page:
         print(" 해당 가게가 해당 공급업체에서 발주한 주문이 없습니다.")
         return
 
     print("\n=== 주문 목록 ===")
-    order_dict = {}
-    for idx, order in enumerate(orders, start=1):
-        print(f"{idx}. 주문 ID: {order[0]}, 주문일자: {order[1]}, 상태: {order[2]}")
-        order_dict[idx] = order[0]  # 주문 선택을 위해 딕셔너리 저장
+    order = choose_from_pages(
+        chain([first_page], pages),
+        lambda order: f"주문 ID: {order[0]}, 주문일자: {order[1]}, 상태: {order[2]}",
+        "상세 조회할 주문 번호를 입력하세요 (엔터: 다음 페이지, q: 취소) >>> ",
+    )
+    if order is None:
+        return
+    order_id = order[0]
 
-    while True:
-        try:
-            order_choice = int(input("상세 조회할 주문 번호를 입력하세요 >>> "))
-            if order_choice in order_dict:
-                order_id = order_dict[order_choice]
-                break
-            else:
-                print(" 잘못된 입력입니다. 다시 선택하세요.")
-        except ValueError:
-            print(" 숫자로 입력하세요.")
+    #  선택한 주문 ID에 대한 상세 영수증 출력 (배송 완료 주문은 영수증 캐시에서)
+    print_order_receipt(receipts.order(order_id))
 
-    #  선택한 주문 ID에 대한 상세 영수증 출력
+# ========================= 2️ 가맹점별 재고 조회 및 업데이트 =========================
+@track_operation()
+def inventory_pages(pool, store_id, page_size=PAGE_SIZE):
+    """ 가게의 재고 목록 (상품명 순, 상품명 keyset 페이지 제너레이터) """
     query = """
         SELECT 
-            o.order_id,
-            o.order_date, 
-            s.name AS store_name,
-            sp.name AS supplier_name,
-            GROUP_CONCAT(p.name SEPARATOR ', ') AS product_names,  -- 상품명을 한 줄로 출력
-            SUM(od.quantity) AS total_quantity
-        FROM order_table o
-        JOIN order_details od ON o.order_id = od.order_id
-        JOIN product p ON od.product_id = p.product_id
-        JOIN store s ON o.store_id = s.store_id
-        JOIN supplier sp ON o.supplier_id = sp.supplier_id
-        WHERE o.order_id = %s
-        GROUP BY o.order_id, o.order_date, s.name, sp.name
+            p.name AS product_name,
+            p.category,
+            s.quantity,
+            s.last_updated
+        FROM stock s
+        JOIN product p ON s.product_id = p.product_id
+        WHERE s.store_id = %s {after}
+        ORDER BY p.name ASC
+        LIMIT %s
     """
+    return keyset_pages(pool, query, (store_id,), ('p.name',), (0,), page_size=page_size)
 
-    with conn.cursor() as cursor:
-        cursor.execute(query, (order_id,))
-        row = cursor.fetchone()
-
-    if row:
-        print("\n=== 주문 상세 영수증 ===")
-        print(f"주문 ID: {row[0]}")
-        print(f"주문일자: {row[1]}")
-        print(f"가게: {row[2]}")
-        print(f"공급업체: {row[3]}")
-        print(f"상품명: {row[4]}")
-        print(f"총 수량: {row[5]}")
-        print("-" * 50)  # 가독성을 위한 구분선
-    else:
-        print("해당 주문의 상세 정보를 찾을 수 없습니다.")
 
-# ========================= 2️ 가맹점별 재고 조회 및 업데이트 =========================
-def get_store_inventory(conn):
+@track_operation()
+def get_store_inventory(pool, cache):
     """ 가게 이름으로 검색 후 선택하여 해당 가게의 재고 목록 출력 """
 
-    # 가게 이름 검색 (LIKE 검색)
+    # 가게 이름 검색 (캐시 검색)
     store_keyword = input("검색할 가게명을 입력하세요 (예: 'GS' 입력 시 GS25 검색) >>> ").strip()
 
-    query = "SELECT store_id, name FROM store WHERE name LIKE %s"
-    param = (f"%{store_keyword}%",)
-    with conn.cursor() as cursor:
-        cursor.execute(query, param)
-        stores = cursor.fetchall()
+    stores = cache.search('store', store_keyword)
 
     if not stores:
         print("검색된 가게가 없습니다.")
@@ -189,24 +604,11 @@ def get_store_inventory(conn):
 
     store_id = int(input("스토어 ID를 선택하세요 >>> "))
 
-    # 선택한 가게의 재고 목록 출력
-    query = """
-        SELECT 
-            p.name AS product_name,
-            p.category,
-            s.quantity,
-            s.last_updated
-        FROM stock s
-        JOIN product p ON s.product_id = p.product_id
-        WHERE s.store_id = %s
-        ORDER BY p.name ASC
-    """
-
-    with conn.cursor() as cursor:
-        cursor.execute(query, (store_id,))
-        stocks = cursor.fetchall()
+    # 선택한 가게의 재고 목록 출력 (상품명 순, 상품명 keyset 페이지)
+    pages = inventory_pages(pool, store_id)
+    first_page = next(pages, None)
 
-    if not stocks:
+    if not first_page:
         print("해당 가게의 재고가 없습니다.")
         return
 
@@ -215,38 +617,280 @@ def get_store_inventory(conn):
     print("-------------------------------------------------")
     print("상품명 | 카테고리 | 수량 | 마지막 업데이트")
     print("-------------------------------------------------")
-    for stock in stocks:
-        print(f"{stock[0]} | {stock[1]} | {stock[2]} | {stock[3]}")
+    for page in chain([first_page], pages):
+        for stock in page:
+            print(f"{stock[0]} | {stock[1]} | {stock[2]} | {stock[3]}")
+        if len(page) == PAGE_SIZE and input("엔터: 다음 페이지, q: 종료 >>> ").strip() == "q":
+            break
     print("-------------------------------------------------")
 
 
-def update_stock_on_delivery(conn):
-    """ 주문 상태가 Delivered로 변경되면 재고 자동 추가 """
-    query = """
-        UPDATE stock st
-        JOIN order_details od ON st.product_id = od.product_id
-        JOIN order_table o ON od.order_id = o.order_id
-        SET st.quantity = st.quantity + od.quantity
-        WHERE o.status = 'Delivered'
+@track_operation()
+def apply_deliveries(pool, batch_size=500):
+    """ 아직 재고에 반영되지 않은 Delivered 주문만 (매장, 상품) 단위로 재고에 반영 (재실행해도 중복 반영 없음)
+
+    주문마다 stock_applied_at 표시를 남기므로 실행 시간은 새로 배송된 주문 수에만 비례함
+    반환값: (반영한 주문 수, 변경된 재고 행 수)
     """
+    applied_orders = 0
+    touched_rows = 0
 
-    with conn.cursor() as cursor:
-        cursor.execute(query)
-    conn.commit()
-    
-    print("재고가 업데이트되었습니다!")
+    while True:
+        with pool.connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    #  미반영 배송 주문을 배치 크기만큼 잠금 (다른 실행기가 잡은 주문은 건너뜀)
+                    query = """
+                        SELECT order_id
+                        FROM order_table
+                        WHERE status = 'Delivered' AND stock_applied_at IS NULL
+                        ORDER BY order_id
+                        LIMIT %s
+                        FOR UPDATE SKIP LOCKED
+                    """
+                    cursor.execute(query, (batch_size,))
+                    order_ids = [row[0] for row in cursor.fetchall()]
+
+                    if not order_ids:
+                        conn.commit()
+                        break
+
+                    placeholders = ", ".join(["%s"] * len(order_ids))
+                    query = f"""
+                        SELECT o.store_id, od.product_id, SUM(od.quantity) AS quantity
+                        FROM order_table o
+                        JOIN order_details od ON o.order_id = od.order_id
+                        WHERE o.order_id IN ({placeholders})
+                        GROUP BY o.store_id, od.product_id
+                    """
+                    cursor.execute(query, order_ids)
+                    delivered = cursor.fetchall()
+
+                    #  (매장, 상품) 유일 인덱스로 이미 있는 재고 행은 수량 증가, 없으면 새로 추가
+                    #  (확인 후 추가하면 동시에 실행한 다른 반영과 같은 행을 두 번 만들 수 있음)
+                    query = """
+                        INSERT INTO stock (store_id, product_id, quantity) VALUES (%s, %s, %s)
+                        ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)
+                    """
+                    cursor.executemany(query, delivered)
+                    touched_rows += len(delivered)
+
+                    #  반영 완료 표시
+                    query = f"UPDATE order_table SET stock_applied_at = NOW() WHERE order_id IN ({placeholders})"
+                    cursor.execute(query, order_ids)
+
+                conn.commit()
+            except Error:
+                conn.rollback()
+                raise
+
+        applied_orders += len(order_ids)
+        if len(order_ids) < batch_size:
+            break
+
+    return applied_orders, touched_rows
+
+
+@track_operation()
+def update_stock_on_delivery(pool):
+    """ 주문 상태가 Delivered로 변경되면 재고 자동 추가 (새로 배송된 주문만 반영) """
+    try:
+        applied_orders, touched_rows = apply_deliveries(pool)
+    except Error as error:
+        print(f"재고 업데이트 중 오류 발생: {error}")
+        return
+
+    if applied_orders == 0:
+        print("새로 반영할 배송 완료 주문이 없습니다.")
+    else:
+        print(f"재고가 업데이트되었습니다! (주문 {applied_orders}건, 재고 {touched_rows}행)")
 
 # ========================= 3️ 거래 및 영수증 조회 =========================
-def process_transaction(conn):
-    """ 고객이 상품을 구매하면 거래(판매) 등록 (스토어, 직원, 상품 LIKE 검색 & 결제 방식 선택 포함) """
+class StockShortageError(Exception):
+    """ 장바구니 상품 중 재고가 없거나 부족한 상품이 있을 때 발생하는 오류 """
+
+    def __init__(self, shortages):
+        self.shortages = shortages  # [(상품 ID, 현재 재고, 요청 수량)], 미등록 상품은 현재 재고 None
+        details = []
+        for product_id, current, requested in shortages:
+            if current is None:
+                details.append(f"상품 ID {product_id}: 이 매장에 등록되지 않음")
+            else:
+                details.append(f"상품 ID {product_id}: 현재 재고 {current}개, 요청 수량 {requested}개")
+        super().__init__("재고 부족! " + ", ".join(details))
+
+
+def to_int(value, label):
+    """ 외부 입력(JSON 등)의 ID/수량을 1 ~ MAX_INT 정수로 변환 (정수가 아니거나 범위를 벗어나면 ValueError) """
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError(f"{label}은(는) 정수여야 합니다: {value!r}")
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{label}은(는) 정수여야 합니다: {value!r}") from None
+    if not 1 <= number <= MAX_INT:
+        raise ValueError(f"{label}은(는) 1 ~ {MAX_INT} 사이여야 합니다: {number}")
+    return number
+
+
+def merge_basket(lines):
+    """ 장바구니의 (상품 ID, 수량) 목록에서 같은 상품을 합침 (입력 순서 유지, ID/수량은 정수로 변환) """
+    merged = {}
+    for line in lines:
+        try:
+            product_id, quantity = line
+        except (TypeError, ValueError):
+            raise ValueError(f"장바구니 항목은 (상품 ID, 수량) 이어야 합니다: {line!r}") from None
+        product_id = to_int(product_id, "상품 ID")
+        try:
+            quantity = to_int(quantity, f"상품 ID {product_id}의 수량")
+        except ValueError:
+            raise ValueError(f"상품 ID {product_id}의 수량은 1개 이상의 정수여야 합니다.") from None
+        merged[product_id] = merged.get(product_id, 0) + quantity
+        if merged[product_id] > MAX_INT:
+            raise ValueError(f"상품 ID {product_id}의 수량이 너무 큽니다.")
+    return merged
+
+
+def _decrement_stock(cursor, store_id, basket):
+    """ 재고가 충분한 행만 한 문장에서 조건부로 감소시키고, 모든 상품이 감소됐는지 반환
+
+    확인과 감소가 같은 UPDATE 안에서 일어나므로 동시에 결제해도 재고가 음수가 되지 않음
+    """
+    # 정렬은 같은 장바구니의 바인딩 값을 일정하게 하려는 것일 뿐, 행 잠금 순서는 IN 목록 순서가 아니라
+    # 옵티마이저가 고른 인덱스를 읽는 순서를 따름
+    product_ids = sorted(basket)
+    placeholders = ", ".join(["%s"] * len(product_ids))
+    cases = " ".join(["WHEN %s THEN %s"] * len(product_ids))
+    query = f"""
+        -- name: decrement_stock
+        UPDATE stock
+        SET quantity = quantity - CASE product_id {cases} END
+        WHERE store_id = %s AND product_id IN ({placeholders})
+          AND quantity >= CASE product_id {cases} END
+    """
+    args = [value for product_id in product_ids for value in (product_id, basket[product_id])]
+    cursor.execute(query, (*args, store_id, *product_ids, *args))
+    return cursor.rowcount == len(product_ids)
+
+
+def find_shortages(pool, store_id, basket):
+    """ 조건부 감소가 실패했을 때 어떤 상품이 부족한지 조회 (잠금 없는 읽기) """
+    placeholders = ", ".join(["%s"] * len(basket))
+    with pool.connection() as conn, conn.cursor() as cursor:
+        query = f"SELECT product_id, quantity FROM stock WHERE store_id = %s AND product_id IN ({placeholders})"
+        cursor.execute(query, (store_id, *basket))
+        current = dict(cursor.fetchall())
+    return [
+        (product_id, current.get(product_id), quantity)
+        for product_id, quantity in basket.items()
+        if current.get(product_id) is None or current[product_id] < quantity
+    ]
+
+
+def apply_sale(cursor, store_id, employee_id, payment_method, basket):
+    """ 현재 트랜잭션 안에서 판매 한 건 기록 (커밋/롤백은 호출한 쪽에서)
+
+    재고가 부족하면 None (재고 감소가 일부 적용됐을 수 있으므로 호출한 쪽에서 롤백)
+    반환값: (거래 ID, {상품 ID: 남은 재고})
+    """
+    product_ids = list(basket)
+    placeholders = ", ".join(["%s"] * len(product_ids))
+
+    #  재고 조건부 일괄 감소 (재고 행 잠금은 이 문장부터 커밋까지만 유지)
+    if not _decrement_stock(cursor, store_id, basket):
+        return None
+
+    #  감소 후 남은 재고와 가격 조회 (재고 행은 이미 이 트랜잭션이 잠근 상태)
+    query = f"""
+        -- name: stock_after
+        SELECT s.product_id, s.quantity, p.price
+        FROM stock s
+        JOIN product p ON s.product_id = p.product_id
+        WHERE s.store_id = %s AND s.product_id IN ({placeholders})
+    """
+    cursor.execute(query, (store_id, *product_ids))
+    remaining = {}
+    prices = {}
+    for product_id, quantity, price in cursor.fetchall():
+        remaining[product_id] = quantity
+        prices[product_id] = price
+
+    #  판매 시점 단가로 소계와 총액을 확정 (이후 가격이 바뀌어도 거래 금액은 그대로)
+    subtotals = {product_id: prices[product_id] * quantity for product_id, quantity in basket.items()}
+    total_sales = sum(subtotals.values())
+
+    #  거래 추가
+    query = "INSERT INTO transaction (store_id, employee_id, transaction_date, total_amount, payment_method) VALUES (%s, %s, NOW(), %s, %s) -- name: insert_header"
+    cursor.execute(query, (store_id, employee_id, total_sales, payment_method))
+    transaction_id = cursor.lastrowid
+
+    #  거래 상세 일괄 추가 (executemany → 다중 행 INSERT 한 번)
+    query = "INSERT INTO transaction_details (transaction_id, product_id, quantity, unit_price, subtotal) VALUES (%s, %s, %s, %s, %s) -- name: insert_details"
+    cursor.executemany(query, [
+        (transaction_id, product_id, quantity, prices[product_id], subtotals[product_id])
+        for product_id, quantity in basket.items()
+    ])
+
+    #  직원별 월간 판매 집계 갱신 (판매왕 조회용)
+    add_sale_to_rollup(cursor, transaction_id, total_sales, sum(basket.values()))
+    return transaction_id, remaining
+
+
+def _checkout_once(conn, store_id, employee_id, payment_method, basket):
+    """ 결제 한 번 시도 (성공하면 커밋, 실패하면 롤백 후 오류를 그대로 올림) """
     try:
-        # 1️ **스토어 검색 & 선택 (LIKE 검색)**
-        store_keyword = input("검색할 스토어명을 입력하세요 >>> ")
-        query = "SELECT store_id, name FROM store WHERE name LIKE %s"
-        param = (f"%{store_keyword}%",)
         with conn.cursor() as cursor:
-            cursor.execute(query, param)
-            stores = cursor.fetchall()
+            result = apply_sale(cursor, store_id, employee_id, payment_method, basket)
+        if result is None:
+            conn.rollback()
+            return None
+        conn.commit()
+    except Error:
+        conn.rollback()
+        raise
+    return result
+
+
+@track_operation()
+def checkout(pool, store_id, employee_id, payment_method, lines, retries=3, backoff=0.05):
+    """ 장바구니 결제 (재고 조건부 일괄 UPDATE 1회, 상세 일괄 INSERT 1회를 하나의 트랜잭션으로 처리)
+
+    - 재고 확인을 따로 읽지 않고 UPDATE ... WHERE quantity >= 요청 수량 으로 처리하므로 초과 판매가 없음
+    - 데드락/잠금 대기 시간 초과는 retries 번까지 지수 백오프(+지터) 후 재시도
+    - 단가, 소계, 총액은 결제 시점 가격으로 저장하므로 조회할 때 product 가격을 다시 조인하지 않음
+    lines: [(상품 ID, 수량), ...]
+    반환값: (거래 ID, {상품 ID: 남은 재고})
+    """
+    basket = merge_basket(lines)
+    if not basket:
+        raise ValueError("장바구니가 비어 있습니다.")
+
+    for attempt in range(retries + 1):
+        try:
+            with pool.connection() as conn:
+                result = _checkout_once(conn, store_id, employee_id, payment_method, basket)
+        except Error as error:
+            if error.errno not in RETRYABLE_ERRORS or attempt == retries:
+                raise
+            time.sleep(backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+            continue
+
+        if result is None:
+            raise StockShortageError(find_shortages(pool, store_id, basket))
+        return result
+
+
+@track_operation()
+def process_transaction(pool, cache, journal=None):
+    """ 고객이 상품을 구매하면 거래(판매) 등록 (스토어, 직원, 상품 검색 & 결제 방식 선택 포함)
+
+    journal 이 있으면 로컬 저널에 기록하고 바로 완료 (MySQL 반영과 재고 확인은 백그라운드 동기화에서 처리)
+    """
+    try:
+        # 1️ **스토어 검색 & 선택 (캐시 검색)**
+        store_keyword = input("검색할 스토어명을 입력하세요 >>> ")
+        stores = cache.search('store', store_keyword)
 
         if not stores:
             print(" 검색된 스토어가 없습니다.")
@@ -258,13 +902,9 @@ def process_transaction(conn):
 
         store_id = int(input("스토어 ID를 선택하세요 >>> "))
 
-        # 2️ **직원 검색 & 선택 (LIKE 검색)**
+        # 2️ **직원 검색 & 선택 (캐시 검색)**
         employee_keyword = input("검색할 직원 이름을 입력하세요 >>> ")
-        query = "SELECT employee_id, name FROM employee WHERE store_id = %s AND name LIKE %s"
-        param = (store_id, f"%{employee_keyword}%")
-        with conn.cursor() as cursor:
-            cursor.execute(query, param)
-            employees = cursor.fetchall()
+        employees = cache.search('employee', employee_keyword, store_id=store_id)
 
         if not employees:
             print(" 해당 매장에 검색된 직원이 없습니다.")
@@ -276,39 +916,30 @@ def process_transaction(conn):
 
         employee_id = int(input("직원 ID를 선택하세요 >>> "))
 
-        # 3️ **상품 검색 & 선택 (LIKE 검색)**
-        product_keyword = input("검색할 상품명을 입력하세요 >>> ")
-        query = "SELECT product_id, name, price FROM product WHERE name LIKE %s"
-        param = (f"%{product_keyword}%",)
-        with conn.cursor() as cursor:
-            cursor.execute(query, param)
-            products = cursor.fetchall()
-
-        if not products:
-            print(" 검색된 상품이 없습니다.")
-            return
-
-        print("\n=== 검색된 상품 목록 ===")
-        for product in products:
-            print(f"ID: {product[0]}, 상품명: {product[1]}, 가격: {product[2]}원")
+        # 3️ **장바구니 담기 (상품 캐시 검색 & 선택, 빈 입력 시 종료)**
+        basket = []
+        while True:
+            product_keyword = input("검색할 상품명을 입력하세요 (엔터 입력 시 담기 종료) >>> ").strip()
+            if not product_keyword:
+                break
 
-        product_id = int(input("상품 ID를 선택하세요 >>> "))
-        quantity = int(input("구매 수량 입력 >>> "))
+            products = cache.search('product', product_keyword)
 
-        #  **현재 재고 확인**
-        query = "SELECT quantity FROM stock WHERE store_id = %s AND product_id = %s"
-        with conn.cursor() as cursor:
-            cursor.execute(query, (store_id, product_id))
-            stock_data = cursor.fetchone()
+            if not products:
+                print(" 검색된 상품이 없습니다.")
+                continue
 
-        if not stock_data:
-            print(" 해당 상품이 이 매장에 등록되지 않았습니다.")
-            return
+            print("\n=== 검색된 상품 목록 ===")
+            for product in products:
+                print(f"ID: {product[0]}, 상품명: {product[1]}, 가격: {product[2]}원")
 
-        current_stock = stock_data[0]
+            product_id = int(input("상품 ID를 선택하세요 >>> "))
+            quantity = int(input("구매 수량 입력 >>> "))
+            basket.append((product_id, quantity))
+            print(f" 장바구니에 담았습니다. (현재 {len(basket)}개 품목)")
 
-        if current_stock < quantity:
-            print(f" 재고 부족! 현재 재고: {current_stock}개, 요청 수량: {quantity}개")
+        if not basket:
+            print(" 장바구니가 비어 있습니다.")
             return
 
         # 4️ **결제 방식 선택**
@@ -331,44 +962,93 @@ def process_transaction(conn):
             print(" 잘못된 입력입니다. 기본값(카드)으로 설정합니다.")
             payment_method = "Card"
 
-        #  거래 추가 (결제 방식 반영)
-        with conn.cursor() as cursor:
-            query = "INSERT INTO transaction (store_id, employee_id, transaction_date, payment_method) VALUES (%s, %s, NOW(), %s)"
-            args = (store_id, employee_id, payment_method)
-            cursor.execute(query, args)
-            transaction_id = cursor.lastrowid  # 새로 삽입된 거래의 ID 가져오기
-
-            #  거래 상세 추가
-            query = "INSERT INTO transaction_details (transaction_id, product_id, quantity) VALUES (%s, %s, %s)"
-            args = (transaction_id, product_id, quantity)
-            cursor.execute(query, args)
-
-            #  재고 감소 (판매된 수량만큼 stock 감소)
-            query = "UPDATE stock SET quantity = quantity - %s WHERE store_id = %s AND product_id = %s"
-            args = (quantity, store_id, product_id)
-            cursor.execute(query, args)
-
-        conn.commit()  # 모든 변경사항을 DB에 반영
+        #  로컬 저널 모드: 캐시의 가격을 판매 시점 단가로 함께 기록
+        if journal is not None:
+            lines = []
+            for product_id, quantity in basket:
+                product = cache.get('product', product_id)
+                lines.append((product_id, quantity, product[2] if product else None))
+            try:
+                entry_id = journal.append(store_id, employee_id, payment_method, lines)
+            except ValueError as error:
+                print(f" {error}")
+                return
+            print(f" 거래가 접수되었습니다! (저널 번호: {entry_id}, 서버 반영은 백그라운드에서 진행)")
+            return
+
+        #  거래 등록 (재고 확인, 거래 추가, 상세 추가, 재고 감소를 하나의 트랜잭션으로 처리)
+        try:
+            transaction_id, remaining = checkout(pool, store_id, employee_id, payment_method, basket)
+        except (StockShortageError, ValueError) as error:
+            print(f" {error}")
+            return
+
         print(f" 거래가 성공적으로 완료되었습니다! (거래 ID: {transaction_id})")
-        print(f" 재고 감소 완료! {product_keyword} 남은 재고: {current_stock - quantity}개")
+        for product_id, left in remaining.items():
+            print(f" 재고 감소 완료! 상품 ID {product_id} 남은 재고: {left}개")
 
     except Error as error:
-        conn.rollback()  #  오류 발생 시 롤백
         print(f" 거래 처리 중 오류 발생: {error}")
 
 
-def get_transaction_receipt(conn):
-    """ 거래 상세 영수증 조회 (가게 검색 → 직원 검색 & 선택 → 직원이 처리한 거래 목록 → 거래 상세 조회) """
+@track_operation()
+def transaction_pages(pool, employee_id, page_size=PAGE_SIZE, archive=None):
+    """ 직원이 처리한 거래 목록 (최신순, (거래일자, 거래 ID) keyset 페이지 제너레이터)
+
+    archive 가 있으면 운영 테이블의 보관 경계 이후 거래를 먼저 보여주고, 그 이전은 필요한 달의 보관 파일에서 이어서 읽음
+    """
+    boundary = archive.boundary() if archive is not None else None
+    args = (employee_id,) if boundary is None else (employee_id, boundary)
+    boundary_filter = '' if boundary is None else 'AND t.transaction_date >= %s'
+    query = f"""
+        SELECT 
+            t.transaction_id, 
+            t.transaction_date, 
+            t.total_amount AS total_price
+        FROM transaction t
+        WHERE t.employee_id = %s {boundary_filter} {{after}}
+        ORDER BY t.transaction_date DESC, t.transaction_id DESC
+        LIMIT %s
+    """
+    pages = keyset_pages(pool, query, args, ('t.transaction_date', 't.transaction_id'), (1, 0),
+                         page_size=page_size, descending=True)
+    if boundary is None:
+        return pages
+    return chain(pages, archive.employee_pages(pool, employee_id, page_size))
+
+
+def print_transaction_receipt(receipt):
+    """ 거래 영수증 (헤더 + 품목) 출력 """
+    if receipt is None:
+        print("해당 거래의 상세 정보를 찾을 수 없습니다.")
+        return
+    print("\n=== 거래 상세 영수증 ===")
+    print(f"거래 ID: {receipt['transaction_id']}")
+    print(f"거래일자: {receipt['transaction_date']}")
+    print(f"가게: {receipt['store_name']}")
+    print(f"직원: {receipt['employee_name'] or '-'}")
+    for product_id, name, quantity, unit_price, subtotal in receipt['lines']:
+        print(f"  {name} (ID {product_id}) {unit_price}원 x {quantity} = {subtotal}원")
+    print(f"총 수량: {receipt['total_quantity']}")
+    print(f"총 결제 금액: {receipt['total_amount']} 원 ({receipt['payment_method']})")
+    print("-" * 50)  # 가독성을 위한 구분선
+
+
+@track_operation()
+def get_transaction_receipt(pool, cache, receipts, archive=None):
+    """ 거래 상세 영수증 조회 (거래 ID 직접 입력, 또는 가게 검색 → 직원 검색 & 선택 → 직원이 처리한 거래 목록 → 거래 상세 조회) """
+
+    # 거래 ID 를 알면 바로 조회 (재출력)
+    transaction_id = input("거래 ID를 입력하세요 (엔터: 가게/직원으로 검색) >>> ").strip()
+    if transaction_id:
+        print_transaction_receipt(receipts.transaction(int(transaction_id)))
+        return
 
     # 5
-    # 가게 이름 검색 (LIKE 검색)
+    # 가게 이름 검색 (캐시 검색)
     store_keyword = input("검색할 가게명을 입력하세요 (예: 'GS' 입력 시 GS25 검색) >>> ").strip()
 
-    query = "SELECT store_id, name FROM store WHERE name LIKE %s"
-    param = (f"%{store_keyword}%",)
-    with conn.cursor() as cursor:
-        cursor.execute(query, param)
-        stores = cursor.fetchall()
+    stores = cache.search('store', store_keyword)
 
     if not stores:
         print("검색된 가게가 없습니다.")
@@ -380,14 +1060,10 @@ def get_transaction_receipt(conn):
 
     store_id = int(input("스토어 ID를 선택하세요 >>> "))
 
-    # 직원 이름 검색 (LIKE 검색)
+    # 직원 이름 검색 (캐시 검색)
     employee_keyword = input("검색할 직원 이름을 입력하세요 (예: '철수' 입력 시 김철수 검색) >>> ").strip()
 
-    query = "SELECT employee_id, name FROM employee WHERE store_id = %s AND name LIKE %s"
-    param = (store_id, f"%{employee_keyword}%")
-    with conn.cursor() as cursor:
-        cursor.execute(query, param)
-        employees = cursor.fetchall()
+    employees = cache.search('employee', employee_keyword, store_id=store_id)
 
     if not employees:
         print("해당 매장에서 검색된 직원이 없습니다.")
@@ -410,104 +1086,130 @@ def get_transaction_receipt(conn):
         except ValueError:
             print("숫자로 입력하세요.")
 
-    # 해당 직원이 담당한 거래 목록 출력 (거래 ID - 거래일자 - 총 금액)
-    query = """
-        SELECT 
-            t.transaction_id, 
-            t.transaction_date, 
-            SUM(td.quantity * p.price) AS total_price
-        FROM transaction t
-        JOIN transaction_details td ON t.transaction_id = td.transaction_id
-        JOIN product p ON td.product_id = p.product_id
-        WHERE t.employee_id = %s
-        GROUP BY t.transaction_id, t.transaction_date
-        ORDER BY t.transaction_date DESC
-    """
-
-    with conn.cursor() as cursor:
-        cursor.execute(query, (employee_id,))
-        transactions = cursor.fetchall()
+    # 해당 직원이 담당한 거래 목록 출력 (거래 ID - 거래일자 - 총 금액, (거래일자, 거래 ID) keyset 페이지)
+    pages = transaction_pages(pool, employee_id, archive=archive)
+    first_page = next(pages, None)
 
-    if not transactions:
+    if not first_page:
         print("해당 직원이 처리한 거래가 없습니다.")
         return
 
     print("\n=== 해당 직원이 처리한 거래 목록 ===")
-    transaction_dict = {}
-    for idx, trans in enumerate(transactions, start=1):
-        print(f"{idx}. 거래 ID: {trans[0]}, 거래일자: {trans[1]}, 총 결제 금액: {trans[2]} 원")
-        transaction_dict[idx] = trans[0]  # 거래 선택을 위해 딕셔너리 저장
+    trans = choose_from_pages(
+        chain([first_page], pages),
+        lambda trans: f"거래 ID: {trans[0]}, 거래일자: {trans[1]}, 총 결제 금액: {trans[2]} 원",
+        "상세 조회할 거래 번호를 입력하세요 (엔터: 다음 페이지, q: 취소) >>> ",
+    )
+    if trans is None:
+        return
+    transaction_id = trans[0]
 
-    while True:
-        try:
-            transaction_choice = int(input("상세 조회할 거래 번호를 입력하세요 >>> "))
-            if transaction_choice in transaction_dict:
-                transaction_id = transaction_dict[transaction_choice]
-                break
-            else:
-                print("잘못된 입력입니다. 다시 선택하세요.")
-        except ValueError:
-            print("숫자로 입력하세요.")
+    # 선택한 거래 ID에 대한 상세 영수증 출력 (영수증 캐시에서)
+    print_transaction_receipt(receipts.transaction(transaction_id))
 
-    # 선택한 거래 ID에 대한 상세 영수증 출력
-    query = """
-        SELECT 
-            t.transaction_id,
-            t.transaction_date, 
-            s.name AS store_name,
-            e.name AS employee_name,
-            GROUP_CONCAT(p.name SEPARATOR ', ') AS product_names,  -- 상품명을 한 줄로 출력
-            SUM(td.quantity) AS total_quantity, 
-            SUM(td.quantity * p.price) AS total_price
-        FROM transaction t
-        JOIN transaction_details td ON t.transaction_id = td.transaction_id
-        JOIN product p ON td.product_id = p.product_id
-        JOIN store s ON t.store_id = s.store_id
-        JOIN employee e ON t.employee_id = e.employee_id
-        WHERE t.transaction_id = %s
-        GROUP BY t.transaction_id, t.transaction_date, s.name, e.name
+
+def backfill_transaction_totals(pool, batch_size=1000):
+    """ 판매 시점 단가가 없는 기존 거래 상세(unit_price IS NULL)의 단가, 소계와 거래 총액을 채움 (재실행해도 안전)
+
+    과거 단가는 남아 있지 않으므로 현재 product 가격으로 채우며, 거래 ID 순서로 배치마다 커밋함
+    반환값: (보정한 거래 수, 보정한 상세 행 수)
     """
+    fixed_transactions = 0
+    fixed_details = 0
+    last_id = 0
+
+    while True:
+        with pool.connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    query = """
+                        SELECT DISTINCT transaction_id
+                        FROM transaction_details
+                        WHERE unit_price IS NULL AND transaction_id > %s
+                        ORDER BY transaction_id
+                        LIMIT %s
+                    """
+                    cursor.execute(query, (last_id, batch_size))
+                    transaction_ids = [row[0] for row in cursor.fetchall()]
+
+                    if not transaction_ids:
+                        conn.commit()
+                        break
+
+                    placeholders = ", ".join(["%s"] * len(transaction_ids))
+
+                    #  상세 행: 단가 스냅샷과 소계
+                    query = f"""
+                        UPDATE transaction_details td
+                        JOIN product p ON td.product_id = p.product_id
+                        SET td.unit_price = p.price, td.subtotal = td.quantity * p.price
+                        WHERE td.transaction_id IN ({placeholders}) AND td.unit_price IS NULL
+                    """
+                    cursor.execute(query, transaction_ids)
+                    fixed_details += cursor.rowcount
+
+                    #  거래 헤더: 소계 합계로 총액 재계산
+                    query = f"""
+                        UPDATE transaction t
+                        JOIN (
+                            SELECT transaction_id, SUM(subtotal) AS total_amount
+                            FROM transaction_details
+                            WHERE transaction_id IN ({placeholders})
+                            GROUP BY transaction_id
+                        ) d ON t.transaction_id = d.transaction_id
+                        SET t.total_amount = d.total_amount
+                    """
+                    cursor.execute(query, transaction_ids)
+                conn.commit()
+            except Error:
+                conn.rollback()
+                raise
+
+        fixed_transactions += len(transaction_ids)
+        last_id = transaction_ids[-1]
+
+    return fixed_transactions, fixed_details
+
+
+@track_operation()
+def backfill_totals(pool):
+    """ 기존 거래의 단가/소계/총액 보정 실행 """
+    try:
+        fixed_transactions, fixed_details = backfill_transaction_totals(pool)
+    except Error as error:
+        print(f"거래 금액 보정 중 오류 발생: {error}")
+        return
 
-    with conn.cursor() as cursor:
-        cursor.execute(query, (transaction_id,))
-        row = cursor.fetchone()
-
-    if row:
-        print("\n=== 거래 상세 영수증 ===")
-        print(f"거래 ID: {row[0]}")
-        print(f"거래일자: {row[1]}")
-        print(f"가게: {row[2]}")
-        print(f"직원: {row[3]}")
-        print(f"상품명: {row[4]}")
-        print(f"총 수량: {row[5]}")
-        print(f"총 결제 금액: {row[6]} 원")
-        print("-" * 50)  # 가독성을 위한 구분선
+    if fixed_transactions == 0:
+        print("보정할 거래가 없습니다.")
     else:
-        print("해당 거래의 상세 정보를 찾을 수 없습니다.")
+        print(f"거래 금액을 보정했습니다! (거래 {fixed_transactions}건, 상세 {fixed_details}행)")
+        print("판매 집계도 새 금액 기준으로 맞추려면 메뉴 10번에서 재구축하세요.")
 
 
 # ========================= 4️⃣ 직원 관리 =========================
-def get_top_employees(conn):
-    """ 가장 판매를 많이 한 직원 조회 (이달의 판매왕) """
-    query = """
-        SELECT e.employee_id, e.name, SUM(td.quantity * p.price) AS total_sales
-        FROM employee e
-        JOIN transaction t ON e.employee_id = t.employee_id
-        JOIN transaction_details td ON t.transaction_id = td.transaction_id
-        JOIN product p ON td.product_id = p.product_id
-        GROUP BY e.employee_id
-        ORDER BY total_sales DESC
-    """
+@track_operation()
+def get_top_employees(pool):
+    """ 가장 판매를 많이 한 직원 조회 (이달의 판매왕, 월간 판매 집계 테이블 사용) """
+    month_input = input("조회할 월을 입력하세요 (예: 2025-03, 엔터 입력 시 이번 달) >>> ").strip()
+    store_input = input("매장 ID를 입력하세요 (엔터 입력 시 전체 매장) >>> ").strip()
+    limit_input = input("조회할 순위 수를 입력하세요 (엔터 입력 시 10) >>> ").strip()
+
+    try:
+        month = month_start(month_input or None)
+        store_id = int(store_input) if store_input else None
+        limit = int(limit_input) if limit_input else 10
+    except ValueError:
+        print("잘못된 입력입니다.")
+        return
 
-    with conn.cursor() as cursor:
-        cursor.execute(query)
-        rows = cursor.fetchall()
+    rows = fetch_top_employees(pool, month, store_id, limit)
 
     if not rows:
         print("\n 판매 내역이 없습니다.")
         return
 
-    print("\n===  이달의 판매왕  ===")
+    print(f"\n===  이달의 판매왕 ({month:%Y-%m})  ===")
     print("----------------------------------------------------")
     print(f"{'순위':<5} {'직원 ID':<10} {'이름':<15} {'총 판매 금액'}")
     print("----------------------------------------------------")
@@ -520,35 +1222,201 @@ def get_top_employees(conn):
     print("----------------------------------------------------")
 
 
+@track_operation()
+def manage_sales_rollup(pool, archive=None):
+    """ 월간 판매 집계 재구축 및 원본 거래 데이터(보관된 거래 포함)와의 검증 """
+    action = input("1. 재구축, 2. 검증 >>> ").strip()
+    month_input = input("대상 월을 입력하세요 (예: 2025-03, 엔터 입력 시 전체 기간) >>> ").strip()
+    month = month_input or None
+
+    try:
+        if action == "1":
+            rebuilt = rebuild_sales_rollup(pool, month, archive)
+            print(f"판매 집계를 재구축했습니다. ({rebuilt}행)")
+        elif action == "2":
+            mismatches = verify_sales_rollup(pool, month, archive)
+            if not mismatches:
+                print("판매 집계가 원본 거래 데이터와 일치합니다.")
+                return
+            print("\n=== 불일치 항목 ===")
+            for sales_month, store_id, employee_id, rollup_sales, raw_sales in mismatches:
+                print(f"{sales_month} | 매장 ID: {store_id} | 직원 ID: {employee_id} | 집계: {rollup_sales:,} 원 | 원본: {raw_sales:,} 원")
+        else:
+            print("잘못된 입력입니다.")
+    except (Error, ValueError) as error:
+        print(f"판매 집계 처리 중 오류 발생: {error}")
+
+
+# ========================= 5️⃣ 매출 대시보드 =========================
+DASHBOARD_GROUPS = {"1": ('store', '매장'), "2": ('category', '카테고리'), "3": ('day', '일자'),
+                    "4": ('week', '주 (월요일)'), "5": ('month', '월')}
+
+
+@track_operation()
+def show_sales_dashboard(cube):
+    """ 매장/카테고리/일/주/월별 매출 (판매 큐브에 새 거래만 반영한 뒤 메모리에서 집계) """
+    try:
+        cube.refresh()
+    except Error as error:
+        print(f"판매 큐브 갱신 중 오류 발생: {error}")
+        if cube.origin is None:
+            return
+        print("마지막으로 반영한 데이터로 조회합니다.")
+
+    group = DASHBOARD_GROUPS.get(input("1. 매장별, 2. 카테고리별, 3. 일별, 4. 주별, 5. 월별 >>> ").strip())
+    days_input = input("조회 기간(일)을 입력하세요 (엔터 입력 시 최근 30일) >>> ").strip()
+    location = input("매장 위치 검색어를 입력하세요 (예: 서울, 엔터 입력 시 전체 매장) >>> ").strip()
+    category = input("카테고리를 입력하세요 (엔터 입력 시 전체) >>> ").strip()
+    try:
+        days = int(days_input) if days_input else 30
+    except ValueError:
+        days = 0
+    if group is None or days <= 0:
+        print("잘못된 입력입니다.")
+        return
+
+    end = date.today()
+    start = end - timedelta(days=days - 1)
+    filters = {'start': start, 'end': end, 'location': location or None, 'categories': [category] if category else None}
+    started = time.perf_counter()
+    revenue = cube.query(group[0], **filters)
+    quantity = dict(cube.query(group[0], measure='quantity', **filters))
+    elapsed = (time.perf_counter() - started) * 1000
+
+    if not revenue:
+        print("\n 판매 내역이 없습니다.")
+        return
+
+    print(f"\n=== {start} ~ {end} {group[1]}별 매출 ({elapsed:.1f}ms) ===")
+    print("----------------------------------------------------")
+    print(f"{group[1]:<20} {'매출 금액':>15} {'판매 수량':>10}")
+    print("----------------------------------------------------")
+    for key, total in revenue:
+        label = f"{cube.store_names.get(key, key)} (ID {key})" if group[0] == 'store' else key
+        print(f"{str(label):<20} {total:>13,} 원 {quantity.get(key, 0):>10,}")
+    print("----------------------------------------------------")
+    print(f"{'합계':<20} {sum(total for _, total in revenue):>13,} 원 {sum(quantity.values()):>10,}")
+
+
 # ========================= 실행 코드 =========================
 if __name__ == '__main__':
-    conn = connect()
+    journal_config = read_journal_config()
+    pool = connect(allow_offline=journal_config is not None)
+    if pool is None:
+        raise SystemExit(1)
+    reports = pool.reader()  # 이 단말의 영수증/재고 목록/판매왕 조회용 (복제본이 있으면 복제본으로)
+
+    # 월별 거래 보관을 켠 경우에만 보관 파일(NumPy 필요)을 함께 조회
+    archive = None
+    archive_config = read_archive_config()
+    if archive_config is not None:
+        from archive import TransactionArchive
+        archive = TransactionArchive(archive_config['directory'])
+    receipts = ReceiptCache(reports, archive=archive, **read_receipt_config())
+
+    # 매출 대시보드(판매 큐브, NumPy 필요)는 켠 경우에만 처음 조회할 때 만듦
+    cube = None
+    cube_config = read_cube_config()
+    if cube_config is not None:
+        from sales_cube import SalesCube
+        cube = SalesCube(pool, archive=archive, **cube_config)
+
+    # 스케줄러(cron 등)용 비대화식 실행: python cvs.py apply-deliveries
+    if len(sys.argv) > 1 and sys.argv[1] == 'apply-deliveries':
+        update_stock_on_delivery(pool)
+        pool.close()
+        raise SystemExit(0)
+
+    # 기존 거래 금액 보정 (unit_price 컬럼 추가 후 한 번): python cvs.py backfill-totals
+    if len(sys.argv) > 1 and sys.argv[1] == 'backfill-totals':
+        backfill_totals(pool)
+        pool.close()
+        raise SystemExit(0)
+
+    # 로컬 판매 저널에 쌓인 판매를 MySQL 에 반영: python cvs.py sync-journal [--retry-failed]
+    if len(sys.argv) > 1 and sys.argv[1] == 'sync-journal':
+        if journal_config is None:
+            print("app.ini 에 [journal] 섹션이 없습니다.")
+            raise SystemExit(1)
+        journal = SaleJournal(journal_config['path'])
+        if '--retry-failed' in sys.argv[2:]:
+            print(f"실패한 판매 {journal.requeue_failed()}건을 다시 반영합니다.")
+        try:
+            synced, conflicted, failed = JournalSyncer(pool, journal, batch_size=journal_config['batch_size']).sync_now()
+            print(f"반영 {synced}건 (재고 충돌 {conflicted}건, 실패 {failed}건)")
+        except Error as error:
+            print(f"반영 중 오류 발생: {error}")
+            raise SystemExit(1)
+        finally:
+            journal.close()
+            pool.close()
+        raise SystemExit(0)
+
+    # 로컬 저널 모드: 판매는 로컬 파일에 기록하고 백그라운드에서 MySQL 에 반영
+    journal = syncer = None
+    if journal_config is not None:
+        journal = SaleJournal(journal_config['path'])
+        syncer = JournalSyncer(pool, journal, journal_config['sync_interval'], journal_config['batch_size']).start()
+
+    # 참조 데이터 캐시 (로컬 저널 모드면 적재한 사본을 저널 파일에 보관하고 MySQL 에 연결할 수 없을 때 그 사본으로 검색)
+    cache = ReferenceCache(pool, backup=journal, **read_cache_config())
+    if journal is not None:
+        try:
+            cache.preload()  # 연결이 끊겨도 검색할 수 있도록 참조 데이터를 미리 적재
+        except Error as error:
+            print(f"참조 데이터를 불러오지 못했습니다. ({error})")
 
     while True:
         display = '''
 -------------------------------------------------------------
 1. 발주, 2. 주문 영수증 조회, 3. 재고 조회, 4. 재고 업데이트 (Delivered)
 5. 거래 등록, 6. 거래 영수증 조회, 7. 이달의 판매왕 조회, 8. 종료
+9. 커넥션 풀 통계, 10. 판매 집계 재구축/검증, 11. 참조 데이터 캐시, 12. 쿼리 실행 통계
+13. 로컬 판매 저널, 14. 매출 대시보드
 -------------------------------------------------------------
 메뉴를 선택하세요 >>> '''
         
         choice = input(display).strip()
+        if choice in ("1", "4", "5"):
+            reports.note_write()  # 발주/배송 반영/거래 직후의 조회는 잠시 주 DB 에서 (read-your-writes)
 
         if choice == "1":
-            place_order(conn)
+            place_order(pool, cache)
         elif choice == "2":
-            get_order_receipt(conn)
+            get_order_receipt(reports, cache, receipts)
         elif choice == "3":
-            get_store_inventory(conn)
+            get_store_inventory(reports, cache)
         elif choice == "4":
-            update_stock_on_delivery(conn)
+            update_stock_on_delivery(pool)
         elif choice == "5":
-            process_transaction(conn)
+            process_transaction(pool, cache, journal)
         elif choice == "6":
-            get_transaction_receipt(conn)
+            get_transaction_receipt(reports, cache, receipts, archive)
         elif choice == "7":
-            get_top_employees(conn)
+            get_top_employees(reports)
         elif choice == "8":
             print("프로그램을 종료합니다.")
-            conn.close()
+            if syncer is not None:
+                syncer.stop()  # 종료 전에 남은 판매를 한 번 더 반영 시도
+                journal.close()
+            cache.close()
+            pool.close()
             break
+        elif choice == "9":
+            show_pool_stats(pool)
+        elif choice == "10":
+            manage_sales_rollup(pool, archive)
+        elif choice == "11":
+            manage_ref_cache(cache, receipts)
+        elif choice == "12":
+            show_query_metrics(pool)
+        elif choice == "13":
+            if syncer is None:
+                print("로컬 판매 저널이 꺼져 있습니다. app.ini 에 [journal] 섹션을 추가하세요.")
+            else:
+                show_journal_status(syncer)
+        elif choice == "14":
+            if cube is None:
+                print("매출 대시보드가 꺼져 있습니다. app.ini 에 [cube] 섹션을 추가하세요.")
+            else:
+                show_sales_dashboard(cube)
@@ -0,0 +1,192 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from mysql.connector import MySQLConnection, Error, InterfaceError, OperationalError
+
+
+# ========================= 커넥션 풀 =========================
+class PoolTimeoutError(Error):
+    """ 정해진 시간 안에 커넥션을 빌리지 못했을 때 발생하는 오류 """
+
+
+class ConnectionPool:
+    """ MySQL 커넥션 풀 (대여/반납, 유휴 만료, pre-ping, 재연결 backoff, 통계)
+
+    다른 저장소는 _connect() 만 바꾼 하위 클래스로 제공 (sqlite_backend.SQLitePool)
+    """
+
+    dialect = 'mysql'  # 저장소별로 다른 SQL(스키마 조회 등)을 고를 때 사용
+
+    def __init__(self, db_config, pool_size=5, max_overflow=5, pool_timeout=30.0,
+                 idle_timeout=300.0, pre_ping=True, reconnect_attempts=3, reconnect_backoff=0.5, metrics=None):
+        self.db_config = dict(db_config)
+        self.metrics = metrics  # QueryMetrics (있으면 대여한 커넥션의 커서를 계측)
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.idle_timeout = idle_timeout
+        self.pre_ping = pre_ping
+        self.reconnect_attempts = reconnect_attempts
+        self.reconnect_backoff = reconnect_backoff
+
+        self._idle = deque()          # (conn, 마지막 반납 시각)
+        self._opened = 0              # 대여 중 + 유휴 커넥션 수
+        self._cond = threading.Condition()
+        self._stats = {
+            'checkouts': 0,
+            'checkins': 0,
+            'connects': 0,
+            'reconnects': 0,
+            'discards': 0,
+            'timeouts': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+        }
+
+    # ---------- 내부 처리 ----------
+    def _connect(self):
+        return MySQLConnection(**self.db_config)
+
+    def _open(self):
+        """ 새 커넥션 생성 (실패 시 지수 backoff 로 재시도) """
+        last_error = None
+        for attempt in range(max(1, self.reconnect_attempts)):
+            try:
+                conn = self._connect()
+                with self._cond:
+                    self._stats['connects'] += 1
+                return conn
+            except Error as error:
+                last_error = error
+                if attempt + 1 < self.reconnect_attempts:
+                    time.sleep(self.reconnect_backoff * (2 ** attempt))
+        raise last_error
+
+    def _is_alive(self, conn):
+        """ pre-ping: 서버와 연결이 살아있는지 확인 """
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Error:
+            return False
+
+    def _close_quietly(self, conn):
+        try:
+            conn.close()
+        except Error:
+            pass
+
+    # ---------- 대여 / 반납 ----------
+    def acquire(self):
+        """ 풀에서 커넥션 대여 (유휴 커넥션 우선, 없으면 새로 생성, 한도 초과 시 대기) """
+        started = time.monotonic()
+        deadline = started + self.pool_timeout
+        conn = None
+
+        with self._cond:
+            while True:
+                # 유휴 시간이 지난 커넥션은 정리
+                while self._idle:
+                    candidate, last_used = self._idle.pop()
+                    if time.monotonic() - last_used > self.idle_timeout:
+                        self._close_quietly(candidate)
+                        self._opened -= 1
+                        self._stats['discards'] += 1
+                        continue
+                    conn = candidate
+                    break
+                if conn is not None:
+                    break
+                if self._opened < self.pool_size + self.max_overflow:
+                    self._opened += 1  # 생성할 자리를 먼저 예약
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeoutError(msg=f'{self.pool_timeout}초 안에 커넥션을 얻지 못했습니다.')
+                self._cond.wait(remaining)
+
+        try:
+            if conn is None:
+                conn = self._open()
+            elif self.pre_ping and not self._is_alive(conn):
+                # 끊어진 커넥션은 버리고 새로 연결
+                self._close_quietly(conn)
+                conn = self._open()
+                with self._cond:
+                    self._stats['reconnects'] += 1
+        except Error:
+            with self._cond:
+                self._opened -= 1
+                self._cond.notify()
+            raise
+
+        waited = time.monotonic() - started
+        with self._cond:
+            self._stats['checkouts'] += 1
+            self._stats['wait_time_total'] += waited
+            self._stats['wait_time_max'] = max(self._stats['wait_time_max'], waited)
+        return conn
+
+    def release(self, conn, discard=False):
+        """ 커넥션 반납 (오류가 난 커넥션과 overflow 커넥션은 닫음) """
+        if not discard:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()  # 커밋되지 않은 작업은 다음 사용자에게 넘기지 않음
+            except Error:
+                discard = True
+
+        with self._cond:
+            self._stats['checkins'] += 1
+            if discard or self._opened > self.pool_size:
+                self._close_quietly(conn)
+                self._opened -= 1
+                if discard:
+                    self._stats['discards'] += 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """ with pool.connection() as conn: 형태로 대여 후 자동 반납 """
+        conn = self.acquire()
+        discard = False
+        try:
+            yield self.metrics.wrap(conn) if self.metrics else conn
+        except (InterfaceError, OperationalError):
+            discard = True  # 연결 자체의 문제이므로 풀에 되돌리지 않음
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    def reader(self):
+        """ 읽기 전용 조회에 쓸 풀 (복제본이 없으면 자기 자신, 복제본 라우팅은 replicas.ReplicaRouter) """
+        return self
+
+    def note_write(self):
+        """ 조회 풀에 쓰기를 알림 (복제본이 없으면 모든 조회가 주 DB 이므로 할 일 없음, replicas.ReadPool 참고) """
+
+    # ---------- 관리 ----------
+    def stats(self):
+        """ 풀 사용 통계 (풀 크기 조정용) """
+        with self._cond:
+            data = dict(self._stats)
+            data['opened'] = self._opened
+            data['idle'] = len(self._idle)
+            data['in_use'] = self._opened - len(self._idle)
+        checkouts = data['checkouts']
+        data['wait_time_avg'] = data['wait_time_total'] / checkouts if checkouts else 0.0
+        return data
+
+    def close(self):
+        """ 유휴 커넥션을 모두 닫음 """
+        with self._cond:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._close_quietly(conn)
+                self._opened -= 1
+            self._cond.notify_all()
@@ -0,0 +1,48 @@
+# ========================= keyset 페이지 조회 =========================
+def keyset_condition(key_columns, descending=False):
+    """ 마지막으로 본 키 다음 행부터 읽는 WHERE 조건
+
+    ('o.order_date', 'o.order_id') 내림차순 →
+    (o.order_date < %s OR (o.order_date = %s AND o.order_id < %s))
+    파라미터는 keyset_args() 순서로 전달
+    """
+    op = '<' if descending else '>'
+    column = key_columns[0]
+    if len(key_columns) == 1:
+        return f"{column} {op} %s"
+    rest = keyset_condition(key_columns[1:], descending)
+    return f"({column} {op} %s OR ({column} = %s AND {rest}))"
+
+
+def keyset_args(last_key):
+    """ keyset_condition() 에 대응하는 파라미터 목록 """
+    if len(last_key) == 1:
+        return [last_key[0]]
+    return [last_key[0], last_key[0], *keyset_args(last_key[1:])]
+
+
+def keyset_pages(pool, query, args, key_columns, key_positions, page_size=20, descending=False):
+    """ OFFSET 없이 (정렬 키 > 마지막 키) 조건으로 한 페이지씩 읽어 돌려주는 제너레이터
+
+    - query 에는 기본 조건 뒤에 {after} 자리(추가 WHERE 조건)와 ORDER BY ..., LIMIT %s 가 있어야 함
+      (args 는 {after} 앞의 파라미터)
+    - key_columns: 정렬 키 컬럼, key_positions: 결과 행에서 그 컬럼들의 위치
+    - 페이지마다 커넥션을 잠깐 빌려 비버퍼 커서로 행을 흘려 읽으므로 메모리는 페이지 크기만큼만 사용
+    """
+    last_key = None
+    while True:
+        if last_key is None:
+            after, after_args = '', []
+        else:
+            after, after_args = f"AND {keyset_condition(key_columns, descending)}", keyset_args(last_key)
+
+        with pool.connection() as conn, conn.cursor() as cursor:
+            cursor.execute(query.format(after=after), [*args, *after_args, page_size])
+            page = [row for row in cursor]
+
+        if not page:
+            return
+        yield page
+        if len(page) < page_size:
+            return
+        last_key = tuple(page[-1][position] for position in key_positions)
@@ -0,0 +1,282 @@
+import argparse
+import os
+
+from mysql.connector import Error
+
+from cvs import backfill_transaction_totals, connect
+from sales_rollup import rebuild_sales_rollup
+from sqlite_backend import translate_schema
+
+
+# ========================= 스키마 마이그레이션 =========================
+class MigrationLockError(Error):
+    """ 같은 DB 에 다른 마이그레이션이 실행 중일 때 발생하는 오류 """
+
+
+def _merge_duplicate_stock(pool):
+    """ 같은 (매장, 상품)의 재고 행이 여러 개면 수량을 합쳐 가장 먼저 만든 행 하나만 남김 """
+    with pool.connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT store_id, product_id, MIN(stock_id), SUM(quantity)
+                    FROM stock
+                    GROUP BY store_id, product_id
+                    HAVING COUNT(*) > 1
+                """)
+                for store_id, product_id, stock_id, quantity in cursor.fetchall():
+                    cursor.execute("UPDATE stock SET quantity = %s WHERE stock_id = %s", (quantity, stock_id))
+                    cursor.execute("DELETE FROM stock WHERE store_id = %s AND product_id = %s AND stock_id <> %s",
+                                   (store_id, product_id, stock_id))
+            conn.commit()
+        except Error:
+            conn.rollback()
+            raise
+
+
+# 버전별 스키마 변경 (한 번 배포한 항목은 고치지 말고 새 버전을 추가)
+#   ('table', 테이블, CREATE TABLE 문, 새로 만든 경우 실행할 후속 작업)
+#   ('column', 테이블, 컬럼, 컬럼 정의, 새로 추가한 경우 실행할 후속 작업)
+#   ('index', 테이블, 인덱스 이름, 컬럼 목록)
+#   ('unique', 테이블, 인덱스 이름, 컬럼 목록, 바꾸기 전에 실행할 정리 작업) - 같은 이름의 기존 인덱스를 유일 인덱스로 교체
+# 후속 작업은 SQL 문 또는 pool 을 받는 함수, 각 단계는 이미 적용되어 있으면 건너뜀
+MIGRATIONS = [
+    (1, '배송 반영 표시 컬럼 (새로 배송된 주문만 재고에 반영)', [
+        ('column', 'order_table', 'stock_applied_at', 'TIMESTAMP NULL DEFAULT NULL',
+         "UPDATE order_table SET stock_applied_at = NOW() WHERE status = 'Delivered'"),
+        ('index', 'order_table', 'idx_order_delivery', ('status', 'stock_applied_at')),
+    ]),
+    (2, '직원별 월간 판매 집계, CSV 적재 체크포인트 테이블', [
+        ('table', 'employee_sales_monthly', """
+            CREATE TABLE employee_sales_monthly (
+                sales_month DATE NOT NULL,
+                store_id INT NOT NULL,
+                employee_id INT NOT NULL,
+                total_sales BIGINT NOT NULL DEFAULT 0,
+                total_quantity BIGINT NOT NULL DEFAULT 0,
+                PRIMARY KEY (sales_month, store_id, employee_id),
+                INDEX idx_sales_rank (sales_month, total_sales),
+                FOREIGN KEY (store_id) REFERENCES store(store_id) ON DELETE CASCADE,
+                FOREIGN KEY (employee_id) REFERENCES employee(employee_id) ON DELETE CASCADE
+            )
+        """, rebuild_sales_rollup),
+        ('table', 'import_checkpoint', """
+            CREATE TABLE import_checkpoint (
+                source VARCHAR(255) NOT NULL,
+                last_line INT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                PRIMARY KEY (source)
+            )
+        """, None),
+    ]),
+    (3, '거래 상세 판매 시점 단가', [
+        ('column', 'transaction_details', 'unit_price', 'BIGINT NULL CHECK (unit_price >= 0) AFTER quantity',
+         backfill_transaction_totals),
+    ]),
+    (4, '로컬 판매 저널 번호', [
+        ('column', 'transaction', 'journal_id', 'CHAR(32) NULL UNIQUE AFTER payment_method', None),
+    ]),
+    (5, '자주 쓰는 조회 조건용 복합 인덱스', [
+        ('index', 'stock', 'idx_stock_store_product', ('store_id', 'product_id')),
+        ('index', 'order_table', 'idx_order_store_supplier_date', ('store_id', 'supplier_id', 'order_date')),
+        ('index', 'transaction', 'idx_transaction_employee_date', ('employee_id', 'transaction_date')),
+        ('index', 'employee', 'idx_employee_store_name', ('store_id', 'name')),
+    ]),
+    (6, '거래일자 인덱스 (월별 보관, 최근 판매량 집계)', [
+        ('index', 'transaction', 'idx_transaction_date', ('transaction_date',)),
+    ]),
+    (7, '재고 (매장, 상품) 유일 인덱스 (동시 적재/배송 반영의 중복 행 방지)', [
+        ('unique', 'stock', 'idx_stock_store_product', ('store_id', 'product_id'), _merge_duplicate_stock),
+    ]),
+]
+
+VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INT NOT NULL,
+        description VARCHAR(200) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (version)
+    )
+"""
+
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema.sql')
+
+
+def load_schema(pool, path=SCHEMA_PATH):
+    """ schema.sql 의 CREATE/ALTER 문을 순서대로 실행 (이미 있는 테이블은 건너뜀) """
+    with open(path, encoding='utf-8') as f:
+        lines = [line for line in f if not line.lstrip().startswith('--')]
+    statements = [statement.strip() for statement in ''.join(lines).split(';') if statement.strip()]
+    if pool.dialect == 'sqlite':
+        statements = translate_schema(statements)
+
+    with pool.connection() as conn, conn.cursor() as cursor:
+        cursor.execute("SHOW TABLES")
+        existing = {row[0] for row in cursor.fetchall()}
+        if 'supplier' in existing:
+            return
+        for statement in statements:
+            cursor.execute(statement)
+        conn.commit()
+
+
+def _exists(cursor, query, args):
+    cursor.execute(query, args)
+    return cursor.fetchone()[0] > 0
+
+
+# 저장소별 스키마 조회 쿼리 (테이블, 컬럼, 인덱스 존재 여부)
+CATALOG_QUERIES = {
+    'mysql': {
+        'table': "SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+        'column': """
+            SELECT COUNT(*) FROM information_schema.columns
+            WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+        """,
+        'index': """
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        """,
+        'unique': """
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s AND non_unique = 0
+        """,
+    },
+    'sqlite': {
+        'table': "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = %s",
+        'column': "SELECT COUNT(*) FROM pragma_table_info(%s) WHERE name = %s",
+        'index': "SELECT COUNT(*) FROM sqlite_master WHERE type = 'index' AND tbl_name = %s AND name = %s",
+        'unique': "SELECT COUNT(*) FROM pragma_index_list(%s) WHERE name = %s AND \"unique\" = 1",
+    },
+}
+
+
+def _step_applied(cursor, step, dialect='mysql'):
+    """ 단계가 이미 적용되어 있는지 스키마 정보(information_schema, sqlite_master)로 확인 """
+    kind, table = step[0], step[1]
+    args = (table,) if kind == 'table' else (table, step[2])
+    return _exists(cursor, CATALOG_QUERIES[dialect][kind], args)
+
+
+def _describe(step):
+    kind, table = step[0], step[1]
+    return f"{kind} {table}" if kind == 'table' else f"{kind} {table}.{step[2]}"
+
+
+def _followup(step):
+    """ 단계를 새로 적용했을 때 실행할 후속 작업 (인덱스는 없음) """
+    return step[-1] if step[0] in ('table', 'column') else None
+
+
+def _prepare(step):
+    """ 단계를 적용하기 전에 실행할 정리 작업 (유일 인덱스로 바꾸기 전 중복 행 정리) """
+    return step[4] if step[0] == 'unique' else None
+
+
+def _step_sql(step):
+    kind, table = step[0], step[1]
+    if kind == 'table':
+        return step[2]
+    if kind == 'column':
+        return f"ALTER TABLE `{table}` ADD COLUMN {step[2]} {step[3]}"
+    if kind == 'unique':
+        return f"ALTER TABLE `{table}` DROP INDEX {step[2]}, ADD UNIQUE INDEX {step[2]} ({', '.join(step[3])})"
+    return f"ALTER TABLE `{table}` ADD INDEX {step[2]} ({', '.join(step[3])})"
+
+
+def _run_followup(pool, followup):
+    if followup is None:
+        return
+    if callable(followup):
+        followup(pool)
+        return
+    with pool.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(followup)
+        conn.commit()
+
+
+def applied_versions(pool):
+    """ 적용된 버전 목록 [(버전, 설명, 적용 시각)] (버전 테이블이 없으면 만듦) """
+    with pool.connection() as conn, conn.cursor() as cursor:
+        cursor.execute(VERSION_TABLE)
+        cursor.execute("SELECT version, description, applied_at FROM schema_version ORDER BY version")
+        return cursor.fetchall()
+
+
+def migrate(pool, target=None, dry_run=False, log=print):
+    """ 아직 적용되지 않은 버전을 순서대로 적용하고 schema_version 에 기록 (여러 번 실행해도 안전)
+
+    - 빈 DB 는 schema.sql 로 먼저 테이블을 만든 뒤 각 버전의 단계를 확인 (이미 있는 단계는 건너뛰고 버전만 기록)
+    - 단계 중간에 실패해도 다음 실행에서 남은 단계부터 이어서 적용 (DDL 은 MySQL 에서 자동 커밋됨)
+    - 같은 DB 에 두 실행기가 동시에 적용하지 않도록 GET_LOCK 으로 보호
+    반환값: 적용한 버전 목록
+    """
+    applied = []
+    with pool.connection() as lock_conn, lock_conn.cursor() as lock_cursor:
+        lock_cursor.execute("SELECT GET_LOCK('cvs_schema_migrate', 30)")
+        if lock_cursor.fetchone()[0] != 1:
+            raise MigrationLockError(msg="다른 마이그레이션이 실행 중입니다.")
+        try:
+            if not dry_run:
+                load_schema(pool)
+            done = {row[0] for row in applied_versions(pool)}
+            pending = [migration for migration in MIGRATIONS
+                       if migration[0] not in done and (target is None or migration[0] <= target)]
+
+            for version, description, steps in pending:
+                log(f"[{version}] {description}")
+                for step in steps:
+                    with pool.connection() as conn, conn.cursor() as cursor:
+                        if _step_applied(cursor, step, pool.dialect):
+                            log(f"    건너뜀 (이미 적용됨): {_describe(step)}")
+                            continue
+                        sql = _step_sql(step)
+                        log(f"    {' '.join(sql.split())}")
+                    if dry_run:
+                        continue
+                    _run_followup(pool, _prepare(step))
+                    with pool.connection() as conn, conn.cursor() as cursor:
+                        cursor.execute(sql)
+                    _run_followup(pool, _followup(step))
+                if dry_run:
+                    continue
+                with pool.connection() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute("INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                                       (version, description))
+                    conn.commit()
+                applied.append(version)
+        finally:
+            lock_cursor.execute("SELECT RELEASE_LOCK('cvs_schema_migrate')")
+            lock_cursor.fetchall()
+    return applied
+
+
+# ========================= 실행 코드 =========================
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='스키마 버전 마이그레이션 (app.ini 의 DB 대상)')
+    parser.add_argument('command', nargs='?', choices=('up', 'status'), default='up')
+    parser.add_argument('--target', type=int, help='이 버전까지만 적용')
+    parser.add_argument('--dry-run', action='store_true', help='실행할 DDL 만 출력')
+    args = parser.parse_args()
+
+    pool = connect()
+    if pool is None:
+        raise SystemExit(1)
+
+    try:
+        if args.command == 'status':
+            done = {row[0]: row for row in applied_versions(pool)}
+            for version, description, _ in MIGRATIONS:
+                applied_at = done[version][2] if version in done else '미적용'
+                print(f"[{version}] {description} - {applied_at}")
+        else:
+            applied = migrate(pool, args.target, args.dry_run)
+            print(f"적용한 버전: {', '.join(map(str, applied)) if applied else '없음'}")
+    except Error as error:
+        print(f"마이그레이션 중 오류 발생: {error}")
+        raise SystemExit(1)
+    finally:
+        pool.close()
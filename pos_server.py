@@ -0,0 +1,257 @@
+import argparse
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal
+
+from mysql.connector import Error
+
+from cvs import (StockShortageError, UnknownProductError, connect, read_archive_config, read_cache_config,
+                 read_receipt_config, read_server_config)
+from pos_service import PosService, SaleBatcher
+from receipts import ReceiptCache
+from ref_cache import ReferenceCache
+
+
+# ========================= POS 단말용 JSON 서버 =========================
+# 요청/응답은 한 줄에 JSON 하나 (TCP, UTF-8, 줄바꿈으로 구분)
+#   요청: {"id": 1, "op": "checkout", "args": {"store_id": 1, "employee_id": 3, "payment_method": "Card", "lines": [[10, 2]]}}
+#   응답: {"id": 1, "ok": true, "result": {...}} 또는 {"id": 1, "ok": false, "error": {"type": "stock_shortage", "message": "..."}}
+# 한 연결에서 여러 요청을 응답을 기다리지 않고 보낼 수 있음 (응답 순서는 처리 순서, id 로 구분)
+OPERATIONS = {
+    'find_stores': PosService.find_stores,
+    'find_employees': PosService.find_employees,
+    'find_products': PosService.find_products,
+    'checkout': PosService.checkout,
+    'place_order': PosService.place_order,
+    'transaction_receipt': PosService.transaction_receipt,
+    'order_receipt': PosService.order_receipt,
+    'store_inventory': PosService.store_inventory,
+    'top_employees': PosService.top_employees,
+}
+
+MAX_LINE = 1024 * 1024  # 요청 한 줄의 최대 크기 (바이트)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat(sep=' ') if isinstance(value, datetime) else value.isoformat()
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"{type(value).__name__} 는 JSON 으로 바꿀 수 없습니다.")
+
+
+def _error(error):
+    """ 예외 → 응답의 error 객체 """
+    if isinstance(error, StockShortageError):
+        return {'type': 'stock_shortage', 'message': str(error),
+                'shortages': [{'product_id': product_id, 'quantity': current, 'requested': requested}
+                              for product_id, current, requested in error.shortages]}
+    if isinstance(error, UnknownProductError):
+        return {'type': 'unknown_product', 'message': str(error), 'product_ids': error.product_ids}
+    if isinstance(error, (ValueError, TypeError, KeyError)):
+        return {'type': 'invalid', 'message': str(error)}
+    if isinstance(error, Error):
+        return {'type': 'database', 'message': str(error)}
+    return {'type': 'internal', 'message': repr(error)}
+
+
+class RequestStats:
+    """ 기능별 요청 수, 오류 수, 지연 시간(최근 window 건의 p50/p95/p99), 초당 처리량 """
+
+    def __init__(self, window=10000):
+        self.window = window
+        self.started = time.monotonic()
+        self._ops = {}
+        self._total = 0
+        self._last_total = 0
+        self._last_time = self.started
+        self._lock = threading.Lock()
+
+    def record(self, op, seconds, ok):
+        with self._lock:
+            entry = self._ops.get(op)
+            if entry is None:
+                entry = self._ops[op] = {'count': 0, 'errors': 0, 'latencies': deque(maxlen=self.window)}
+            entry['count'] += 1
+            entry['errors'] += 0 if ok else 1
+            entry['latencies'].append(seconds)
+            self._total += 1
+
+    def snapshot(self):
+        """ 시작 이후 전체 처리량과 직전 snapshot 이후 처리량, 기능별 지연 시간(ms) """
+        now = time.monotonic()
+        with self._lock:
+            total, last_total, last_time = self._total, self._last_total, self._last_time
+            self._last_total, self._last_time = total, now
+            ops = {op: (entry['count'], entry['errors'], sorted(entry['latencies'])) for op, entry in self._ops.items()}
+
+        def pct(values, p):
+            return values[min(len(values) - 1, int(len(values) * p))] * 1000 if values else 0.0
+
+        return {
+            'uptime': now - self.started,
+            'requests': total,
+            'throughput': total / (now - self.started) if now > self.started else 0.0,
+            'recent_throughput': (total - last_total) / (now - last_time) if now > last_time else 0.0,
+            'operations': {op: {'count': count, 'errors': errors, 'p50_ms': pct(values, 0.50),
+                                'p95_ms': pct(values, 0.95), 'p99_ms': pct(values, 0.99),
+                                'max_ms': values[-1] * 1000 if values else 0.0}
+                           for op, (count, errors, values) in sorted(ops.items())},
+        }
+
+
+class PosServer:
+    """ 여러 POS 단말의 요청을 동시에 처리하는 asyncio 서버
+
+    - DB 를 쓰는 서비스 호출은 workers 개 스레드에서 실행 (이벤트 루프는 막지 않음)
+    - 결제는 SaleBatcher 로 보내 동시에 들어온 결제를 그룹 커밋
+    - 'stats' 요청은 처리량/지연 시간, 그룹 커밋, 커넥션 풀 통계를 반환
+    - 연결 하나에서 응답을 기다리지 않고 보낸 요청은 max_pipeline 개까지만 동시에 처리
+    """
+
+    def __init__(self, service, workers=8, max_pipeline=64):
+        self.service = service
+        self.max_pipeline = max_pipeline
+        self.stats = RequestStats()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pos-worker')
+
+    async def _call(self, op, args):
+        if op == 'stats':
+            return self.snapshot()
+        if op == 'checkout' and self.service.batcher is not None:
+            return await asyncio.wrap_future(self.service.submit_checkout(**args))
+        if op not in OPERATIONS:
+            raise ValueError(f"알 수 없는 요청입니다: {op}")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: OPERATIONS[op](self.service, **args))
+
+    async def _respond(self, line, writer):
+        started = time.perf_counter()
+        request_id, op = None, 'invalid'
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            op = str(request.get('op'))
+            response = {'id': request_id, 'ok': True, 'result': await self._call(op, request.get('args') or {})}
+        except Exception as error:  # 요청 하나의 실패가 연결이나 다른 요청에 영향을 주면 안 됨
+            response = {'id': request_id, 'ok': False, 'error': _error(error)}
+        if op != 'stats':
+            self.stats.record(op if op in OPERATIONS else 'invalid', time.perf_counter() - started, response['ok'])
+        writer.write(json.dumps(response, ensure_ascii=False, default=_json_default).encode('utf-8') + b'\n')
+        await writer.drain()
+
+    async def handle(self, reader, writer):
+        """ 단말 연결 하나: 줄 단위로 요청을 읽어 각각 태스크로 처리 """
+        tasks = set()
+        slots = asyncio.Semaphore(self.max_pipeline)
+
+        def finished(task):
+            tasks.discard(task)
+            slots.release()
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break  # 너무 긴 줄, 끊긴 연결
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                await slots.acquire()  # 처리 중인 요청이 max_pipeline 개면 하나가 끝날 때까지 읽지 않음
+                task = asyncio.create_task(self._respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(finished)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    def snapshot(self):
+        data = self.stats.snapshot()
+        data['pool'] = self.service.pool.stats()
+        if self.service.batcher is not None:
+            data['group_commit'] = self.service.batcher.stats()
+        return data
+
+    async def _report(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            print_report(self.snapshot())
+
+    async def serve(self, host, port, report_interval=10.0):
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+        print(f"POS 서버 시작: {host}:{port}")
+        reporter = asyncio.create_task(self._report(report_interval)) if report_interval > 0 else None
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if reporter is not None:
+                reporter.cancel()
+            self._executor.shutdown(wait=True)
+
+
+def print_report(data):
+    """ 처리량/지연 시간 요약 출력 """
+    print(f"\n=== 요청 {data['requests']:,}건, 초당 {data['recent_throughput']:,.1f}건 "
+          f"(평균 {data['throughput']:,.1f}건), 가동 {data['uptime']:.0f}초 ===")
+    for op, item in data['operations'].items():
+        print(f"{op:<22} {item['count']:>9,}건 오류 {item['errors']:>6,}  "
+              f"p50 {item['p50_ms']:.2f}ms  p95 {item['p95_ms']:.2f}ms  p99 {item['p99_ms']:.2f}ms  최대 {item['max_ms']:.2f}ms")
+    batches = data.get('group_commit')
+    if batches:
+        print(f"그룹 커밋: {batches['batches']:,}회, 결제 {batches['sales']:,}건 (평균 {batches['avg_batch']:.1f}건, "
+              f"최대 {batches['max_batch']}건), 재고 부족 {batches['rejected']:,}건, 재시도 {batches['retries']}회, "
+              f"대기 {batches['pending']}건")
+    pool = data['pool']
+    print(f"커넥션: 열림 {pool['opened']} (사용 중 {pool['in_use']}), 평균 대기 {pool['wait_time_avg'] * 1000:.2f}ms")
+
+
+# ========================= 실행 코드 =========================
+if __name__ == '__main__':
+    config = read_server_config()
+    parser = argparse.ArgumentParser(description='POS 단말용 JSON 서버 (app.ini 의 DB 대상, [server] 설정)')
+    parser.add_argument('--host', default=config['host'])
+    parser.add_argument('--port', type=int, default=config['port'])
+    parser.add_argument('--workers', type=int, default=config['workers'], help='조회/발주를 처리할 스레드 수')
+    parser.add_argument('--writers', type=int, default=config['writers'], help='그룹 커밋 쓰기 스레드 수 (0 이면 결제마다 커밋)')
+    parser.add_argument('--max-batch', type=int, default=config['max_batch'], help='한 번에 커밋할 최대 결제 수')
+    parser.add_argument('--max-wait-ms', type=float, default=config['max_wait_ms'], help='결제를 모으는 최대 시간(ms)')
+    parser.add_argument('--max-pipeline', type=int, default=config['max_pipeline'], help='연결 하나에서 동시에 처리할 최대 요청 수')
+    parser.add_argument('--report-interval', type=float, default=config['report_interval'], help='통계 출력 간격(초, 0 이면 끔)')
+    args = parser.parse_args()
+
+    pool = connect()
+    if pool is None:
+        raise SystemExit(1)
+    cache = ReferenceCache(pool, **read_cache_config())
+
+    archive = None
+    archive_config = read_archive_config()
+    if archive_config is not None:
+        from archive import TransactionArchive
+        archive = TransactionArchive(archive_config['directory'])
+    receipts = ReceiptCache(pool.reader(), archive=archive, **read_receipt_config())
+
+    batcher = None
+    if args.writers > 0:
+        batcher = SaleBatcher(pool, max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000,
+                              writers=args.writers).start()
+    server = PosServer(PosService(pool, cache, receipts, batcher), workers=args.workers, max_pipeline=args.max_pipeline)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.report_interval))
+    except KeyboardInterrupt:
+        print("POS 서버를 종료합니다.")
+    finally:
+        if batcher is not None:
+            batcher.stop()  # 대기열에 남은 결제를 커밋한 뒤 종료
+        print_report(server.snapshot())
+        cache.close()
+        pool.close()
@@ -0,0 +1,267 @@
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+
+from mysql.connector import Error
+
+from cvs import (RETRYABLE_ERRORS, StockShortageError, apply_sale, checkout, create_purchase_order,
+                 find_shortages, inventory_pages, merge_basket, to_int)
+from sales_rollup import fetch_top_employees, month_start
+
+
+# ========================= 결제 그룹 커밋 =========================
+class SaleBatcher:
+    """ 동시에 들어온 결제를 모아 한 트랜잭션으로 커밋하는 쓰기 전용 스레드들 (그룹 커밋)
+
+    - 첫 결제가 들어오면 max_wait 초 동안(또는 max_batch 건이 찰 때까지) 더 모아서 한 번에 커밋
+    - 결제마다 SAVEPOINT 를 두므로 재고가 부족하거나 오류가 난 결제만 되돌리고 나머지는 함께 커밋
+    - 데드락/잠금 대기 시간 초과는 묶음 전체를 롤백하고 retries 번까지 다시 시도
+    - submit() 은 concurrent.futures.Future 를 바로 반환 (결과는 checkout() 과 같은 (거래 ID, {상품 ID: 남은 재고}))
+    - 재고 부족 상품 조회(find_shortages)는 별도 스레드에서 하므로 쓰기 스레드는 바로 다음 묶음을 커밋
+    """
+
+    def __init__(self, pool, max_batch=32, max_wait=0.005, writers=2, retries=3, backoff=0.05):
+        self.pool = pool
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.writers = writers
+        self.retries = retries
+        self.backoff = backoff
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lookups = None
+        self._lock = threading.Lock()
+        self._stats = {'batches': 0, 'sales': 0, 'rejected': 0, 'retries': 0, 'failed_batches': 0, 'max_batch': 0}
+
+    def start(self):
+        self._lookups = ThreadPoolExecutor(max_workers=self.writers, thread_name_prefix='sale-shortage')
+        for idx in range(self.writers):
+            thread = threading.Thread(target=self._run, name=f'sale-batcher-{idx}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        """ 이미 받은 결제를 모두 처리한 뒤 쓰기 스레드 종료 """
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._lookups is not None:
+            self._lookups.shutdown(wait=True)
+            self._lookups = None
+
+    def submit(self, store_id, employee_id, payment_method, lines):
+        """ 결제 요청을 대기열에 넣고 Future 반환 (빈 장바구니, 정수가 아닌 ID/수량은 바로 ValueError) """
+        store_id = to_int(store_id, "매장 ID")
+        employee_id = None if employee_id is None else to_int(employee_id, "직원 ID")
+        basket = merge_basket(lines)
+        if not basket:
+            raise ValueError("장바구니가 비어 있습니다.")
+        future = Future()
+        self._queue.put((future, store_id, employee_id, payment_method, basket))
+        return future
+
+    # ---------- 쓰기 스레드 ----------
+    def _run(self):
+        while True:
+            sale = self._queue.get()
+            if sale is None:
+                return
+            batch = [sale]
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    sale = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if sale is None:
+                    stop = True
+                    break
+                batch.append(sale)
+            self._commit(batch)
+            if stop:
+                return
+
+    def _commit(self, batch):
+        try:
+            self._commit_batch(batch)
+        except Exception as error:  # 예상하지 못한 오류도 쓰기 스레드를 멈추지 않고 묶음의 결제에 돌려줌
+            with self._lock:
+                self._stats['failed_batches'] += 1
+            for sale in batch:
+                if not sale[0].done():
+                    sale[0].set_exception(error)
+
+    def _commit_batch(self, batch):
+        # 같은 매장의 결제를 이어서 처리하도록 매장 순으로 정렬
+        batch = sorted(batch, key=lambda sale: sale[1])
+        for attempt in range(self.retries + 1):
+            try:
+                outcomes = self._commit_once(batch)
+                break
+            except Error as error:
+                if error.errno in RETRYABLE_ERRORS and attempt < self.retries:
+                    with self._lock:
+                        self._stats['retries'] += 1
+                    time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+                    continue
+                with self._lock:
+                    self._stats['failed_batches'] += 1
+                for sale in batch:
+                    sale[0].set_exception(error)
+                return
+
+        committed = sum(1 for outcome in outcomes if outcome is not None and not isinstance(outcome, Exception))
+        with self._lock:
+            self._stats['batches'] += 1
+            self._stats['sales'] += committed
+            self._stats['rejected'] += outcomes.count(None)
+            self._stats['max_batch'] = max(self._stats['max_batch'], len(batch))
+
+        for (future, store_id, _, _, basket), outcome in zip(batch, outcomes):
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            elif outcome is None:
+                self._lookups.submit(self._reject, future, store_id, basket)
+            else:
+                future.set_result(outcome)
+
+    def _reject(self, future, store_id, basket):
+        """ 재고 부족으로 되돌린 결제의 Future 에 부족한 상품 목록을 담아 실패 처리 """
+        try:
+            future.set_exception(StockShortageError(find_shortages(self.pool, store_id, basket)))
+        except Exception as error:
+            future.set_exception(error)
+
+    def _commit_once(self, batch):
+        """ 묶음 전체를 한 트랜잭션으로 처리 → 결제별 결과 (결과 튜플, 재고 부족이면 None, 개별 오류면 예외) """
+        outcomes = []
+        with self.pool.connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    for idx, (_, store_id, employee_id, payment_method, basket) in enumerate(batch):
+                        cursor.execute(f"SAVEPOINT sale_{idx}")
+                        try:
+                            result = apply_sale(cursor, store_id, employee_id, payment_method, basket)
+                        except Exception as error:
+                            if isinstance(error, Error) and error.errno in RETRYABLE_ERRORS:
+                                raise
+                            result = error  # 없는 직원 ID 같은 결제 하나의 오류
+                        if result is None or isinstance(result, Exception):
+                            cursor.execute(f"ROLLBACK TO SAVEPOINT sale_{idx}")
+                        outcomes.append(result)
+                conn.commit()
+            except Error:
+                conn.rollback()
+                raise
+        return outcomes
+
+    def stats(self):
+        """ 묶음 수, 커밋된 결제 수, 평균(커밋된 결제 기준)/최대 묶음 크기, 재시도 횟수 """
+        with self._lock:
+            data = dict(self._stats)
+        data['pending'] = self._queue.qsize()
+        data['avg_batch'] = data['sales'] / data['batches'] if data['batches'] else 0.0
+        return data
+
+
+# ========================= 비대화식 서비스 =========================
+PAYMENT_METHODS = ('Cash', 'Card', 'Mobile Payment')
+
+
+def _sale_result(result):
+    transaction_id, remaining = result
+    return {
+        'transaction_id': transaction_id,
+        'remaining': [{'product_id': product_id, 'quantity': quantity} for product_id, quantity in remaining.items()],
+    }
+
+
+class PosService:
+    """ 화면 입출력 없이 매장/직원/상품 검색, 결제, 발주, 영수증/재고/판매왕 조회를 처리하는 서비스
+
+    - 반환값은 JSON 으로 바꿀 수 있는 dict/list (영수증이 없으면 None)
+    - 잘못된 입력은 ValueError, 재고 부족은 StockShortageError, DB 오류는 mysql.connector.Error
+    - 조회는 pool.reader() (복제본이 있으면 복제본), 쓰기는 pool
+    - batcher 가 있으면 결제는 그룹 커밋으로 처리 (submit_checkout)
+    """
+
+    def __init__(self, pool, cache, receipts, batcher=None):
+        self.pool = pool
+        self.reports = pool.reader()
+        self.cache = cache
+        self.receipts = receipts
+        self.batcher = batcher
+
+    # ---------- 검색 ----------
+    def find_stores(self, keyword, limit=None):
+        return [{'store_id': row[0], 'name': row[1]} for row in self.cache.search('store', keyword, limit)]
+
+    def find_employees(self, store_id, keyword, limit=None):
+        rows = self.cache.search('employee', keyword, limit, store_id=to_int(store_id, "매장 ID"))
+        return [{'employee_id': row[0], 'name': row[1]} for row in rows]
+
+    def find_products(self, keyword, limit=None):
+        rows = self.cache.search('product', keyword, limit)
+        return [{'product_id': row[0], 'name': row[1], 'price': row[2]} for row in rows]
+
+    # ---------- 결제 / 발주 ----------
+    def _check_payment(self, payment_method):
+        if payment_method not in PAYMENT_METHODS:
+            raise ValueError(f"결제 방식은 {', '.join(PAYMENT_METHODS)} 중 하나여야 합니다.")
+
+    def checkout(self, store_id, employee_id, payment_method, lines):
+        """ 결제 한 건을 바로 커밋 → {'transaction_id', 'remaining'} """
+        self._check_payment(payment_method)
+        store_id = to_int(store_id, "매장 ID")
+        employee_id = None if employee_id is None else to_int(employee_id, "직원 ID")
+        return _sale_result(checkout(self.pool, store_id, employee_id, payment_method, lines))
+
+    def submit_checkout(self, store_id, employee_id, payment_method, lines):
+        """ 결제를 그룹 커밋 대기열에 넣고 Future 반환 (결과는 checkout() 과 같은 dict) """
+        self._check_payment(payment_method)
+        future = Future()
+
+        def done(batched):
+            error = batched.exception()
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(_sale_result(batched.result()))
+
+        self.batcher.submit(store_id, employee_id, payment_method, lines).add_done_callback(done)
+        return future
+
+    def place_order(self, store_id, lines):
+        """ 여러 품목 발주 → 공급업체별 [{'supplier_id', 'order_id'}] """
+        orders = create_purchase_order(self.pool, to_int(store_id, "매장 ID"), lines)
+        return [{'supplier_id': supplier_id, 'order_id': order_id} for supplier_id, order_id in orders.items()]
+
+    # ---------- 조회 ----------
+    def transaction_receipt(self, transaction_id):
+        return self.receipts.transaction(to_int(transaction_id, "거래 ID"))
+
+    def order_receipt(self, order_id):
+        return self.receipts.order(to_int(order_id, "주문 ID"))
+
+    def store_inventory(self, store_id, limit=100):
+        """ 매장 재고 (상품명 순, 최대 limit 행) """
+        limit = to_int(limit, "행 수")
+        pages = inventory_pages(self.reports, to_int(store_id, "매장 ID"), page_size=min(limit, 100))
+        rows = islice((row for page in pages for row in page), limit)
+        return [{'product_name': name, 'category': category, 'quantity': quantity, 'last_updated': last_updated}
+                for name, category, quantity, last_updated in rows]
+
+    def top_employees(self, month=None, store_id=None, limit=10):
+        """ 이달의 판매왕 (month 는 'YYYY-MM', 없으면 이번 달) """
+        store_id = None if store_id is None else to_int(store_id, "매장 ID")
+        rows = fetch_top_employees(self.reports, month_start(month), store_id, to_int(limit, "순위 수"))
+        return [{'employee_id': employee_id, 'name': name, 'total_sales': total_sales}
+                for employee_id, name, total_sales in rows]
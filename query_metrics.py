@@ -0,0 +1,362 @@
+import contextvars
+import inspect
+import json
+import re
+import threading
+import time
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# ========================= 쿼리 계측 =========================
+# 지연 시간 히스토그램 구간 (초)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_current_operation = contextvars.ContextVar('current_operation', default=None)
+
+_NAME_COMMENT = re.compile(r'--\s*name:\s*(\w+)')
+_LINE_COMMENT = re.compile(r'--[^\n]*')
+_TABLE_PATTERNS = {
+    'select': re.compile(r'\bFROM\s+(\w+)', re.IGNORECASE),
+    'delete': re.compile(r'\bFROM\s+(\w+)', re.IGNORECASE),
+    'insert': re.compile(r'\bINTO\s+(\w+)', re.IGNORECASE),
+    'update': re.compile(r'^UPDATE\s+(\w+)', re.IGNORECASE),
+}
+
+
+def _track_generator(generator, operation):
+    """ 제너레이터가 한 단계씩 진행될 때마다 기능 이름을 붙임 (호출한 쪽으로 돌아오면 원래대로) """
+    try:
+        while True:
+            token = _current_operation.set(operation)
+            try:
+                item = next(generator)
+            except StopIteration:
+                return
+            finally:
+                _current_operation.reset(token)
+            yield item
+    finally:
+        generator.close()
+
+
+def track_operation(name=None):
+    """ 함수 안에서 실행되는 쿼리에 기능 이름을 붙이는 데코레이터 (바깥쪽 기능 이름 우선)
+
+    - 제너레이터를 반환하면(페이지 목록 등) 쿼리가 반환 뒤 next() 때 실행되므로 next() 마다 이름을 붙임
+    """
+    def decorator(func):
+        operation = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            current = _current_operation.get()
+            if current is not None:
+                result = func(*args, **kwargs)
+            else:
+                token = _current_operation.set(operation)
+                try:
+                    result = func(*args, **kwargs)
+                finally:
+                    _current_operation.reset(token)
+            if inspect.isgenerator(result):
+                return _track_generator(result, current or operation)
+            return result
+        return wrapper
+    return decorator
+
+
+def statement_verb(query):
+    """ 주석을 뺀 쿼리의 첫 단어 (소문자, 없으면 빈 문자열) """
+    text = _LINE_COMMENT.sub('', query).strip()
+    return text.split(None, 1)[0].lower() if text else ''
+
+
+def statement_label(query):
+    """ 쿼리 이름: '-- name: decrement_stock' 주석이 있으면 그 이름, 없으면 '동사.테이블' """
+    match = _NAME_COMMENT.search(query)
+    if match:
+        return match.group(1)
+    text = _LINE_COMMENT.sub('', query).strip()
+    if not text:
+        return 'unknown'
+    verb = text.split(None, 1)[0].lower()
+    pattern = _TABLE_PATTERNS.get(verb)
+    table = pattern.search(text) if pattern else None
+    return f"{verb}.{table.group(1).lower()}" if table else verb
+
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+
+    def observe(self, seconds):
+        for idx, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[idx] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """ 히스토그램 구간으로 추정한 분위수 (초) """
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for idx, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return BUCKETS[idx] if idx < len(BUCKETS) else self.max
+        return self.max
+
+
+class QueryMetrics:
+    """ 쿼리별 지연 시간 히스토그램, 반환 행 수, 느린 쿼리 로그(바인딩 값과 EXPLAIN 포함) 수집기
+
+    - slow_query_ms: 이 시간(ms)을 넘는 쿼리는 slow_log 파일에 JSON 한 줄로 기록
+    - explain: 느린 SELECT 는 EXPLAIN 결과도 함께 기록
+    - capture: (기능, 쿼리 이름)별로 처음 실행된 쿼리 원문과 바인딩 값을 captured 에 보관 (실행 계획 점검용)
+    """
+
+    def __init__(self, slow_query_ms=200.0, slow_log='slow_query.log', explain=False, capture=False):
+        self.slow_query_ms = slow_query_ms
+        self.slow_log = slow_log
+        self.explain = explain
+        self.captured = {} if capture else None
+        self._histograms = {}
+        self._slow_count = 0
+        self._lock = threading.Lock()
+
+    def wrap(self, conn):
+        return InstrumentedConnection(conn, self)
+
+    def record(self, statement, seconds, rows=0):
+        key = (_current_operation.get() or 'unknown', statement)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.observe(seconds)
+            histogram.rows += max(rows, 0)
+
+    def capture(self, statement, query, params):
+        key = (_current_operation.get() or 'unknown', statement)
+        with self._lock:
+            self.captured.setdefault(key, (query, params))
+
+    def add_rows(self, statement, rows):
+        key = (_current_operation.get() or 'unknown', statement)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is not None:
+                histogram.rows += rows
+
+    def log_slow(self, statement, seconds, query, params, plan=None):
+        entry = {
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'operation': _current_operation.get() or 'unknown',
+            'statement': statement,
+            'ms': round(seconds * 1000, 3),
+            'query': ' '.join(query.split()),
+            'params': [str(value) for value in params] if params is not None else None,
+        }
+        if plan is not None:
+            entry['explain'] = plan
+        with self._lock:
+            self._slow_count += 1
+            if self.slow_log:
+                with open(self.slow_log, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+
+    # ---------- 내보내기 ----------
+    def snapshot(self):
+        """ 현재까지의 측정값 (JSON 직렬화 가능한 dict) """
+        with self._lock:
+            statements = []
+            for (operation, statement), histogram in sorted(self._histograms.items()):
+                statements.append({
+                    'operation': operation,
+                    'statement': statement,
+                    'count': histogram.count,
+                    'rows': histogram.rows,
+                    'total_ms': histogram.total * 1000,
+                    'avg_ms': histogram.total / histogram.count * 1000 if histogram.count else 0.0,
+                    'p95_ms': histogram.quantile(0.95) * 1000,
+                    'max_ms': histogram.max * 1000,
+                    'buckets': dict(zip([str(bound) for bound in BUCKETS] + ['+Inf'], histogram.counts)),
+                })
+            return {'slow_queries': self._slow_count, 'statements': statements}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self):
+        """ Prometheus text exposition 형식 """
+        lines = [
+            '# HELP cvs_query_duration_seconds 쿼리 실행 시간',
+            '# TYPE cvs_query_duration_seconds histogram',
+        ]
+        rows = [
+            '# HELP cvs_query_rows_total 쿼리가 반환/변경한 행 수',
+            '# TYPE cvs_query_rows_total counter',
+        ]
+        with self._lock:
+            for (operation, statement), histogram in sorted(self._histograms.items()):
+                labels = f'operation="{operation}",statement="{statement}"'
+                cumulative = 0
+                for bound, count in zip(list(BUCKETS) + ['+Inf'], histogram.counts):
+                    cumulative += count
+                    lines.append(f'cvs_query_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'cvs_query_duration_seconds_sum{{{labels}}} {histogram.total}')
+                lines.append(f'cvs_query_duration_seconds_count{{{labels}}} {histogram.count}')
+                rows.append(f'cvs_query_rows_total{{{labels}}} {histogram.rows}')
+            slow = self._slow_count
+        return '\n'.join(lines + rows + [
+            '# HELP cvs_slow_queries_total 느린 쿼리 수',
+            '# TYPE cvs_slow_queries_total counter',
+            f'cvs_slow_queries_total {slow}',
+        ]) + '\n'
+
+    def serve(self, port, host='127.0.0.1'):
+        """ /metrics (Prometheus), /metrics.json 을 제공하는 수집용 HTTP 서버를 백그라운드로 시작 """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body, content_type = metrics.to_prometheus(), 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json':
+                    body, content_type = metrics.to_json(), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+class InstrumentedConnection:
+    """ cursor() 만 계측 커서로 바꾸고 나머지는 원래 커넥션에 위임 """
+
+    def __init__(self, conn, metrics):
+        self._conn = conn
+        self._metrics = metrics
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._conn.cursor(*args, **kwargs), self._conn, self._metrics)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class InstrumentedCursor:
+    """ execute/executemany 시간을 재고, fetch 한 행 수를 쿼리별로 합산하는 커서 래퍼 """
+
+    def __init__(self, cursor, conn, metrics):
+        self._cursor = cursor
+        self._conn = conn
+        self._metrics = metrics
+        self._statement = None
+        self._pending_explain = None
+
+    def _timed(self, method, query, params):
+        self._flush_explain()
+        statement = statement_label(query)
+        started = time.perf_counter()
+        result = method(query, params) if params is not None else method(query)
+        seconds = time.perf_counter() - started
+
+        self._statement = statement
+        is_select = statement_verb(query) == 'select'
+        rows = self._cursor.rowcount if not is_select else 0
+        self._metrics.record(statement, seconds, rows)
+        if self._metrics.captured is not None:
+            self._metrics.capture(statement, query, params)
+        if seconds * 1000 >= self._metrics.slow_query_ms:
+            if self._metrics.explain and is_select:
+                # 비버퍼 커서는 결과를 다 읽기 전에 다른 쿼리를 실행할 수 없으므로 결과를 읽은 뒤 EXPLAIN
+                self._pending_explain = (statement, seconds, query, params)
+            else:
+                self._metrics.log_slow(statement, seconds, query, params)
+        return result
+
+    def _flush_explain(self):
+        if self._pending_explain is None:
+            return
+        statement, seconds, query, params = self._pending_explain
+        self._pending_explain = None
+        plan = None
+        try:
+            with self._conn.cursor(buffered=True) as cursor:
+                cursor.execute(f"EXPLAIN {query}", params)
+                columns = [column[0] for column in cursor.description]
+                plan = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        except Exception as error:  # EXPLAIN 실패가 업무 쿼리를 방해하면 안 됨
+            plan = [{'error': str(error)}]
+        self._metrics.log_slow(statement, seconds, query, params, plan)
+
+    def execute(self, query, params=None):
+        return self._timed(self._cursor.execute, query, params)
+
+    def executemany(self, query, seq_params):
+        return self._timed(self._cursor.executemany, query, seq_params)
+
+    def _count(self, rows):
+        if self._statement is not None and rows:
+            self._metrics.add_rows(self._statement, rows)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        self._count(1 if row is not None else 0)
+        return row
+
+    def fetchmany(self, size=1):
+        rows = self._cursor.fetchmany(size)
+        self._count(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._count(len(rows))
+        self._flush_explain()
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._count(1)
+            yield row
+        self._flush_explain()
+
+    def close(self):
+        try:
+            self._flush_explain()
+        finally:
+            self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
@@ -0,0 +1,178 @@
+import threading
+from collections import OrderedDict
+
+from query_metrics import track_operation
+
+
+# ========================= 영수증 조회 =========================
+@track_operation()
+def fetch_order_receipt(pool, order_id):
+    """ 주문 영수증 한 건 (헤더 + 품목) 을 한 번의 쿼리로 조회 (없으면 None)
+
+    반환값: {'order_id', 'order_date', 'status', 'store_name', 'supplier_name',
+             'lines': [(상품 ID, 상품명, 수량)], 'total_quantity'}
+    """
+    query = """
+        -- name: order_receipt
+        SELECT
+            o.order_id,
+            o.order_date,
+            o.status,
+            s.name AS store_name,
+            sp.name AS supplier_name,
+            od.product_id,
+            p.name AS product_name,
+            od.quantity
+        FROM order_table o
+        JOIN store s ON o.store_id = s.store_id
+        JOIN supplier sp ON o.supplier_id = sp.supplier_id
+        LEFT JOIN order_details od ON o.order_id = od.order_id
+        LEFT JOIN product p ON od.product_id = p.product_id
+        WHERE o.order_id = %s
+        ORDER BY od.order_detail_id
+    """
+    with pool.connection() as conn, conn.cursor() as cursor:
+        cursor.execute(query, (order_id,))
+        rows = cursor.fetchall()
+    if not rows:
+        return None
+
+    lines = [(row[5], row[6], row[7]) for row in rows if row[5] is not None]
+    first = rows[0]
+    return {
+        'order_id': first[0],
+        'order_date': first[1],
+        'status': first[2],
+        'store_name': first[3],
+        'supplier_name': first[4],
+        'lines': lines,
+        'total_quantity': sum(line[2] for line in lines),
+    }
+
+
+@track_operation()
+def fetch_transaction_receipt(pool, transaction_id):
+    """ 거래 영수증 한 건 (헤더 + 품목) 을 한 번의 쿼리로 조회 (없으면 None, 금액은 결제 시점에 저장된 값)
+
+    반환값: {'transaction_id', 'transaction_date', 'payment_method', 'store_name', 'employee_name',
+             'lines': [(상품 ID, 상품명, 수량, 단가, 소계)], 'total_quantity', 'total_amount'}
+    """
+    query = """
+        -- name: transaction_receipt
+        SELECT
+            t.transaction_id,
+            t.transaction_date,
+            t.payment_method,
+            t.total_amount,
+            s.name AS store_name,
+            e.name AS employee_name,
+            td.product_id,
+            p.name AS product_name,
+            td.quantity,
+            td.unit_price,
+            td.subtotal
+        FROM transaction t
+        JOIN store s ON t.store_id = s.store_id
+        LEFT JOIN employee e ON t.employee_id = e.employee_id
+        LEFT JOIN transaction_details td ON t.transaction_id = td.transaction_id
+        LEFT JOIN product p ON td.product_id = p.product_id
+        WHERE t.transaction_id = %s
+        ORDER BY td.transaction_detail_id
+    """
+    with pool.connection() as conn, conn.cursor() as cursor:
+        cursor.execute(query, (transaction_id,))
+        rows = cursor.fetchall()
+    if not rows:
+        return None
+
+    lines = [(row[6], row[7], row[8], row[9], row[10]) for row in rows if row[6] is not None]
+    first = rows[0]
+    return {
+        'transaction_id': first[0],
+        'transaction_date': first[1],
+        'payment_method': first[2],
+        'total_amount': first[3],
+        'store_name': first[4],
+        'employee_name': first[5],
+        'lines': lines,
+        'total_quantity': sum(line[2] for line in lines),
+    }
+
+
+# ========================= 확정 영수증 캐시 =========================
+class ReceiptCache:
+    """ 더 이상 바뀌지 않는 영수증(등록된 거래, 배송 완료 주문)을 메모리에 두는 LRU 캐시
+
+    - max_entries: 보관할 최대 영수증 수, 넘으면 가장 오래 조회되지 않은 영수증부터 버림
+    - 아직 바뀔 수 있는 영수증(배송 전 주문)은 캐시하지 않고 매번 조회
+    - 거래/주문 행을 수정했다면 invalidate() 로 해당 영수증만 버림
+    - archive: 운영 테이블에 없는 거래는 월별 보관 파일(TransactionArchive)에서 찾음
+    - pool 이 복제본 조회 풀(replicas.ReadPool)이면 복제본에 없는 영수증은 주 DB 에서 다시 찾음
+    """
+
+    def __init__(self, pool, max_entries=10000, archive=None):
+        self.pool = pool
+        self.max_entries = max_entries
+        self.archive = archive
+        self._entries = OrderedDict()  # ('order' | 'transaction', ID) → 영수증
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def _get(self, key, fetch, finalized):
+        with self._lock:
+            receipt = self._entries.get(key)
+            if receipt is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return receipt
+            self._stats['misses'] += 1
+
+        receipt = fetch(self.pool, key[1])
+        primary = getattr(self.pool, 'primary', None)
+        if receipt is None and primary is not None:
+            receipt = fetch(primary, key[1])  # 복제 지연으로 복제본에 아직 없는 방금 등록한 거래/주문
+        if receipt is None or not finalized(receipt):
+            return receipt
+
+        with self._lock:
+            self._entries[key] = receipt
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+        return receipt
+
+    def order(self, order_id):
+        """ 주문 영수증 (배송 완료 주문만 캐시) """
+        return self._get(('order', order_id), fetch_order_receipt, lambda receipt: receipt['status'] == 'Delivered')
+
+    def transaction(self, transaction_id):
+        """ 거래 영수증 (등록된 거래는 바뀌지 않으므로 항상 캐시) """
+        return self._get(('transaction', transaction_id), self._fetch_transaction, lambda receipt: True)
+
+    def _fetch_transaction(self, pool, transaction_id):
+        receipt = fetch_transaction_receipt(pool, transaction_id)
+        if receipt is None and self.archive is not None:
+            receipt = self.archive.transaction_receipt(pool, transaction_id)
+        return receipt
+
+    def invalidate(self, kind=None, key=None):
+        """ 수정된 영수증을 버림 (kind 만 주면 그 종류 전체, 둘 다 없으면 전체) """
+        with self._lock:
+            if kind is None:
+                self._entries.clear()
+            elif key is None:
+                for entry in [entry for entry in self._entries if entry[0] == kind]:
+                    del self._entries[entry]
+            else:
+                self._entries.pop((kind, key), None)
+            self._stats['invalidations'] += 1
+
+    def stats(self):
+        """ 캐시 적중/실패 통계 """
+        with self._lock:
+            data = dict(self._stats)
+            data['entries'] = len(self._entries)
+        lookups = data['hits'] + data['misses']
+        data['hit_ratio'] = data['hits'] / lookups if lookups else 0.0
+        return data
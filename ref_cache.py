@@ -0,0 +1,252 @@
+import threading
+import time
+
+from mysql.connector import Error
+
+from db_pool import ConnectionPool
+from search_index import NgramIndex
+
+
+# ========================= 참조 데이터 캐시 =========================
+# 테이블별 캐시 컬럼 (첫 번째 컬럼은 ID, 두 번째 컬럼은 이름, 나머지는 검색 필터나 화면 출력용)
+REFERENCE_TABLES = {
+    'store': ('store_id', 'name'),
+    'supplier': ('supplier_id', 'name'),
+    'employee': ('employee_id', 'name', 'store_id'),
+    'product': ('product_id', 'name', 'price'),
+}
+
+
+def _select(table):
+    return f"SELECT {', '.join(REFERENCE_TABLES[table])} FROM {table}"
+
+
+def _row_filter(snapshot, table, filters):
+    """ store_id= 같은 필터 → key 를 받아 사본의 행이 모든 조건에 맞는지 확인하는 함수 """
+    positions = {column: idx for idx, column in enumerate(REFERENCE_TABLES[table])}
+    conditions = [(positions[column], value) for column, value in filters.items()]
+
+    def accept(key):
+        row = snapshot.rows[key]
+        return all(row[position] == value for position, value in conditions)
+    return accept
+
+
+class _TableSnapshot:
+    """ 한 테이블의 메모리 사본과 이름 검색용 n-gram 색인 """
+
+    def __init__(self, rows):
+        self.loaded_at = time.monotonic()
+        self.rows = {}
+        self.index = NgramIndex()
+        for row in rows:
+            self.put(row)
+
+    def put(self, row):
+        self.rows[row[0]] = row
+        self.index.add(row[0], row[1])
+
+    def delete(self, key):
+        self.rows.pop(key, None)
+        self.index.remove(key)
+
+
+class ReferenceCache:
+    """ 매장/공급업체/직원/상품 같이 자주 바뀌지 않는 데이터를 메모리에 두고 이름 검색을 처리하는 캐시
+
+    - ttl: 테이블 사본의 유효 시간(초), 지나면 다음 조회 때 다시 적재
+    - max_rows: 테이블 하나에 캐시할 최대 행 수, 넘으면 캐시하지 않고 DB 에서 직접 검색
+    - search_limit: 이름 검색 결과의 최대 개수
+    - connect_timeout: 테이블을 다시 적재할 때의 연결 제한 시간(초), MySQL 이면 재시도 없이 이 시간만 기다리는
+      적재 전용 풀을 따로 씀 (장애 중 검색이 연결 재시도에 묶이지 않고 바로 이전 사본으로 처리되도록)
+    - backup: 다시 적재한 사본을 저장하고 MySQL 에 연결할 수 없을 때 불러올 곳 (SaleJournal, 로컬 저널 모드)
+    """
+
+    def __init__(self, pool, ttl=300.0, max_rows=500000, search_limit=20, connect_timeout=3, backup=None):
+        self.pool = pool
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.search_limit = search_limit
+        self.backup = backup
+        self.loader = pool
+        if pool.dialect == 'mysql':
+            self.loader = ConnectionPool({**pool.db_config, 'connection_timeout': connect_timeout},
+                                         pool_size=1, max_overflow=len(REFERENCE_TABLES) - 1,
+                                         pool_timeout=connect_timeout, reconnect_attempts=1, metrics=pool.metrics)
+        self._tables = {}
+        self._oversized = {}  # 최대 행 수를 넘은 테이블 → 확인 시각
+        self._loading = set()  # 다시 적재 중인 테이블 (적재는 잠금 밖에서, 그동안 다른 조회는 이전 사본 사용)
+        self._changes = {}  # 테이블 → 무효화/부분 갱신 횟수 (적재 중에 바뀌었으면 적재한 사본을 캐시하지 않음)
+        self._lock = threading.RLock()
+        self._loaded = threading.Condition(self._lock)
+        self._stats = {'hits': 0, 'misses': 0, 'bypasses': 0, 'stale': 0, 'invalidations': 0}
+
+    # ---------- 적재 ----------
+    def _load(self, table):
+        """ 테이블 전체를 읽어 새 사본을 만듦 (최대 행 수를 넘으면 None, 백업이 있으면 읽은 행을 저장) """
+        with self.loader.connection() as conn, conn.cursor() as cursor:
+            cursor.execute(f"{_select(table)} LIMIT %s", (self.max_rows + 1,))
+            rows = cursor.fetchall()
+        if len(rows) > self.max_rows:
+            return None
+        if self.backup is not None:
+            self.backup.save_reference(table, rows)
+        return _TableSnapshot(rows)
+
+    def _restore(self, table):
+        """ 백업에 저장해 둔 사본 (없으면 None) """
+        if self.backup is None:
+            return None
+        rows = self.backup.load_reference(table)
+        return None if rows is None else _TableSnapshot(rows)
+
+    def _snapshot(self, table):
+        """ 유효한 테이블 사본 반환 (없거나 만료되면 다시 적재, 너무 크면 None)
+
+        적재는 잠금 밖에서 한 스레드만 하고, 그동안 다른 조회는 만료된 사본이 있으면 그 사본으로 바로 처리
+        """
+        with self._lock:
+            while True:
+                snapshot = self._tables.get(table)
+                if snapshot is not None and time.monotonic() - snapshot.loaded_at <= self.ttl:
+                    self._stats['hits'] += 1
+                    return snapshot
+                checked_at = self._oversized.get(table)
+                if checked_at is not None and time.monotonic() - checked_at <= self.ttl:
+                    self._stats['bypasses'] += 1
+                    return None
+                if table not in self._loading:
+                    break
+                if snapshot is not None:
+                    self._stats['stale'] += 1
+                    return snapshot
+                self._loaded.wait()  # 처음 적재하는 중이면 끝날 때까지 대기
+            self._loading.add(table)
+            self._stats['misses'] += 1
+            changes = self._changes.get(table, 0)
+
+        try:
+            try:
+                fresh = self._load(table)
+            except Error:
+                #  DB 에 연결할 수 없으면 만료된 사본(없으면 백업의 사본)으로 계속 검색하고 ttl 뒤에 다시 적재 시도
+                if snapshot is None:
+                    snapshot = self._restore(table)
+                    if snapshot is None:
+                        raise
+                with self._lock:
+                    snapshot.loaded_at = time.monotonic()
+                    self._tables.setdefault(table, snapshot)
+                    self._stats['stale'] += 1
+                return snapshot
+
+            with self._lock:
+                if self._changes.get(table, 0) != changes:
+                    return fresh  # 적재 중에 무효화/부분 갱신되었으면 이번 조회에만 쓰고 다음 조회 때 다시 적재
+                if fresh is None:
+                    self._oversized[table] = time.monotonic()
+                    self._tables.pop(table, None)
+                    self._stats['bypasses'] += 1
+                    return None
+                self._oversized.pop(table, None)
+                self._tables[table] = fresh
+                return fresh
+        finally:
+            with self._lock:
+                self._loading.discard(table)
+                self._loaded.notify_all()
+
+    def _search_db(self, table, keyword, filters, limit):
+        """ 캐시하지 않는 큰 테이블은 DB 에서 LIKE 검색 """
+        conditions = [f"{REFERENCE_TABLES[table][1]} LIKE %s"]
+        args = [f"%{keyword}%"]
+        for column, value in filters.items():
+            conditions.append(f"{column} = %s")
+            args.append(value)
+        query = f"{_select(table)} WHERE {' AND '.join(conditions)} LIMIT %s"
+        args.append(limit)
+        with self.pool.connection() as conn, conn.cursor() as cursor:
+            cursor.execute(query, args)
+            return cursor.fetchall()
+
+    def preload(self):
+        """ 모든 참조 테이블을 미리 적재 (로컬 저널 모드에서 DB 장애 전에 검색용 사본 확보) """
+        for table in REFERENCE_TABLES:
+            self._snapshot(table)
+
+    # ---------- 조회 ----------
+    def search(self, table, keyword, limit=None, **filters):
+        """ 이름에 keyword 가 포함된 행 목록 (관련도 순, 최대 limit 개, store_id= 같은 필터 지원) """
+        limit = limit or self.search_limit
+        snapshot = self._snapshot(table)
+        if snapshot is None:
+            return self._search_db(table, keyword, filters, limit)
+
+        accept = _row_filter(snapshot, table, filters) if filters else None
+        return [snapshot.rows[key] for key in snapshot.index.search(keyword, limit, accept)]
+
+    def get(self, table, key):
+        """ ID 로 한 행 조회 (없으면 None) """
+        snapshot = self._snapshot(table)
+        if snapshot is None:
+            query = f"{_select(table)} WHERE {REFERENCE_TABLES[table][0]} = %s"
+            with self.pool.connection() as conn, conn.cursor() as cursor:
+                cursor.execute(query, (key,))
+                return cursor.fetchone()
+        return snapshot.rows.get(key)
+
+    # ---------- 무효화 ----------
+    def refresh_row(self, table, key):
+        """ 한 행이 추가/변경/삭제되었을 때 그 행만 다시 읽어 사본과 색인을 부분 갱신 """
+        self.refresh_rows(table, [key])
+
+    def refresh_rows(self, table, keys, by_name=False):
+        """ 여러 행을 IN 조회 한 번으로 다시 읽어 사본과 색인을 부분 갱신 (사본이 없으면 다음 조회 때 적재하므로 생략)
+
+        - keys 는 ID 목록, by_name=True 면 이름 목록 (대량 적재처럼 새 행의 ID 를 모르는 경우)
+        - ID 로 찾았는데 없는 행은 삭제된 것으로 보고 사본에서 제거
+        """
+        keys = list(set(keys))
+        if not keys:
+            return
+        with self._lock:
+            self._changes[table] = self._changes.get(table, 0) + 1
+            snapshot = self._tables.get(table)
+            if snapshot is None:
+                return
+            column = REFERENCE_TABLES[table][1 if by_name else 0]
+            placeholders = ", ".join(["%s"] * len(keys))
+            with self.pool.connection() as conn, conn.cursor() as cursor:
+                cursor.execute(f"{_select(table)} WHERE {column} IN ({placeholders})", keys)
+                rows = cursor.fetchall()
+            for row in rows:
+                snapshot.put(row)
+            if not by_name:
+                for key in set(keys) - {row[0] for row in rows}:
+                    snapshot.delete(key)
+            self._stats['invalidations'] += 1
+
+    def invalidate(self, table=None):
+        """ 데이터가 바뀐 테이블의 사본을 버림 (table 이 없으면 전체) """
+        with self._lock:
+            tables = [table] if table else list(self._tables) + list(self._oversized)
+            for name in tables:
+                self._tables.pop(name, None)
+                self._oversized.pop(name, None)
+            for name in [table] if table else REFERENCE_TABLES:
+                self._changes[name] = self._changes.get(name, 0) + 1
+            self._stats['invalidations'] += 1
+
+    def stats(self):
+        """ 캐시 적중/실패 통계 """
+        with self._lock:
+            data = dict(self._stats)
+            data['tables'] = {name: len(snapshot.rows) for name, snapshot in self._tables.items()}
+        lookups = data['hits'] + data['misses']
+        data['hit_ratio'] = data['hits'] / lookups if lookups else 0.0
+        return data
+
+    def close(self):
+        """ 적재 전용 풀을 따로 열었으면 닫음 """
+        if self.loader is not self.pool:
+            self.loader.close()
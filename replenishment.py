@@ -0,0 +1,220 @@
+import argparse
+import csv
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from mysql.connector import Error
+
+from cvs import connect, create_purchase_order, read_replenish_config
+
+
+# ========================= 판매 속도 기반 자동 발주 =========================
+FETCH_SIZE = 50000  # 대량 조회 시 한 번에 읽는 행 수
+
+
+def _fetch_arrays(pool, query, args=(), columns=3):
+    """ 정수 컬럼만 돌려주는 쿼리 결과를 컬럼별 int64 배열로 읽음 (비버퍼 커서로 FETCH_SIZE 행씩) """
+    chunks = []
+    with pool.connection() as conn, conn.cursor() as cursor:
+        cursor.execute(query, args)
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            chunks.append(np.array(rows, dtype=np.int64).reshape(-1, columns))
+    data = np.concatenate(chunks) if chunks else np.empty((0, columns), dtype=np.int64)
+    return [data[:, index] for index in range(columns)]
+
+
+def _pair_keys(store_ids, product_ids, product_count):
+    """ (매장 ID, 상품 ID) 쌍을 정렬 가능한 정수 키 하나로 변환 """
+    return store_ids * product_count + product_ids
+
+
+def _lookup(keys, other_keys, other_values):
+    """ keys 각각에 대해 other_keys 에서 같은 키의 값 (없으면 0), 파이썬 반복 없이 정렬 + 이진 탐색 """
+    if not len(other_keys):
+        return np.zeros(len(keys), dtype=np.int64)
+    order = np.argsort(other_keys)
+    sorted_keys = other_keys[order]
+    positions = np.searchsorted(sorted_keys, keys).clip(max=len(sorted_keys) - 1)
+    found = sorted_keys[positions] == keys
+    return np.where(found, other_values[order][positions], 0)
+
+
+def load_inputs(pool, window_days, now=None):
+    """ 전체 매장의 재고, 최근 판매량, 입고 예정 수량, 상품별 공급업체를 한 번씩 대량 조회
+
+    반환값: 재고 행 순서로 맞춘 컬럼별 배열 dict
+    """
+    since = (now or datetime.now()) - timedelta(days=window_days)
+
+    store_ids, product_ids, on_hand = _fetch_arrays(pool, "SELECT store_id, product_id, quantity FROM stock")
+
+    #  최근 판매량 (매장, 상품)별 합계는 DB 에서 집계
+    query = """
+        SELECT t.store_id, td.product_id, CAST(SUM(td.quantity) AS SIGNED)
+        FROM transaction t
+        JOIN transaction_details td ON t.transaction_id = td.transaction_id
+        WHERE t.transaction_date >= %s
+        GROUP BY t.store_id, td.product_id
+    """
+    sold_store, sold_product, sold = _fetch_arrays(pool, query, (since,))
+
+    #  아직 재고에 반영되지 않은 발주 (Pending, Shipped, 반영 전 Delivered) 는 입고 예정 수량
+    query = """
+        SELECT o.store_id, od.product_id, CAST(SUM(od.quantity) AS SIGNED)
+        FROM order_table o
+        JOIN order_details od ON o.order_id = od.order_id
+        WHERE o.stock_applied_at IS NULL
+        GROUP BY o.store_id, od.product_id
+    """
+    inbound_store, inbound_product, inbound = _fetch_arrays(pool, query)
+
+    catalog_product, catalog_supplier = _fetch_arrays(pool, "SELECT product_id, supplier_id FROM product", columns=2)
+
+    product_count = int(max(product_ids.max(initial=0), sold_product.max(initial=0),
+                            inbound_product.max(initial=0), catalog_product.max(initial=0))) + 1
+    keys = _pair_keys(store_ids, product_ids, product_count)
+    suppliers = np.zeros(product_count, dtype=np.int64)
+    suppliers[catalog_product] = catalog_supplier
+
+    return {
+        'store_id': store_ids,
+        'product_id': product_ids,
+        'supplier_id': suppliers[product_ids],
+        'on_hand': on_hand,
+        'sold': _lookup(keys, _pair_keys(sold_store, sold_product, product_count), sold),
+        'inbound': _lookup(keys, _pair_keys(inbound_store, inbound_product, product_count), inbound),
+    }
+
+
+def plan_replenishment(inputs, window_days=28, lead_time_days=3, safety_days=2, review_days=7, pack_size=1):
+    """ (매장, 상품)별 판매 속도, 재고 일수, 발주 수량을 배열 연산으로 계산
+
+    - 판매 속도 = 최근 window_days 일 판매량 / window_days
+    - 재고 일수 = (현재 재고 + 입고 예정) / 판매 속도 (판매가 없으면 inf)
+    - (현재 재고 + 입고 예정) 이 리드타임 + 안전 일수만큼의 판매량보다 적으면
+      다음 발주 주기(review_days)까지 버틸 만큼 발주하고, pack_size 단위로 올림
+    """
+    position = inputs['on_hand'] + inputs['inbound']
+    velocity = inputs['sold'] / float(window_days)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        days_of_cover = np.where(velocity > 0, position / velocity, np.inf)
+
+    reorder_point = velocity * (lead_time_days + safety_days)
+    target = velocity * (lead_time_days + safety_days + review_days)
+    needed = (velocity > 0) & (position < reorder_point)
+    quantity = np.where(needed, np.ceil(target - position), 0).astype(np.int64)
+    quantity = -(-quantity // pack_size) * pack_size
+
+    return {**inputs, 'velocity': velocity, 'days_of_cover': days_of_cover, 'order_quantity': quantity}
+
+
+def proposed_orders(plan):
+    """ 발주 수량이 있는 행을 (매장, 공급업체)별 발주서로 묶음
+
+    반환값: {(매장 ID, 공급업체 ID): [(상품 ID, 수량), ...]}
+    """
+    rows = np.flatnonzero(plan['order_quantity'] > 0)
+    order = rows[np.lexsort((plan['product_id'][rows], plan['supplier_id'][rows], plan['store_id'][rows]))]
+    stores = plan['store_id'][order]
+    suppliers = plan['supplier_id'][order]
+    boundaries = np.flatnonzero((np.diff(stores) != 0) | (np.diff(suppliers) != 0)) + 1
+
+    orders = {}
+    for group in np.split(order, boundaries) if len(order) else []:
+        key = (int(plan['store_id'][group[0]]), int(plan['supplier_id'][group[0]]))
+        orders[key] = list(zip(plan['product_id'][group].tolist(), plan['order_quantity'][group].tolist()))
+    return orders
+
+
+def place_proposed_orders(pool, orders):
+    """ 제안된 발주서를 매장별로 create_purchase_order 한 번씩 실행 (공급업체별 헤더는 그 안에서 생성)
+
+    반환값: 생성된 주문 수
+    """
+    by_store = {}
+    for (store_id, _), lines in orders.items():
+        by_store.setdefault(store_id, []).extend(lines)
+    created = 0
+    for store_id, lines in by_store.items():
+        created += len(create_purchase_order(pool, store_id, lines))
+    return created
+
+
+def print_report(plan, orders, top=20):
+    """ 발주 제안 요약 (건수, 공급업체별 수량, 재고 일수가 가장 짧은 품목) """
+    quantity = plan['order_quantity']
+    rows = np.flatnonzero(quantity > 0)
+    print(f"\n=== 자동 발주 제안 ({len(plan['store_id']):,}개 재고 행 중 {len(rows):,}개 품목, "
+          f"발주서 {len(orders):,}건, 총 {int(quantity.sum()):,}개) ===")
+
+    if not len(rows):
+        return
+
+    supplier_ids, inverse = np.unique(plan['supplier_id'][rows], return_inverse=True)
+    totals = np.bincount(inverse, weights=quantity[rows]).astype(np.int64)
+    print(f"\n{'공급업체 ID':>10} {'품목 수':>8} {'발주 수량':>10}")
+    for index in np.argsort(-totals)[:top]:
+        print(f"{supplier_ids[index]:>10} {np.count_nonzero(inverse == index):>8,} {totals[index]:>10,}")
+
+    print(f"\n{'매장 ID':>8} {'상품 ID':>8} {'재고':>6} {'입고 예정':>8} {'일 판매':>8} {'재고 일수':>8} {'발주':>6}")
+    for index in rows[np.argsort(plan['days_of_cover'][rows], kind='stable')][:top]:
+        print(f"{plan['store_id'][index]:>8} {plan['product_id'][index]:>8} {plan['on_hand'][index]:>6} "
+              f"{plan['inbound'][index]:>8} {plan['velocity'][index]:>8.2f} {plan['days_of_cover'][index]:>8.1f} "
+              f"{quantity[index]:>6}")
+
+
+def write_csv(plan, path):
+    """ 발주 제안 품목을 CSV 로 저장 (검토용) """
+    rows = np.flatnonzero(plan['order_quantity'] > 0)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['store_id', 'supplier_id', 'product_id', 'on_hand', 'inbound', 'velocity',
+                         'days_of_cover', 'order_quantity'])
+        for index in rows:
+            writer.writerow([plan['store_id'][index], plan['supplier_id'][index], plan['product_id'][index],
+                             plan['on_hand'][index], plan['inbound'][index], round(float(plan['velocity'][index]), 3),
+                             round(float(plan['days_of_cover'][index]), 1), plan['order_quantity'][index]])
+
+
+# ========================= 실행 코드 =========================
+if __name__ == '__main__':
+    options = read_replenish_config()
+    parser = argparse.ArgumentParser(description='판매 속도 기반 전 매장 자동 발주 (기본은 제안만 출력하는 dry-run)')
+    parser.add_argument('--apply', action='store_true', help='제안된 발주서를 실제로 생성')
+    parser.add_argument('--csv', help='발주 제안 품목을 저장할 CSV 경로')
+    parser.add_argument('--top', type=int, default=20, help='보고서에 출력할 행 수')
+    for name, value in options.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=value)
+    args = parser.parse_args()
+    settings = {name: getattr(args, name) for name in options}
+
+    pool = connect()
+    if pool is None:
+        raise SystemExit(1)
+
+    try:
+        started = time.perf_counter()
+        inputs = load_inputs(pool, settings['window_days'])
+        loaded = time.perf_counter()
+        plan = plan_replenishment(inputs, **settings)
+        orders = proposed_orders(plan)
+        planned = time.perf_counter()
+        print(f"조회 {loaded - started:.2f}초, 계산 {planned - loaded:.2f}초")
+
+        print_report(plan, orders, args.top)
+        if args.csv:
+            write_csv(plan, args.csv)
+            print(f"\n발주 제안을 저장했습니다: {args.csv}")
+        if args.apply:
+            print(f"\n발주서 {place_proposed_orders(pool, orders):,}건을 생성했습니다.")
+        else:
+            print("\n(dry-run: 발주서는 생성하지 않았습니다. 생성하려면 --apply)")
+    except Error as error:
+        print(f"자동 발주 중 오류 발생: {error}")
+        raise SystemExit(1)
+    finally:
+        pool.close()
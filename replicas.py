@@ -0,0 +1,176 @@
+import itertools
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from mysql.connector import Error, ProgrammingError
+
+from db_pool import ConnectionPool
+
+
+# ========================= 읽기/쓰기 분리 =========================
+# 복제 상태 조회 (MySQL 8.0.22 이상은 REPLICA, 이전 버전은 SLAVE)
+REPLICA_STATUS_QUERIES = (
+    ("SHOW REPLICA STATUS", 'Seconds_Behind_Source'),
+    ("SHOW SLAVE STATUS", 'Seconds_Behind_Master'),
+)
+
+
+class _Replica:
+    """ 복제본 하나의 커넥션 풀과 상태 확인 결과 """
+
+    def __init__(self, name, pool):
+        self.name = name
+        self.pool = pool
+        self.healthy = True
+        self.lag = None         # 마지막으로 확인한 복제 지연(초), 복제 중이 아닌 서버면 None
+        self.checked_at = None  # 마지막 상태 확인 시각 (monotonic)
+        self.checking = False   # 다른 스레드가 상태 확인 중이면 True (그동안은 마지막 결과 사용)
+        self.error = None
+        self.reads = 0
+
+
+class ReadPool:
+    """ 한 단말(세션)의 읽기 전용 조회용 풀 (ReplicaRouter.reader()) - 복제본 또는 주 DB 커넥션을 빌려줌
+
+    - note_write(): 이 단말이 쓰기를 했음을 알림 → max_lag 초 동안 이 단말의 조회만 주 DB 로 (read-your-writes)
+    - primary: 복제본에 아직 없는 행(방금 등록한 거래의 영수증 등)을 다시 찾을 주 DB 풀
+    """
+
+    def __init__(self, router):
+        self.router = router
+        self.primary = router.primary
+        self.dialect = router.primary.dialect
+        self.metrics = router.primary.metrics
+        self._last_write = None
+
+    def note_write(self):
+        self._last_write = time.monotonic()
+
+    @contextmanager
+    def connection(self):
+        """ 건강한 복제본을 라운드로빈으로 골라 대여 (연결에 실패하면 다음 복제본, 모두 안 되면 주 DB) """
+        pinned = self._last_write is not None and time.monotonic() - self._last_write < self.router.max_lag
+        with ExitStack() as stack:
+            for replica in ([] if pinned else self.router.read_candidates()):
+                try:
+                    conn = stack.enter_context(replica.pool.connection())
+                except Error as error:
+                    self.router.mark_down(replica, error)
+                    continue
+                with self.router.lock:
+                    replica.reads += 1
+                yield conn
+                return
+            with self.router.lock:
+                self.router.primary_reads += 1
+            yield stack.enter_context(self.router.primary.connection())
+
+
+class ReplicaRouter:
+    """ 주 DB 1대 + 복제본 여러 대에 쓰기/읽기를 나눠 보내는 라우터
+
+    - 쓰기와 일반 기능은 주 DB 로 (ConnectionPool 과 같은 인터페이스라 기존 코드가 그대로 사용)
+    - reader() 로 얻은 풀의 조회(보고서, 영수증, 목록)는 복제본으로 라운드로빈
+    - 복제본은 check_interval 초마다 연결과 복제 지연을 확인해 연결이 안 되거나, 복제가 멈췄거나,
+      지연이 max_lag 초를 넘으면 다음 확인 때까지 제외 (모두 제외되면 주 DB 에서 조회)
+    - read-your-writes 는 단말 단위: 쓰기를 한 단말의 ReadPool 만 note_write() 후 max_lag 초 동안 주 DB 로 조회하고,
+      영수증은 복제본에 없으면 주 DB 에서 다시 찾음 (ReceiptCache) - 다른 단말의 보고서 조회는 계속 복제본으로
+    """
+
+    def __init__(self, primary, replica_configs, max_lag=5.0, check_interval=10.0, metrics=None, **pool_options):
+        self.primary = primary
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        # 복제본 장애는 주 DB 로 바로 넘길 수 있으므로 재연결 backoff 없이 한 번만 시도
+        pool_options = {**pool_options, 'reconnect_attempts': 1}
+        self.replicas = [_Replica(name, ConnectionPool(config, metrics=metrics, **pool_options))
+                         for name, config in replica_configs]
+        self.lock = threading.Lock()
+        self.primary_reads = 0
+        self._next = itertools.count()
+
+    # ---------- 쓰기 (주 DB) ----------
+    def __getattr__(self, name):
+        # connection/acquire/release/stats/dialect/metrics 등은 주 DB 풀 그대로
+        return getattr(self.primary, name)
+
+    # ---------- 읽기 (복제본) ----------
+    def reader(self):
+        """ 단말(세션)마다 하나씩 쓰는 조회용 풀 """
+        return ReadPool(self)
+
+    def read_candidates(self):
+        """ 이번 조회에 시도할 복제본 (라운드로빈 순서, 건강한 복제본이 없으면 빈 목록) """
+        if not self.replicas:
+            return []
+        start = next(self._next) % len(self.replicas)
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [replica for replica in ordered if self._healthy(replica)]
+
+    def _healthy(self, replica):
+        with self.lock:
+            due = not replica.checking and (replica.checked_at is None
+                                            or time.monotonic() - replica.checked_at >= self.check_interval)
+            if due:
+                replica.checking = True
+        if due:
+            try:
+                self.check(replica)
+            finally:
+                with self.lock:
+                    replica.checking = False
+        return replica.healthy
+
+    def check(self, replica):
+        """ 복제본 연결과 복제 지연 확인 (복제 상태를 볼 권한이 없으면 연결 여부만 확인) """
+        lag, error = None, None
+        try:
+            with replica.pool.connection() as conn, conn.cursor(dictionary=True) as cursor:
+                for query, column in REPLICA_STATUS_QUERIES:
+                    try:
+                        cursor.execute(query)
+                    except ProgrammingError:
+                        continue
+                    status = cursor.fetchone()
+                    cursor.fetchall()
+                    if status is not None:
+                        lag = status.get(column)
+                        if lag is None:
+                            error = "복제가 멈춰 있습니다."
+                        elif lag > self.max_lag:
+                            error = f"복제 지연 {lag}초 (허용 {self.max_lag:g}초)"
+                    break
+        except Error as exc:
+            error = str(exc)
+        with self.lock:
+            replica.lag = lag
+            replica.error = error
+            replica.healthy = error is None
+            replica.checked_at = time.monotonic()
+
+    def mark_down(self, replica, error):
+        """ 조회 중 연결에 실패한 복제본을 다음 상태 확인 때까지 제외 """
+        with self.lock:
+            replica.healthy = False
+            replica.error = str(error)
+            replica.checked_at = time.monotonic()
+
+    # ---------- 관리 ----------
+    def replica_stats(self):
+        """ 복제본별 상태와 조회 횟수, 주 DB 에서 처리한 조회 횟수 """
+        with self.lock:
+            replicas = [{
+                'name': replica.name,
+                'host': f"{replica.pool.db_config.get('host')}:{replica.pool.db_config.get('port', 3306)}",
+                'healthy': replica.healthy,
+                'lag': replica.lag,
+                'error': replica.error,
+                'reads': replica.reads,
+            } for replica in self.replicas]
+            return {'replicas': replicas, 'primary_reads': self.primary_reads}
+
+    def close(self):
+        self.primary.close()
+        for replica in self.replicas:
+            replica.pool.close()
@@ -0,0 +1,395 @@
+import json
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+
+from mysql.connector import DataError, Error, IntegrityError, errorcode
+
+from sales_rollup import add_sale_to_rollup
+
+
+# ========================= 로컬 판매 저널 =========================
+# 판매 한 건의 데이터 문제라 다시 시도해도 반영할 수 없는 오류 (이 오류만 failed 로 표시)
+# 스키마/권한 오류(없는 컬럼, 접근 거부 등)는 고친 뒤 다시 반영되도록 그대로 올려 재시도
+PERMANENT_ERRORS = (
+    errorcode.ER_NO_REFERENCED_ROW,
+    errorcode.ER_NO_REFERENCED_ROW_2,
+    errorcode.ER_BAD_NULL_ERROR,
+    errorcode.ER_CHECK_CONSTRAINT_VIOLATED,
+    errorcode.ER_TRUNCATED_WRONG_VALUE_FOR_FIELD,
+    errorcode.ER_WARN_DATA_OUT_OF_RANGE,
+    errorcode.WARN_DATA_TRUNCATED,
+    errorcode.ER_DATA_TOO_LONG,
+)
+
+
+def _is_permanent(error):
+    return isinstance(error, DataError) or error.errno in PERMANENT_ERRORS
+
+
+JOURNAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sale_journal (
+    entry_id TEXT PRIMARY KEY,              -- MySQL transaction.journal_id 로 저장되어 중복 반영을 막음
+    store_id INTEGER NOT NULL,
+    employee_id INTEGER,
+    payment_method TEXT NOT NULL,
+    lines TEXT NOT NULL,                    -- JSON [[상품 ID, 수량, 판매 시점 단가 또는 null], ...]
+    created_at TEXT NOT NULL,               -- 판매 시각 (거래일자로 사용)
+    status TEXT NOT NULL DEFAULT 'pending', -- pending / synced / failed
+    transaction_id INTEGER,
+    conflicts TEXT,                         -- JSON [[상품 ID, 반영 직전 재고 또는 null, 판매 수량], ...]
+    error TEXT,
+    synced_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_journal_status ON sale_journal (status);
+CREATE TABLE IF NOT EXISTS reference_snapshot (
+    table_name TEXT PRIMARY KEY,            -- 참조 데이터 캐시의 테이블 (store, employee, product 등)
+    rows TEXT NOT NULL,                     -- JSON [[ID, 이름, ...], ...] (ref_cache.REFERENCE_TABLES 의 컬럼 순서)
+    saved_at TEXT NOT NULL
+);
+"""
+
+
+class SaleJournal:
+    """ 판매를 로컬 SQLite 파일에 먼저 기록하는 write-ahead 저널
+
+    - append() 는 로컬 파일에 커밋(synchronous=FULL)되면 바로 반환하므로 MySQL 지연/장애와 무관하게 판매 가능
+    - 기록된 판매는 JournalSyncer 가 순서대로 MySQL 에 반영
+    - 참조 데이터 캐시의 마지막 사본도 같은 파일에 보관 (시작할 때 MySQL 에 연결할 수 없어도 검색/판매 가능)
+    """
+
+    def __init__(self, path='sales_journal.db'):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA synchronous = FULL")
+            self._conn.executescript(JOURNAL_SCHEMA)
+            self._conn.commit()
+
+    def append(self, store_id, employee_id, payment_method, lines):
+        """ 판매 한 건 기록 (같은 상품은 합침)
+
+        lines: [(상품 ID, 수량, 판매 시점 단가 또는 None), ...]
+        반환값: 저널 번호 (entry_id)
+        """
+        merged = {}
+        for product_id, quantity, unit_price in lines:
+            if quantity <= 0:
+                raise ValueError(f"상품 ID {product_id}의 수량은 1개 이상이어야 합니다.")
+            line = merged.setdefault(product_id, [product_id, 0, unit_price])
+            line[1] += quantity
+            if line[2] is None:
+                line[2] = unit_price
+        if not merged:
+            raise ValueError("장바구니가 비어 있습니다.")
+
+        entry_id = uuid.uuid4().hex
+        created_at = datetime.now().isoformat(sep=' ', timespec='seconds')
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sale_journal (entry_id, store_id, employee_id, payment_method, lines, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (entry_id, store_id, employee_id, payment_method, json.dumps(list(merged.values())), created_at),
+            )
+            self._conn.commit()
+        return entry_id
+
+    def pending(self, limit=100):
+        """ 아직 반영되지 않은 판매 (기록 순서) """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT entry_id, store_id, employee_id, payment_method, lines, created_at "
+                "FROM sale_journal WHERE status = 'pending' ORDER BY rowid LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [
+            {
+                'entry_id': entry_id,
+                'store_id': store_id,
+                'employee_id': employee_id,
+                'payment_method': payment_method,
+                'lines': json.loads(lines),
+                'created_at': datetime.fromisoformat(created_at),
+            }
+            for entry_id, store_id, employee_id, payment_method, lines, created_at in rows
+        ]
+
+    def mark_synced(self, results):
+        """ 반영 완료 표시 (results: {entry_id: (거래 ID, 재고 충돌 목록)}) """
+        synced_at = datetime.now().isoformat(sep=' ', timespec='seconds')
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE sale_journal SET status = 'synced', transaction_id = ?, conflicts = ?, synced_at = ? "
+                "WHERE entry_id = ?",
+                [
+                    (transaction_id, json.dumps(conflicts) if conflicts else None, synced_at, entry_id)
+                    for entry_id, (transaction_id, conflicts) in results.items()
+                ],
+            )
+            self._conn.commit()
+
+    def mark_failed(self, entry_id, error):
+        """ 다시 시도해도 반영할 수 없는 판매 (없는 상품/직원 등) 표시 """
+        with self._lock:
+            self._conn.execute("UPDATE sale_journal SET status = 'failed', error = ? WHERE entry_id = ?",
+                               (str(error), entry_id))
+            self._conn.commit()
+
+    def requeue_failed(self, entry_ids=None):
+        """ 실패한 판매를 다시 반영 대기(pending)로 돌림 (entry_ids 가 없으면 전체) → 돌린 건수 """
+        query = "UPDATE sale_journal SET status = 'pending', error = NULL WHERE status = 'failed'"
+        args = []
+        if entry_ids is not None:
+            query += f" AND entry_id IN ({', '.join(['?'] * len(entry_ids))})"
+            args = list(entry_ids)
+        with self._lock:
+            count = self._conn.execute(query, args).rowcount
+            self._conn.commit()
+        return count
+
+    def conflicts(self, limit=20):
+        """ 재고가 부족한 상태로 반영된 판매 (최근 순)
+
+        반환값: [(저널 번호, 거래 ID, 판매 시각, [(상품 ID, 반영 직전 재고, 판매 수량), ...])]
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT entry_id, transaction_id, created_at, conflicts FROM sale_journal "
+                "WHERE conflicts IS NOT NULL ORDER BY rowid DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [(entry_id, transaction_id, created_at, json.loads(conflicts))
+                for entry_id, transaction_id, created_at, conflicts in rows]
+
+    def failures(self, limit=20):
+        """ 반영에 실패한 판매 (최근 순): [(저널 번호, 판매 시각, 오류)] """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT entry_id, created_at, error FROM sale_journal WHERE status = 'failed' ORDER BY rowid DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+
+    def counts(self):
+        """ 상태별 건수와 재고 충돌 건수 """
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM sale_journal GROUP BY status").fetchall())
+            conflicts = self._conn.execute("SELECT COUNT(*) FROM sale_journal WHERE conflicts IS NOT NULL").fetchone()[0]
+        return {
+            'pending': counts.get('pending', 0),
+            'synced': counts.get('synced', 0),
+            'failed': counts.get('failed', 0),
+            'conflicts': conflicts,
+        }
+
+    def save_reference(self, table, rows):
+        """ 참조 데이터 캐시가 MySQL 에서 다시 적재한 테이블 사본 저장 (테이블별로 마지막 사본 하나만 보관) """
+        data = json.dumps([list(row) for row in rows])
+        saved_at = datetime.now().isoformat(sep=' ', timespec='seconds')
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO reference_snapshot (table_name, rows, saved_at) VALUES (?, ?, ?)",
+                               (table, data, saved_at))
+            self._conn.commit()
+
+    def load_reference(self, table):
+        """ 저장해 둔 테이블 사본 (행 튜플 목록, 저장한 적이 없으면 None) """
+        with self._lock:
+            row = self._conn.execute("SELECT rows FROM reference_snapshot WHERE table_name = ?", (table,)).fetchone()
+        if row is None:
+            return None
+        return [tuple(values) for values in json.loads(row[0])]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ========================= MySQL 반영 =========================
+def _apply_entry(cursor, entry):
+    """ 저널의 판매 한 건을 거래로 등록 (재고가 모자라도 판매는 이미 끝났으므로 등록하고 재고는 0 에서 멈춤)
+
+    반환값: (거래 ID, [(상품 ID, 반영 직전 재고 또는 None, 판매 수량)])
+    """
+    lines = {product_id: (quantity, unit_price) for product_id, quantity, unit_price in entry['lines']}
+    product_ids = sorted(lines)
+    placeholders = ", ".join(["%s"] * len(product_ids))
+    store_id = entry['store_id']
+
+    query = f"""
+        -- name: journal_stock_check
+        SELECT product_id, quantity FROM stock
+        WHERE store_id = %s AND product_id IN ({placeholders})
+        FOR UPDATE
+    """
+    cursor.execute(query, (store_id, *product_ids))
+    current = dict(cursor.fetchall())
+    conflicts = [
+        [product_id, current.get(product_id), lines[product_id][0]]
+        for product_id in product_ids
+        if current.get(product_id) is None or current[product_id] < lines[product_id][0]
+    ]
+
+    #  단가가 기록되지 않은 품목(오프라인이라 가격을 몰랐던 경우)은 현재 가격 사용
+    prices = {product_id: unit_price for product_id, (_, unit_price) in lines.items() if unit_price is not None}
+    missing = [product_id for product_id in product_ids if product_id not in prices]
+    if missing:
+        query = f"SELECT product_id, price FROM product WHERE product_id IN ({', '.join(['%s'] * len(missing))})"
+        cursor.execute(query, missing)
+        prices.update(cursor.fetchall())
+        unknown = [product_id for product_id in missing if product_id not in prices]
+        if unknown:
+            raise IntegrityError(msg=f"등록되지 않은 상품 ID: {', '.join(map(str, unknown))}",
+                                 errno=errorcode.ER_NO_REFERENCED_ROW_2)
+
+    subtotals = {product_id: prices[product_id] * quantity for product_id, (quantity, _) in lines.items()}
+    total_sales = sum(subtotals.values())
+
+    query = """
+        INSERT INTO transaction (store_id, employee_id, transaction_date, total_amount, payment_method, journal_id)
+        VALUES (%s, %s, %s, %s, %s, %s) -- name: journal_insert_header
+    """
+    cursor.execute(query, (store_id, entry['employee_id'], entry['created_at'], total_sales,
+                           entry['payment_method'], entry['entry_id']))
+    transaction_id = cursor.lastrowid
+
+    query = "INSERT INTO transaction_details (transaction_id, product_id, quantity, unit_price, subtotal) VALUES (%s, %s, %s, %s, %s) -- name: journal_insert_details"
+    cursor.executemany(query, [
+        (transaction_id, product_id, quantity, prices[product_id], subtotals[product_id])
+        for product_id, (quantity, _) in lines.items()
+    ])
+
+    cases = " ".join(["WHEN %s THEN %s"] * len(product_ids))
+    query = f"""
+        -- name: journal_decrement_stock
+        UPDATE stock
+        SET quantity = GREATEST(quantity - CASE product_id {cases} END, 0)
+        WHERE store_id = %s AND product_id IN ({placeholders})
+    """
+    args = [value for product_id in product_ids for value in (product_id, lines[product_id][0])]
+    cursor.execute(query, (*args, store_id, *product_ids))
+
+    add_sale_to_rollup(cursor, transaction_id, total_sales, sum(quantity for quantity, _ in lines.values()))
+    return transaction_id, conflicts
+
+
+def _sync_entries(pool, entries):
+    """ 판매 여러 건을 하나의 MySQL 트랜잭션으로 반영 (이미 반영된 저널 번호는 기존 거래 ID 만 확인)
+
+    반환값: {entry_id: (거래 ID, 재고 충돌 목록)}
+    """
+    results = {}
+    placeholders = ", ".join(["%s"] * len(entries))
+    with pool.connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                query = f"SELECT journal_id, transaction_id FROM transaction WHERE journal_id IN ({placeholders})"
+                cursor.execute(query, [entry['entry_id'] for entry in entries])
+                existing = dict(cursor.fetchall())
+                for entry in entries:
+                    if entry['entry_id'] in existing:
+                        results[entry['entry_id']] = (existing[entry['entry_id']], [])
+                    else:
+                        results[entry['entry_id']] = _apply_entry(cursor, entry)
+            conn.commit()
+        except Error:
+            conn.rollback()
+            raise
+    return results
+
+
+def sync_journal(pool, journal, batch_size=100):
+    """ 저널에 쌓인 판매를 배치 단위로 MySQL 에 반영 (여러 번 실행해도 같은 판매는 한 번만 반영)
+
+    - 연결 오류, 스키마/권한 오류 등은 그대로 올려 다음 주기에 다시 시도 (판매는 pending 으로 남음)
+    - 판매 한 건의 데이터 오류(PERMANENT_ERRORS: 없는 상품/직원 등)가 난 배치는 한 건씩 다시 반영해 해당 판매만 failed 로 표시
+      (원인을 고친 뒤 SaleJournal.requeue_failed() 로 다시 반영 대기로 돌릴 수 있음)
+    반환값: (반영 건수, 재고 충돌 건수, 실패 건수)
+    """
+    synced = conflicted = failed = 0
+    while True:
+        entries = journal.pending(batch_size)
+        if not entries:
+            break
+        try:
+            results = _sync_entries(pool, entries)
+        except Error as error:
+            if not _is_permanent(error):
+                raise
+            results = {}
+            for entry in entries:
+                try:
+                    results.update(_sync_entries(pool, [entry]))
+                except Error as error:
+                    if not _is_permanent(error):
+                        journal.mark_synced(results)  # 이미 커밋된 판매는 반영 완료로 남김
+                        raise
+                    journal.mark_failed(entry['entry_id'], error)
+                    failed += 1
+        journal.mark_synced(results)
+        synced += len(results)
+        conflicted += sum(1 for _, conflicts in results.values() if conflicts)
+    return synced, conflicted, failed
+
+
+class JournalSyncer:
+    """ 저널을 주기적으로 MySQL 에 반영하는 백그라운드 스레드 (실패하면 대기 시간을 늘려 재시도) """
+
+    def __init__(self, pool, journal, interval=2.0, batch_size=100, max_backoff=60.0):
+        self.pool = pool
+        self.journal = journal
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_backoff = max_backoff
+        self._stop = threading.Event()
+        self._sync_lock = threading.Lock()
+        self._thread = None
+        self._status = {'last_sync': None, 'last_error': None, 'synced': 0, 'conflicts': 0, 'failed': 0}
+
+    def sync_now(self):
+        """ 지금 바로 반영 (백그라운드 반영과 동시에 실행되지 않음)
+
+        반환값: (반영 건수, 재고 충돌 건수, 실패 건수)
+        """
+        with self._sync_lock:
+            try:
+                synced, conflicted, failed = sync_journal(self.pool, self.journal, self.batch_size)
+            except Error as error:
+                self._status['last_error'] = str(error)
+                raise
+            self._status['last_sync'] = datetime.now().isoformat(sep=' ', timespec='seconds')
+            self._status['last_error'] = None
+            self._status['synced'] += synced
+            self._status['conflicts'] += conflicted
+            self._status['failed'] += failed
+            return synced, conflicted, failed
+
+    def _run(self):
+        delay = self.interval
+        while not self._stop.wait(delay):
+            try:
+                self.sync_now()
+                delay = self.interval
+            except Error:
+                delay = min(delay * 2, self.max_backoff)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='journal-syncer', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, drain=True, timeout=10.0):
+        """ 백그라운드 반영 종료 (drain 이면 마지막으로 한 번 더 반영 시도) """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if drain:
+            try:
+                self.sync_now()
+            except Error:
+                pass
+
+    def status(self):
+        """ 저널 상태별 건수(journal)와 이번 실행에서의 반영 결과 """
+        return {'journal': self.journal.counts(), **self._status}
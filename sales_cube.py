@@ -0,0 +1,283 @@
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+from mysql.connector import Error
+
+from query_metrics import track_operation
+from sales_rollup import month_start
+
+
+# ========================= 매장 × 카테고리 × 일별 매출 큐브 =========================
+GROUPS = ('store', 'category', 'day', 'week', 'month')
+MEASURES = ('revenue', 'quantity')
+
+
+class SalesCube:
+    """ (매장, 카테고리, 일자)별 매출 금액/수량을 밀집 배열로 메모리에 두고 잘라서 합계를 내는 큐브
+
+    - days: 오늘부터 거슬러 올라가 보관할 일 수 (큐브 크기 = 매장 수 x 카테고리 수 x 일 수 x 16 바이트)
+    - refresh(): 마지막으로 반영한 거래 ID 이후의 거래만 읽어 더함
+      (먼저 ID 를 받고 늦게 커밋된 거래도 놓치지 않도록 마지막 overlap 개 ID 는 다시 읽고, 이미 반영한 거래는 건너뜀)
+    - archive: 월별 보관 파일(TransactionArchive)로 옮긴 기간도 처음 만들 때 함께 집계
+    - 기존 거래 금액을 고친 경우(금액 보정 등)에는 build() 로 다시 만듦
+    """
+
+    def __init__(self, pool, days=400, overlap=1000, archive=None):
+        self.pool = pool
+        self.days = days
+        self.overlap = overlap
+        self.archive = archive
+        self.origin = None  # 0 번째 일자
+        self.store_ids = np.empty(0, dtype=np.int64)
+        self.store_names = {}
+        self.store_locations = {}
+        self.categories = []
+        self.revenue = np.zeros((0, 0, 0), dtype=np.int64)
+        self.quantity = np.zeros((0, 0, 0), dtype=np.int64)
+        self.last_transaction_id = 0
+        self.built_at = None
+        self.refreshed_at = None
+        self._recent_ids = set()  # 마지막 overlap 개 ID 중 이미 반영한 거래 ID
+        self._product_categories = {}
+        self._lock = threading.Lock()          # 큐브 배열/차원 변경과 조회
+        self._refresh_lock = threading.Lock()  # build/refresh 를 한 번에 하나씩 (DB 조회 중에도 조회는 막지 않음)
+
+    # ---------- 차원 ----------
+    @staticmethod
+    def _fetch_dimensions(cursor):
+        """ 매장 (ID, 이름, 위치) 목록과 {상품 ID: 카테고리} 조회 """
+        cursor.execute("SELECT store_id, name, location FROM store ORDER BY store_id")
+        stores = cursor.fetchall()
+        cursor.execute("SELECT product_id, category FROM product")
+        return stores, dict(cursor.fetchall())
+
+    def _set_dimensions(self, stores, product_categories):
+        self._product_categories = product_categories
+        self.store_names = {row[0]: row[1] for row in stores}
+        self.store_locations = {row[0]: row[2] for row in stores}
+        self._grow([row[0] for row in stores], sorted(set(self._product_categories.values())),
+                   self.origin + timedelta(days=self.days - 1))
+
+    def _grow(self, store_ids=(), categories=(), last_day=None):
+        """ 새 매장/카테고리/일자가 들어오면 큐브 축을 늘림 (기존 값은 그대로) """
+        new_stores = np.setdiff1d(np.asarray(store_ids, dtype=np.int64), self.store_ids)
+        new_categories = [category for category in dict.fromkeys(categories) if category not in self.categories]
+        extra_days = 0 if last_day is None else max((last_day - self.origin).days + 1 - self.revenue.shape[2], 0)
+        if not len(new_stores) and not new_categories and not extra_days:
+            return
+
+        store_ids = np.concatenate([self.store_ids, new_stores])
+        order = np.argsort(store_ids, kind='stable')
+        shape = (len(store_ids), len(self.categories) + len(new_categories), self.revenue.shape[2] + extra_days)
+        for name in MEASURES:
+            old = getattr(self, name)
+            grown = np.zeros(shape, dtype=np.int64)
+            grown[:old.shape[0], :old.shape[1], :old.shape[2]] = old
+            setattr(self, name, grown[order])
+        self.store_ids = store_ids[order]
+        self.categories = self.categories + new_categories
+
+    def _columns(self, categories):
+        """ 카테고리 목록 → 카테고리 축 위치 배열 (처음 보는 카테고리는 축을 늘림) """
+        self._grow(categories=categories)
+        index = {category: position for position, category in enumerate(self.categories)}
+        return np.array([index[category] for category in categories], dtype=np.int64)
+
+    def _add(self, store_ids, columns, offsets, revenue, quantity):
+        """ (매장 ID, 카테고리 위치, 일자 위치) 행 배열을 큐브에 더함 (보관 기간 이전 일자는 버림) """
+        keep = offsets >= 0
+        if not keep.any():
+            return
+        store_ids, columns, offsets = store_ids[keep], columns[keep], offsets[keep]
+        self._grow(store_ids, last_day=self.origin + timedelta(days=int(offsets.max())))
+        stores = np.searchsorted(self.store_ids, store_ids)
+        np.add.at(self.revenue, (stores, columns, offsets), revenue[keep])
+        np.add.at(self.quantity, (stores, columns, offsets), quantity[keep])
+
+    def _add_rows(self, rows):
+        """ [(매장 ID, 카테고리, 일자, 금액, 수량)] 조회 결과를 큐브에 더함 """
+        if not rows:
+            return
+        store_ids, categories, days, revenue, quantity = zip(*rows)
+        offsets = np.array([(day - self.origin).days for day in days], dtype=np.int64)
+        self._add(np.array(store_ids, dtype=np.int64), self._columns(list(categories)), offsets,
+                  np.array(revenue, dtype=np.int64), np.array(quantity, dtype=np.int64))
+
+    def _add_archive(self):
+        """ 보관 기간 안의 보관 파일 거래를 큐브에 더함 (상품 카테고리는 현재 product 테이블 기준) """
+        for month in self.archive.months():
+            if month < month_start(self.origin):
+                continue
+            data = self.archive.load(month)
+            headers = np.searchsorted(data['transaction_id'], data['detail_transaction_id'])
+            products, inverse = np.unique(data['product_id'], return_inverse=True)
+            columns = self._columns([self._product_categories.get(product_id, '-') for product_id in products.tolist()])
+            days = data['transaction_date'][headers].astype('datetime64[D]') - np.datetime64(self.origin, 'D')
+            self._add(data['store_id'][headers], columns[inverse.reshape(-1)], days.astype(np.int64),
+                      data['subtotal'], data['quantity'])
+
+    # ---------- 적재 ----------
+    @track_operation('sales_cube_build')
+    def build(self, today=None):
+        """ 보관 기간 전체를 DB 에서 (매장, 카테고리, 일자)별로 집계해 큐브를 처음부터 만듦 """
+        started = time.perf_counter()
+        with self._refresh_lock, self._lock:
+            self.origin = (today or date.today()) - timedelta(days=self.days - 1)
+            self.store_ids = np.empty(0, dtype=np.int64)
+            self.categories = []
+            self.revenue = np.zeros((0, 0, 0), dtype=np.int64)
+            self.quantity = np.zeros((0, 0, 0), dtype=np.int64)
+
+            with self.pool.connection() as conn:
+                try:
+                    with conn.cursor() as cursor:
+                        # 같은 트랜잭션(REPEATABLE READ)에서 최대 ID 를 먼저 정하고 그 이하만 집계
+                        cursor.execute("SELECT COALESCE(MAX(transaction_id), 0) FROM transaction")
+                        last_id = cursor.fetchone()[0]
+                        self._set_dimensions(*self._fetch_dimensions(cursor))
+
+                        query = """
+                            -- name: sales_cube_build
+                            SELECT
+                                t.store_id,
+                                p.category,
+                                DATE(t.transaction_date) AS sales_day,
+                                CAST(SUM(td.subtotal) AS SIGNED),
+                                CAST(SUM(td.quantity) AS SIGNED)
+                            FROM transaction t
+                            JOIN transaction_details td ON t.transaction_id = td.transaction_id
+                            JOIN product p ON td.product_id = p.product_id
+                            WHERE t.transaction_date >= %s AND t.transaction_id <= %s
+                            GROUP BY t.store_id, p.category, sales_day
+                        """
+                        cursor.execute(query, (self.origin, last_id))
+                        self._add_rows(cursor.fetchall())
+
+                        cursor.execute("SELECT transaction_id FROM transaction WHERE transaction_id > %s AND transaction_id <= %s",
+                                       (last_id - self.overlap, last_id))
+                        self._recent_ids = {row[0] for row in cursor.fetchall()}
+                    conn.commit()
+                except Error:
+                    conn.rollback()
+                    raise
+
+            if self.archive is not None:
+                self._add_archive()
+            self.last_transaction_id = last_id
+            self.built_at = self.refreshed_at = time.time()
+        return time.perf_counter() - started
+
+    @track_operation('sales_cube_refresh')
+    def refresh(self):
+        """ 마지막 반영 이후 새로 등록된 거래만 큐브에 더함 (처음이면 build)
+
+        반환값: 새로 반영한 거래 수
+        """
+        if self.origin is None:
+            self.build()
+            return 0
+
+        query = """
+            -- name: sales_cube_refresh
+            SELECT
+                t.transaction_id,
+                t.store_id,
+                p.category,
+                DATE(t.transaction_date) AS sales_day,
+                CAST(SUM(td.subtotal) AS SIGNED),
+                CAST(SUM(td.quantity) AS SIGNED)
+            FROM transaction t
+            JOIN transaction_details td ON t.transaction_id = td.transaction_id
+            JOIN product p ON td.product_id = p.product_id
+            WHERE t.transaction_id > %s
+            GROUP BY t.transaction_id, t.store_id, p.category, sales_day
+        """
+        # DB 조회는 잠금 없이 하고 (그동안 query() 는 이전 큐브로 응답) 반영할 때만 잠금
+        with self._refresh_lock:
+            dimensions = None
+            with self.pool.connection() as conn, conn.cursor() as cursor:
+                cursor.execute(query, (self.last_transaction_id - self.overlap,))
+                rows = [row for row in cursor.fetchall() if row[0] not in self._recent_ids]
+                if any(row[1] not in self.store_names for row in rows):
+                    dimensions = self._fetch_dimensions(cursor)  # 새 매장의 이름/위치
+
+            with self._lock:
+                if dimensions is not None:
+                    self._set_dimensions(*dimensions)
+                self._add_rows([row[1:] for row in rows])
+                new_ids = {row[0] for row in rows}
+                self.last_transaction_id = max([self.last_transaction_id, *new_ids])
+                self._recent_ids = {transaction_id for transaction_id in self._recent_ids | new_ids
+                                    if transaction_id > self.last_transaction_id - self.overlap}
+                self.refreshed_at = time.time()
+        return len(new_ids)
+
+    # ---------- 조회 ----------
+    def _day_range(self, start, end):
+        """ [start, end] 일자 → 일자 축 slice (범위를 큐브 안으로 자름) """
+        length = self.revenue.shape[2]
+        first = 0 if start is None else max((start - self.origin).days, 0)
+        last = length if end is None else min((end - self.origin).days + 1, length)
+        return slice(first, max(first, last))
+
+    def query(self, by='category', start=None, end=None, store_ids=None, location=None, categories=None,
+              measure='revenue'):
+        """ 기간/매장/카테고리로 자른 큐브를 by 기준으로 합산 (DB 조회 없음)
+
+        - by: 'store' | 'category' | 'day' | 'week' (월요일 시작) | 'month'
+        - start, end: 포함 기간 (date, 없으면 보관 기간 전체)
+        - store_ids: 매장 ID 목록, location: 매장 위치에 포함된 문자열 (예: '서울'), categories: 카테고리 목록
+        반환값: [(키, 합계)] (매장/카테고리는 합계 내림차순, 일/주/월은 날짜순, 합계 0 인 키는 제외)
+        """
+        if by not in GROUPS or measure not in MEASURES:
+            raise ValueError(f"by 는 {', '.join(GROUPS)}, measure 는 {', '.join(MEASURES)} 중 하나여야 합니다.")
+
+        with self._lock:
+            cube = getattr(self, measure)
+            stores = np.ones(len(self.store_ids), dtype=bool)
+            if store_ids is not None:
+                stores &= np.isin(self.store_ids, list(store_ids))
+            if location:
+                stores &= np.array([location in (self.store_locations.get(store_id) or '')
+                                    for store_id in self.store_ids.tolist()], dtype=bool)
+            columns = np.ones(len(self.categories), dtype=bool)
+            if categories is not None:
+                columns &= np.isin(np.array(self.categories, dtype=object), list(categories))
+            days = self._day_range(start, end)
+
+            selected = cube[stores][:, columns, days]
+            if by == 'store':
+                keys, values = self.store_ids[stores].tolist(), selected.sum(axis=(1, 2))
+            elif by == 'category':
+                keys, values = [category for category, kept in zip(self.categories, columns) if kept], selected.sum(axis=(0, 2))
+            else:
+                first_day = self.origin + timedelta(days=days.start)
+                dates = [first_day + timedelta(days=offset) for offset in range(selected.shape[2])]
+                daily = selected.sum(axis=(0, 1))
+                if by == 'week':
+                    dates = [day - timedelta(days=day.weekday()) for day in dates]
+                elif by == 'month':
+                    dates = [month_start(day) for day in dates]
+                totals = {}
+                for day, value in zip(dates, daily.tolist()):
+                    totals[day] = totals.get(day, 0) + value
+                return [(day, value) for day, value in totals.items() if value]
+
+        result = [(key, int(value)) for key, value in zip(keys, values.tolist()) if value]
+        return sorted(result, key=lambda item: item[1], reverse=True)
+
+    def stats(self):
+        """ 큐브 크기와 적재 상태 """
+        with self._lock:
+            return {
+                'stores': len(self.store_ids),
+                'categories': len(self.categories),
+                'days': self.revenue.shape[2],
+                'origin': self.origin,
+                'bytes': self.revenue.nbytes + self.quantity.nbytes,
+                'last_transaction_id': self.last_transaction_id,
+                'built_at': self.built_at,
+                'refreshed_at': self.refreshed_at,
+            }
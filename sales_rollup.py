@@ -0,0 +1,151 @@
+from datetime import date
+
+from mysql.connector import Error
+
+
+# ========================= 직원별 월간 판매 집계 =========================
+def month_start(value=None):
+    """ 날짜(또는 'YYYY-MM' 문자열)를 해당 월 1일로 변환 (없으면 이번 달) """
+    if value is None:
+        value = date.today()
+    if isinstance(value, str):
+        year, month = value.strip().split('-')[:2]
+        return date(int(year), int(month), 1)
+    return date(value.year, value.month, 1)
+
+
+def next_month(value):
+    """ 다음 달 1일 """
+    if value.month == 12:
+        return date(value.year + 1, 1, 1)
+    return date(value.year, value.month + 1, 1)
+
+
+def add_sale_to_rollup(cursor, transaction_id, total_sales, total_quantity):
+    """ 거래 등록과 같은 트랜잭션 안에서 해당 직원의 월간 판매 집계에 금액을 더함 """
+    query = """
+        INSERT INTO employee_sales_monthly (sales_month, store_id, employee_id, total_sales, total_quantity)
+        SELECT DATE_FORMAT(t.transaction_date, '%Y-%m-01'), t.store_id, t.employee_id, %s, %s
+        FROM transaction t
+        WHERE t.transaction_id = %s AND t.employee_id IS NOT NULL
+        ON DUPLICATE KEY UPDATE
+            total_sales = total_sales + VALUES(total_sales),
+            total_quantity = total_quantity + VALUES(total_quantity)
+    """
+    cursor.execute(query, (total_sales, total_quantity, transaction_id))
+
+
+def _raw_sales_query(month=None):
+    """ 원본 거래 테이블을 조인해 (월, 매장, 직원)별 판매 금액(저장된 소계 합)을 집계하는 쿼리와 파라미터 """
+    query = """
+        SELECT
+            DATE_FORMAT(t.transaction_date, '%Y-%m-01') AS sales_month,
+            t.store_id,
+            t.employee_id,
+            SUM(td.subtotal) AS total_sales,
+            SUM(td.quantity) AS total_quantity
+        FROM transaction t
+        JOIN transaction_details td ON t.transaction_id = td.transaction_id
+        WHERE t.employee_id IS NOT NULL {month_filter}
+        GROUP BY sales_month, t.store_id, t.employee_id
+    """
+    if month is None:
+        return query.format(month_filter=''), ()
+    start = month_start(month)
+    month_filter = "AND t.transaction_date >= %s AND t.transaction_date < %s"
+    return query.format(month_filter=month_filter), (start, next_month(start))
+
+
+def rebuild_sales_rollup(pool, month=None, archive=None):
+    """ 원본 거래 데이터로 월간 판매 집계를 처음부터 다시 만듦 (month 가 없으면 전체 기간)
+
+    archive: 월별 보관 파일(TransactionArchive)로 옮긴 거래도 함께 집계
+    """
+    raw_query, raw_args = _raw_sales_query(month)
+    archived = archive.sales_totals(month) if archive is not None else []
+
+    with pool.connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                if month is None:
+                    cursor.execute("DELETE FROM employee_sales_monthly")
+                else:
+                    cursor.execute("DELETE FROM employee_sales_monthly WHERE sales_month = %s", (month_start(month),))
+                query = f"""
+                    INSERT INTO employee_sales_monthly (sales_month, store_id, employee_id, total_sales, total_quantity)
+                    {raw_query}
+                """
+                cursor.execute(query, raw_args)
+                rebuilt = cursor.rowcount
+                if archived:
+                    query = """
+                        INSERT INTO employee_sales_monthly (sales_month, store_id, employee_id, total_sales, total_quantity)
+                        VALUES (%s, %s, %s, %s, %s)
+                        ON DUPLICATE KEY UPDATE
+                            total_sales = total_sales + VALUES(total_sales),
+                            total_quantity = total_quantity + VALUES(total_quantity)
+                    """
+                    cursor.executemany(query, archived)
+                    rebuilt += len(archived)
+            conn.commit()
+        except Error:
+            conn.rollback()
+            raise
+
+    return rebuilt
+
+
+def verify_sales_rollup(pool, month=None, archive=None):
+    """ 월간 판매 집계와 원본 조인 결과(archive 가 있으면 보관된 거래 포함)를 비교해 다른 항목 목록을 반환
+
+    반환값: [(월, 매장 ID, 직원 ID, 집계 금액, 원본 금액)], 비어 있으면 일치
+    """
+    raw_query, raw_args = _raw_sales_query(month)
+
+    with pool.connection() as conn, conn.cursor() as cursor:
+        cursor.execute(raw_query, raw_args)
+        raw = {(str(row[0]), row[1], row[2]): int(row[3]) for row in cursor.fetchall()}
+        for sales_month, store_id, employee_id, total_sales, _ in (archive.sales_totals(month) if archive else []):
+            key = (str(sales_month), store_id, employee_id)
+            raw[key] = raw.get(key, 0) + total_sales
+
+        if month is None:
+            cursor.execute("SELECT sales_month, store_id, employee_id, total_sales FROM employee_sales_monthly")
+        else:
+            cursor.execute(
+                "SELECT sales_month, store_id, employee_id, total_sales FROM employee_sales_monthly WHERE sales_month = %s",
+                (month_start(month),),
+            )
+        rollup = {(str(row[0]), row[1], row[2]): int(row[3]) for row in cursor.fetchall()}
+
+    mismatches = []
+    for key in sorted(raw.keys() | rollup.keys()):
+        if raw.get(key, 0) != rollup.get(key, 0):
+            mismatches.append((*key, rollup.get(key, 0), raw.get(key, 0)))
+    return mismatches
+
+
+def fetch_top_employees(pool, month=None, store_id=None, limit=10):
+    """ 월간 판매 집계에서 해당 월(및 매장)의 판매 상위 직원 조회
+
+    반환값: [(직원 ID, 이름, 총 판매 금액)]
+    """
+    query = """
+        SELECT r.employee_id, e.name, SUM(r.total_sales) AS total_sales
+        FROM employee_sales_monthly r
+        JOIN employee e ON r.employee_id = e.employee_id
+        WHERE r.sales_month = %s {store_filter}
+        GROUP BY r.employee_id, e.name
+        ORDER BY total_sales DESC
+        LIMIT %s
+    """
+    args = [month_start(month)]
+    store_filter = ''
+    if store_id is not None:
+        store_filter = 'AND r.store_id = %s'
+        args.append(store_id)
+    args.append(limit)
+
+    with pool.connection() as conn, conn.cursor() as cursor:
+        cursor.execute(query.format(store_filter=store_filter), args)
+        return cursor.fetchall()
@@ -0,0 +1,147 @@
+-- 편의점 DB 스키마 (README.md 의 SQL 코드와 동일, 벤치마크/테스트 DB 생성용)
+-- 대상 데이터베이스를 먼저 선택한 뒤 실행
+
+-- 공급업체 테이블
+CREATE TABLE supplier (
+    supplier_id INT NOT NULL AUTO_INCREMENT,
+    name VARCHAR(100) NOT NULL UNIQUE,
+    contact VARCHAR(50) NULL,
+    address VARCHAR(100) NULL,
+    PRIMARY KEY (supplier_id)
+);
+
+-- 매장 테이블
+CREATE TABLE store (
+    store_id INT NOT NULL AUTO_INCREMENT,
+    name VARCHAR(50) NOT NULL UNIQUE,
+    location VARCHAR(100) NOT NULL,
+    manager_id INT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (store_id)
+);
+
+-- 직원 테이블
+CREATE TABLE employee (
+    employee_id INT NOT NULL AUTO_INCREMENT,
+    store_id INT NOT NULL,
+    name VARCHAR(50) NOT NULL,
+    role ENUM('Manager', 'Cashier', 'Stocker') NOT NULL,
+    hire_date DATE NOT NULL,
+    phone VARCHAR(15) NULL,
+    PRIMARY KEY (employee_id),
+    INDEX idx_employee_store_name (store_id, name),
+    FOREIGN KEY (store_id) REFERENCES store(store_id) ON DELETE CASCADE
+);
+
+-- 매장의 관리자 관계 설정 (관리자가 사라지면 NULL)
+ALTER TABLE store 
+ADD CONSTRAINT FK_STORE_MANAGER 
+FOREIGN KEY (manager_id) REFERENCES employee(employee_id) ON DELETE SET NULL;
+
+-- 상품 테이블
+CREATE TABLE product (
+    product_id INT NOT NULL AUTO_INCREMENT,
+    name VARCHAR(100) NOT NULL UNIQUE,
+    category VARCHAR(50) NOT NULL,
+    price BIGINT NOT NULL CHECK (price >= 0),
+    supplier_id INT NOT NULL,
+    PRIMARY KEY (product_id),
+    FOREIGN KEY (supplier_id) REFERENCES supplier(supplier_id) ON DELETE CASCADE
+);
+
+-- 주문 테이블 (매장이 공급업체에 주문하는 내역)
+CREATE TABLE order_table (
+    order_id INT NOT NULL AUTO_INCREMENT,
+    store_id INT NOT NULL,
+    supplier_id INT NOT NULL,
+    order_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    status ENUM('Pending', 'Shipped', 'Delivered') DEFAULT 'Pending',
+    stock_applied_at TIMESTAMP NULL DEFAULT NULL, -- 배송 수량을 재고에 반영한 시각 (NULL 이면 미반영)
+    PRIMARY KEY (order_id),
+    INDEX idx_order_delivery (status, stock_applied_at),
+    INDEX idx_order_store_supplier_date (store_id, supplier_id, order_date),
+    FOREIGN KEY (store_id) REFERENCES store(store_id) ON DELETE CASCADE,
+    FOREIGN KEY (supplier_id) REFERENCES supplier(supplier_id) ON DELETE CASCADE
+);
+
+-- 주문 상세 테이블 (각 주문 내 제품 목록)
+CREATE TABLE order_details (
+    order_detail_id INT NOT NULL AUTO_INCREMENT,
+    order_id INT NOT NULL,
+    product_id INT NOT NULL,
+    quantity INT NOT NULL CHECK (quantity > 0),
+    PRIMARY KEY (order_detail_id),
+    FOREIGN KEY (order_id) REFERENCES order_table(order_id) ON DELETE CASCADE,
+    FOREIGN KEY (product_id) REFERENCES product(product_id) ON DELETE CASCADE
+);
+
+-- 재고 테이블 (매장의 재고 관리)
+CREATE TABLE stock (
+    stock_id INT NOT NULL AUTO_INCREMENT,
+    store_id INT NOT NULL,
+    product_id INT NOT NULL,
+    quantity INT NOT NULL CHECK (quantity >= 0),
+    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (stock_id),
+    UNIQUE INDEX idx_stock_store_product (store_id, product_id),
+    FOREIGN KEY (store_id) REFERENCES store(store_id) ON DELETE CASCADE,
+    FOREIGN KEY (product_id) REFERENCES product(product_id) ON DELETE CASCADE
+);
+
+-- 거래(판매) 테이블
+CREATE TABLE transaction (
+    transaction_id INT NOT NULL AUTO_INCREMENT,
+    store_id INT NOT NULL,
+    employee_id INT NULL,
+    transaction_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    total_amount BIGINT NOT NULL CHECK (total_amount >= 0),
+    payment_method ENUM('Cash', 'Card', 'Mobile Payment') NOT NULL,
+    journal_id CHAR(32) NULL UNIQUE, -- 로컬 판매 저널 번호 (저널에서 반영된 거래만, 중복 반영 방지)
+    PRIMARY KEY (transaction_id),
+    INDEX idx_transaction_employee_date (employee_id, transaction_date),
+    INDEX idx_transaction_date (transaction_date),
+    FOREIGN KEY (store_id) REFERENCES store(store_id) ON DELETE CASCADE,
+    FOREIGN KEY (employee_id) REFERENCES employee(employee_id) ON DELETE SET NULL
+);
+
+-- 거래 상세 테이블 (각 거래에서 판매된 제품 목록)
+CREATE TABLE transaction_details (
+    transaction_detail_id INT NOT NULL AUTO_INCREMENT,
+    transaction_id INT NOT NULL,
+    product_id INT NOT NULL,
+    quantity INT NOT NULL CHECK (quantity > 0),
+    unit_price BIGINT NULL CHECK (unit_price >= 0), -- 판매 시점 단가 (NULL 이면 금액 보정 전 기존 행)
+    subtotal BIGINT NOT NULL CHECK (subtotal >= 0), -- unit_price * quantity
+    PRIMARY KEY (transaction_detail_id),
+    FOREIGN KEY (transaction_id) REFERENCES transaction(transaction_id) ON DELETE CASCADE,
+    FOREIGN KEY (product_id) REFERENCES product(product_id) ON DELETE CASCADE
+);
+
+-- 직원별 월간 판매 집계 테이블 (거래 등록 시 함께 갱신, 판매왕 조회용)
+CREATE TABLE employee_sales_monthly (
+    sales_month DATE NOT NULL, -- 해당 월 1일
+    store_id INT NOT NULL,
+    employee_id INT NOT NULL,
+    total_sales BIGINT NOT NULL DEFAULT 0,
+    total_quantity BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (sales_month, store_id, employee_id),
+    INDEX idx_sales_rank (sales_month, total_sales),
+    FOREIGN KEY (store_id) REFERENCES store(store_id) ON DELETE CASCADE,
+    FOREIGN KEY (employee_id) REFERENCES employee(employee_id) ON DELETE CASCADE
+);
+
+-- CSV 대량 적재 체크포인트 (파일별 마지막으로 커밋된 줄 번호, bulk_import.py 에서 사용)
+CREATE TABLE import_checkpoint (
+    source VARCHAR(255) NOT NULL, -- '테이블:파일 절대 경로'
+    last_line INT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (source)
+);
+
+-- 적용된 스키마 버전 (migrate.py 에서 관리)
+CREATE TABLE schema_version (
+    version INT NOT NULL,
+    description VARCHAR(200) NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (version)
+);
@@ -0,0 +1,106 @@
+import bisect
+import heapq
+from itertools import islice
+
+
+# ========================= 이름 검색용 n-gram 색인 =========================
+def normalize(text):
+    """ 검색용 정규화 (대소문자 무시, 공백 제거) """
+    return ''.join(str(text).casefold().split())
+
+
+def ngrams(text, size=2):
+    """ 문자열의 n-gram 집합 (글자 수가 size 보다 짧으면 문자열 자체) """
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class NgramIndex:
+    """ 이름 컬럼용 bigram 역색인 ("농심", "GS25" 같은 한글/영문 혼합 이름 대상)
+
+    - 키워드의 bigram 을 모두 가진 후보만 골라 부분 문자열 여부를 확인하므로
+      상품 수가 늘어나도 검색 비용은 해당 bigram 을 가진 행 수에만 비례
+    - 한 글자 키워드는 글자별 색인으로 처리
+    - 빈 키워드는 미리 정렬해 둔 key 목록에서 limit 개만 꺼냄 (검색마다 전체를 정렬하지 않음)
+    - add / remove 로 행이 바뀔 때마다 색인을 부분 갱신
+    """
+
+    def __init__(self, size=2):
+        self.size = size
+        self.names = {}     # key → 정규화된 이름
+        self.grams = {}     # n-gram → key 집합
+        self.chars = {}     # 글자 → key 집합 (한 글자 검색용)
+        self.keys = []      # 정렬된 key 목록 (빈 키워드 검색용)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, key, name):
+        """ 행 추가 (이미 있으면 이름 변경으로 처리) """
+        if key in self.names:
+            self.remove(key)
+        text = normalize(name)
+        self.names[key] = text
+        bisect.insort(self.keys, key)  # ID 순으로 적재하면 끝에 추가되므로 O(log n)
+        for gram in ngrams(text, self.size):
+            self.grams.setdefault(gram, set()).add(key)
+        for char in set(text):
+            self.chars.setdefault(char, set()).add(key)
+
+    def remove(self, key):
+        """ 행 삭제 """
+        text = self.names.pop(key, None)
+        if text is None:
+            return
+        del self.keys[bisect.bisect_left(self.keys, key)]
+        for gram in ngrams(text, self.size):
+            keys = self.grams.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.grams[gram]
+        for char in set(text):
+            keys = self.chars.get(char)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.chars[char]
+
+    def _candidates(self, keyword):
+        """ 키워드의 n-gram 을 모두 가진 key 집합 (작은 posting 부터 교집합) """
+        if len(keyword) < self.size:
+            return self.chars.get(keyword, set())
+        postings = []
+        for gram in ngrams(keyword, self.size):
+            keys = self.grams.get(gram)
+            if not keys:
+                return set()
+            postings.append(keys)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for keys in postings[1:]:
+            candidates &= keys
+            if not candidates:
+                break
+        return candidates
+
+    def search(self, keyword, limit=None, accept=None):
+        """ 키워드를 포함하는 key 목록 (정확히 일치 → 앞부분 일치 → 앞쪽 위치 → 짧은 이름 순)
+
+        accept: key 를 받아 결과에 포함할지 정하는 함수 (매장별 직원 필터 등)
+        """
+        keyword = normalize(keyword)
+        if not keyword:
+            keys = self.keys if accept is None else (key for key in self.keys if accept(key))
+            return list(islice(keys, limit)) if limit else list(keys)
+
+        ranked = []
+        for key in self._candidates(keyword):
+            name = self.names[key]
+            position = name.find(keyword)
+            if position < 0 or (accept is not None and not accept(key)):
+                continue
+            ranked.append((name != keyword, position, len(name), key))
+        ranked = heapq.nsmallest(limit, ranked) if limit else sorted(ranked)
+        return [item[-1] for item in ranked]
@@ -0,0 +1,456 @@
+import itertools
+import re
+import sqlite3
+from collections import namedtuple
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+
+from mysql.connector import errorcode, errors
+
+from db_pool import ConnectionPool
+
+
+# ========================= MySQL → SQLite 방언 변환 =========================
+# 비즈니스 함수의 SQL 은 MySQL 문법 그대로 두고, SQLite 커서가 실행 직전에 아래 규칙으로 바꿈
+#   %s → ?, transaction 테이블 이름 → "transaction" (SQLite 예약어)
+#   SELECT ... FOR UPDATE [SKIP LOCKED] → 잠금 절 제거 (대신 BEGIN IMMEDIATE 로 DB 쓰기 잠금)
+#   INSERT ... ON DUPLICATE KEY UPDATE c = VALUES(c) → ON CONFLICT DO UPDATE SET c = excluded.c
+#   UPDATE a x JOIN b y ON ... SET x.c = ... WHERE ... → UPDATE a AS x SET c = ... FROM b AS y WHERE ...
+#   SHOW TABLES, SET FOREIGN_KEY_CHECKS, TRUNCATE TABLE, ALTER TABLE ... ADD INDEX → sqlite_master, PRAGMA, DELETE, CREATE INDEX
+#   ALTER TABLE ... DROP INDEX i[, ADD ...] → DROP INDEX IF EXISTS i (+ 나머지 변경)
+#   CREATE TABLE 의 AUTO_INCREMENT, ENUM, INDEX, ON UPDATE CURRENT_TIMESTAMP → SQLite 정의
+# NOW(), GREATEST(), DATE_FORMAT(), GET_LOCK(), RELEASE_LOCK(), DATABASE() 는 같은 이름의 함수로 등록
+Translated = namedtuple('Translated', 'statements order write')
+
+_COMMENT = re.compile(r'--[^\n]*')
+_TRANSACTION_TABLE = re.compile(r'(?<![\w`".])transaction(?![\w`"])')
+_FOR_UPDATE = re.compile(r'\s+FOR\s+UPDATE(\s+SKIP\s+LOCKED|\s+NOWAIT)?\b', re.IGNORECASE)
+_ON_DUPLICATE = re.compile(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\b', re.IGNORECASE)
+_VALUES_FUNCTION = re.compile(r'\bVALUES\((\w+)\)', re.IGNORECASE)
+_UPDATE_JOIN = re.compile(r'\s*UPDATE\s+`?(\w+)`?\s+(\w+)\s+JOIN\s+', re.IGNORECASE)
+_ADD_INDEX = re.compile(r'\s*ALTER\s+TABLE\s+`?(\w+)`?\s+ADD\s+(UNIQUE\s+)?(?:INDEX|KEY)\s+(\w+)\s*(\(.*\))\s*$',
+                        re.IGNORECASE | re.DOTALL)
+_DROP_INDEX = re.compile(r'\s*ALTER\s+TABLE\s+`?(\w+)`?\s+DROP\s+(?:INDEX|KEY)\s+(\w+)\s*(?:,\s*(.*))?$',
+                         re.IGNORECASE | re.DOTALL)
+_ADD_CONSTRAINT = re.compile(r'\s*ALTER\s+TABLE\s+`?(\w+)`?\s+ADD\s+CONSTRAINT\s+\w+\s+(FOREIGN\s+KEY.*)$',
+                             re.IGNORECASE | re.DOTALL)
+_AFTER_COLUMN = re.compile(r'\s+(AFTER\s+\w+|FIRST)\s*$', re.IGNORECASE)
+_CREATE_TABLE = re.compile(r'\s*CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?\s*\(', re.IGNORECASE)
+_TABLE_INDEX = re.compile(r'(UNIQUE\s+)?(?:INDEX|KEY)\s+(\w+)\s*(\(.*\))$', re.IGNORECASE | re.DOTALL)
+_FOREIGN_KEY = re.compile(r'(?:CONSTRAINT\s+\w+\s+)?FOREIGN\s+KEY\s*\(([^)]*)\)', re.IGNORECASE)
+_PRIMARY_KEY = re.compile(r'(?:PRIMARY\s+KEY|UNIQUE)\s*\(([^)]*)\)', re.IGNORECASE)
+_ENUM = re.compile(r'^(\w+)\s+ENUM\s*(\([^)]*\))', re.IGNORECASE)
+_WRITE_VERBS = ('insert', 'update', 'delete', 'replace', 'savepoint')
+
+
+def _split_top_level(text, separator=','):
+    """ 괄호/따옴표 밖의 separator 로 나눔 """
+    parts, depth, quote, start = [], 0, None, 0
+    for index, char in enumerate(text):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:index])
+            start = index + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _find_top_level(text, pattern, start=0):
+    """ 괄호 밖에서 pattern(정규식)이 처음 나오는 match (없으면 None) """
+    depth = 0
+    for match in re.finditer(pattern, text[start:], re.IGNORECASE):
+        prefix = text[start:start + match.start()]
+        depth = prefix.count('(') - prefix.count(')')
+        if depth == 0:
+            return match, start + match.start(), start + match.end()
+    return None
+
+
+def _closing_paren(text, start):
+    """ text[start] 의 '(' 에 대응하는 ')' 위치 """
+    depth = 0
+    for index in range(start, len(text)):
+        if text[index] == '(':
+            depth += 1
+        elif text[index] == ')':
+            depth -= 1
+            if depth == 0:
+                return index
+    raise errors.ProgrammingError(msg="괄호가 맞지 않는 SQL 입니다.")
+
+
+def _translate_update_join(query):
+    """ MySQL 다중 테이블 UPDATE → SQLite UPDATE ... FROM (바인딩 순서가 바뀌므로 새 순서도 반환) """
+    match = _UPDATE_JOIN.match(query)
+    table, alias = match.group(1), match.group(2)
+    rest = query[match.end():]
+    if rest.startswith('('):
+        end = _closing_paren(rest, 0)
+        source, rest = rest[:end + 1], rest[end + 1:]
+    else:
+        source, rest = re.match(r'(`?\w+`?)(.*)', rest, re.DOTALL).groups()
+    source_alias, rest = re.match(r'\s+(?:AS\s+)?(\w+)(.*)', rest, re.DOTALL | re.IGNORECASE).groups()
+
+    _, on_start, on_end = _find_top_level(rest, r'\bON\b')
+    _, set_start, set_end = _find_top_level(rest, r'\bSET\b')
+    where = _find_top_level(rest, r'\bWHERE\b', set_end)
+    condition = rest[on_end:set_start]
+    assignments = rest[set_end:where[1]] if where else rest[set_end:]
+    filters = rest[where[2]:] if where else ''
+
+    targets = []
+    for assignment in _split_top_level(assignments):
+        column, value = assignment.split('=', 1)
+        targets.append(f"{column.strip().split('.')[-1]} = {value.strip()}")
+
+    segments = [source, condition, assignments, filters]  # 원래 바인딩 순서
+    counts = [segment.count('%s') for segment in segments]
+    offsets = [sum(counts[:index]) for index in range(len(counts))]
+    order = [offsets[index] + position for index in (2, 0, 1, 3) for position in range(counts[index])]
+
+    statement = (f"UPDATE {table} AS {alias} SET {', '.join(targets)} FROM {source} AS {source_alias} "
+                 f"WHERE ({condition.strip()})" + (f" AND ({filters.strip()})" if filters.strip() else ''))
+    return statement, order
+
+
+def _key_columns(keys):
+    """ '(a, b DESC)' → ('a', 'b') """
+    return tuple(column.split()[0].strip('`').lower() for column in keys.strip().strip('()').split(',') if column.strip())
+
+
+def _translate_create_table(query, constraints=()):
+    """ MySQL CREATE TABLE → SQLite CREATE TABLE + CREATE INDEX 목록
+
+    InnoDB 는 외래 키 컬럼에 인덱스를 자동으로 만들지만 SQLite 는 만들지 않으므로,
+    같은 컬럼으로 시작하는 인덱스(기본 키, UNIQUE 포함)가 없는 외래 키마다 인덱스를 추가
+    """
+    match = _CREATE_TABLE.match(query)
+    table = match.group(2)
+    end = _closing_paren(query, match.end() - 1)
+    parts = [part.strip() for part in _split_top_level(query[match.end():end])] + list(constraints)
+
+    auto_column = next((part.split()[0] for part in parts if re.search(r'\bAUTO_INCREMENT\b', part, re.IGNORECASE)), None)
+    columns, indexes = [], []
+    leading = [(auto_column.lower(),)] if auto_column else []  # 인덱스가 있는 컬럼 목록 (외래 키 인덱스 판단용)
+    foreign_keys = []
+    for part in parts:
+        index = _TABLE_INDEX.match(part)
+        if index:
+            unique, name, keys = index.groups()
+            indexes.append(f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table} {keys}")
+            leading.append(_key_columns(keys))
+            continue
+        foreign_key = _FOREIGN_KEY.match(part)
+        if foreign_key:
+            foreign_keys.append(_key_columns(foreign_key.group(1)))
+        primary_key = _PRIMARY_KEY.match(part)
+        if primary_key:
+            leading.append(_key_columns(primary_key.group(1)))
+        elif re.search(r'\b(PRIMARY\s+KEY|UNIQUE)\b', part, re.IGNORECASE) and not foreign_key:
+            leading.append((part.split()[0].strip('`').lower(),))
+        if auto_column and re.fullmatch(rf'PRIMARY\s+KEY\s*\(\s*{auto_column}\s*\)', part, re.IGNORECASE):
+            continue
+        if part.split()[0] == auto_column:
+            part = f"{auto_column} INTEGER PRIMARY KEY AUTOINCREMENT"
+        enum = _ENUM.match(part)
+        if enum:
+            part = f"{enum.group(1)} TEXT CHECK ({enum.group(1)} IN {enum.group(2)})" + part[enum.end():]
+        part = re.sub(r'\s+ON\s+UPDATE\s+CURRENT_TIMESTAMP', '', part, flags=re.IGNORECASE)
+        part = re.sub(r'DEFAULT\s+CURRENT_TIMESTAMP', "DEFAULT (datetime('now', 'localtime'))", part, flags=re.IGNORECASE)
+        columns.append(part)
+
+    for keys in dict.fromkeys(foreign_keys):
+        if not any(index[:len(keys)] == keys for index in leading):
+            indexes.append(f"CREATE INDEX IF NOT EXISTS idx_{table}_{'_'.join(keys)} ON {table} ({', '.join(keys)})")
+            leading.append(keys)
+
+    create = f"CREATE TABLE {match.group(1) or ''}{table} (\n    " + ",\n    ".join(columns) + "\n)"
+    return [create, *indexes]
+
+
+@lru_cache(maxsize=2048)
+def translate(query):
+    """ MySQL 문 하나를 SQLite 문 목록, 바인딩 순서(바뀌지 않으면 None), 쓰기 잠금 필요 여부로 변환 """
+    text = _COMMENT.sub('', query).strip().rstrip(';')
+    verb = text.split(None, 1)[0].lower() if text else ''
+    write = verb in _WRITE_VERBS or bool(_FOR_UPDATE.search(text))
+    order = None
+
+    if verb == 'show' and re.fullmatch(r'SHOW\s+TABLES', text, re.IGNORECASE):
+        statements = ["SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"]
+    elif verb == 'set' and 'FOREIGN_KEY_CHECKS' in text.upper():
+        statements = [f"PRAGMA foreign_keys = {'OFF' if text.rstrip().endswith('0') else 'ON'}"]
+    elif verb == 'truncate':
+        statements = [re.sub(r'^TRUNCATE\s+TABLE', 'DELETE FROM', text, flags=re.IGNORECASE)]
+    elif verb == 'create' and _CREATE_TABLE.match(text):
+        statements = _translate_create_table(text)
+    elif verb == 'alter' and _ADD_INDEX.match(text):
+        table, unique, name, keys = _ADD_INDEX.match(text).groups()
+        statements = [f"CREATE {'UNIQUE ' if unique else ''}INDEX {name} ON {table} {keys}"]
+    elif verb == 'alter' and _DROP_INDEX.match(text):
+        table, name, rest = _DROP_INDEX.match(text).groups()
+        statements = [f"DROP INDEX IF EXISTS {name}"]
+        if rest:
+            statements += translate(f"ALTER TABLE {table} {rest}").statements
+    elif verb == 'alter' and _ADD_CONSTRAINT.match(text):
+        raise errors.NotSupportedError(msg="SQLite 는 기존 테이블에 제약 조건을 추가할 수 없습니다. (translate_schema 사용)",
+                                       errno=errorcode.ER_NOT_SUPPORTED_YET)
+    elif verb == 'alter':
+        statements = [_AFTER_COLUMN.sub('', text)]
+    elif verb == 'update' and _UPDATE_JOIN.match(text):
+        statement, order = _translate_update_join(text)
+        statements = [statement]
+    else:
+        statement = _FOR_UPDATE.sub('', text)
+        duplicate = _ON_DUPLICATE.search(statement)
+        if duplicate:
+            updates = _VALUES_FUNCTION.sub(r'excluded.\1', statement[duplicate.end():])
+            statement = f"{statement[:duplicate.start()]}ON CONFLICT DO UPDATE SET{updates}"
+        statements = [statement]
+
+    statements = tuple(_TRANSACTION_TABLE.sub('"transaction"', statement).replace('%s', '?') for statement in statements)
+    return Translated(statements, order, write)
+
+
+def translate_schema(statements):
+    """ schema.sql 의 문 목록 → SQLite 문 목록 (ALTER TABLE ... ADD CONSTRAINT FOREIGN KEY 는 해당 CREATE TABLE 에 합침) """
+    constraints = {}
+    for statement in statements:
+        match = _ADD_CONSTRAINT.match(_COMMENT.sub('', statement))
+        if match:
+            constraints.setdefault(match.group(1), []).append(' '.join(match.group(2).split()))
+
+    translated = []
+    for statement in statements:
+        text = _COMMENT.sub('', statement).strip()
+        if _ADD_CONSTRAINT.match(text):
+            continue
+        create = _CREATE_TABLE.match(text)
+        if create:
+            translated.extend(_TRANSACTION_TABLE.sub('"transaction"', sql)
+                              for sql in _translate_create_table(text, constraints.get(create.group(2), ())))
+        else:
+            translated.extend(translate(text).statements)
+    return translated
+
+
+# ========================= SQLite 함수 =========================
+_DATE_FORMATS = {'%Y': '%Y', '%y': '%y', '%m': '%m', '%c': '%m', '%d': '%d', '%e': '%d', '%H': '%H',
+                 '%i': '%M', '%s': '%S', '%S': '%S', '%%': '%%'}
+
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _greatest(*values):
+    return None if any(value is None for value in values) else max(values)
+
+
+def _date_format(value, mysql_format):
+    if value is None:
+        return None
+    python_format = re.sub(r'%.', lambda match: _DATE_FORMATS.get(match.group(0), match.group(0)), mysql_format)
+    return datetime.fromisoformat(str(value)).strftime(python_format)
+
+
+# ========================= 커넥션 / 커서 =========================
+_DATE_VALUE = re.compile(r'\d{4}-\d{2}-\d{2}$')
+_DATETIME_VALUE = re.compile(r'\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(\.\d+)?$')
+
+
+def _adapt(value):
+    """ 바인딩 값: MySQL 드라이버가 받는 파이썬 타입 → SQLite 저장 형식 """
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return value
+
+
+def _convert(value):
+    """ 조회 값: 날짜/시각 문자열은 MySQL 드라이버처럼 date/datetime 으로 돌려줌 """
+    if isinstance(value, str) and len(value) >= 10 and value[4] == '-':
+        if _DATE_VALUE.match(value):
+            return date.fromisoformat(value)
+        if _DATETIME_VALUE.match(value):
+            return datetime.fromisoformat(value)
+    return value
+
+
+def _mysql_error(error):
+    """ sqlite3 오류 → 같은 의미의 mysql.connector 오류 (비즈니스 함수의 except Error / errno 처리를 그대로 사용) """
+    message = str(error)
+    if isinstance(error, sqlite3.IntegrityError):
+        for text, code in (('UNIQUE', errorcode.ER_DUP_ENTRY), ('FOREIGN KEY', errorcode.ER_NO_REFERENCED_ROW_2),
+                           ('NOT NULL', errorcode.ER_BAD_NULL_ERROR), ('CHECK', errorcode.ER_CHECK_CONSTRAINT_VIOLATED)):
+            if text in message:
+                return errors.IntegrityError(msg=message, errno=code)
+        return errors.IntegrityError(msg=message)
+    if 'locked' in message or 'busy' in message:
+        # 잠금 대기 시간 초과와 같은 errno 로 올려 결제 재시도 로직이 그대로 동작
+        return errors.DatabaseError(msg=message, errno=errorcode.ER_LOCK_WAIT_TIMEOUT)
+    if 'no such table' in message:
+        return errors.ProgrammingError(msg=message, errno=errorcode.ER_NO_SUCH_TABLE)
+    if 'no such column' in message:
+        return errors.ProgrammingError(msg=message, errno=errorcode.ER_BAD_FIELD_ERROR)
+    if 'syntax error' in message:
+        return errors.ProgrammingError(msg=message, errno=errorcode.ER_PARSE_ERROR)
+    if isinstance(error, sqlite3.ProgrammingError):
+        return errors.ProgrammingError(msg=message)
+    return errors.DatabaseError(msg=message)
+
+
+class SQLiteCursor:
+    """ MySQL 문을 변환해 실행하는 커서 (mysql.connector 커서와 같은 메서드/속성) """
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._cursor = conn.raw.cursor()
+
+    def _prepare(self, query):
+        translated = translate(query)
+        if translated.write and not self._conn.in_transaction:
+            # 쓰기나 잠금 읽기로 시작하는 트랜잭션은 처음부터 쓰기 잠금을 잡아 중간에 잠금 승격이 실패하지 않게 함
+            self._conn.raw.execute("BEGIN IMMEDIATE")
+        return translated
+
+    @staticmethod
+    def _arguments(params, order):
+        values = [_adapt(value) for value in (params or ())]
+        return values if order is None else [values[index] for index in order]
+
+    def execute(self, query, params=None):
+        try:
+            translated = self._prepare(query)
+            for statement in translated.statements:
+                self._cursor.execute(statement, self._arguments(params, translated.order) if '?' in statement else ())
+        except sqlite3.Error as error:
+            raise _mysql_error(error) from error
+
+    def executemany(self, query, seq_params):
+        try:
+            translated = self._prepare(query)
+            self._cursor.executemany(translated.statements[-1],
+                                     [self._arguments(params, translated.order) for params in seq_params])
+        except sqlite3.Error as error:
+            raise _mysql_error(error) from error
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        return tuple(_convert(value) for value in row) if row is not None else None
+
+    def fetchmany(self, size=1):
+        return [tuple(_convert(value) for value in row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [tuple(_convert(value) for value in row) for row in self._cursor.fetchall()]
+
+    def __iter__(self):
+        for row in self._cursor:
+            yield tuple(_convert(value) for value in row)
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def close(self):
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class SQLiteConnection:
+    """ sqlite3 커넥션을 mysql.connector 커넥션처럼 쓰는 래퍼 (자동 커밋 없음, commit/rollback 으로 끝냄) """
+
+    _memory_ids = itertools.count(1)
+
+    def __init__(self, path, busy_timeout=5.0):
+        self.raw = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None, check_same_thread=False,
+                                   uri=path.startswith('file:'))
+        self.raw.execute("PRAGMA foreign_keys = ON")
+        if not path.startswith('file:'):
+            self.raw.execute("PRAGMA journal_mode = WAL")
+            self.raw.execute("PRAGMA synchronous = NORMAL")
+        for name, args, func in (('NOW', 0, _now), ('GREATEST', -1, _greatest), ('DATE_FORMAT', 2, _date_format),
+                                 ('GET_LOCK', 2, lambda name, timeout: 1), ('RELEASE_LOCK', 1, lambda name: 1),
+                                 ('DATABASE', 0, lambda: 'main')):
+            self.raw.create_function(name, args, func)
+
+    def cursor(self, *args, **kwargs):
+        return SQLiteCursor(self)
+
+    @property
+    def in_transaction(self):
+        return self.raw.in_transaction
+
+    def commit(self):
+        try:
+            self.raw.commit()
+        except sqlite3.Error as error:
+            raise _mysql_error(error) from error
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def ping(self, reconnect=False):
+        try:
+            self.raw.execute("SELECT 1")
+        except sqlite3.Error as error:
+            raise errors.InterfaceError(msg=str(error)) from error
+
+    def close(self):
+        self.raw.close()
+
+
+class SQLitePool(ConnectionPool):
+    """ 내장 SQLite 파일을 DB 로 쓰는 커넥션 풀 (MySQL 서버 없이 단일 매장 운영/테스트용)
+
+    - path: DB 파일 경로, ':memory:' 면 풀이 닫힐 때까지 유지되는 메모리 DB (테스트용)
+    - 쓰기는 DB 전체에 한 번에 하나씩 (대기 시간이 busy_timeout 을 넘으면 잠금 대기 시간 초과 오류)
+    - 나머지 설정(pool_size, pool_timeout 등)과 통계는 ConnectionPool 과 같음
+    """
+
+    dialect = 'sqlite'
+
+    def __init__(self, path, busy_timeout=5.0, **options):
+        if path == ':memory:':
+            path = f"file:cvs_memory_{next(SQLiteConnection._memory_ids)}?mode=memory&cache=shared"
+        super().__init__({'database': path}, **options)
+        self.path = path
+        self.busy_timeout = busy_timeout
+        # 메모리 DB 는 마지막 커넥션이 닫히면 사라지므로 하나를 풀 밖에 열어 둠
+        self._keeper = SQLiteConnection(path, busy_timeout) if path.startswith('file:') else None
+
+    def _connect(self):
+        return SQLiteConnection(self.path, self.busy_timeout)
+
+    def close(self):
+        super().close()
+        if self._keeper is not None:
+            self._keeper.close()
+            self._keeper = None
@@ -0,0 +1,151 @@
+import argparse
+import random
+import threading
+import time
+
+from mysql.connector import Error
+
+from benchmark import PAYMENT_METHODS, bench_pool, generate_dataset, percentile, reset_data
+from cvs import StockShortageError, checkout
+from migrate import migrate
+
+
+# ========================= 동시 결제 부하 테스트 =========================
+def prepare_hot_rows(pool, data, hot=3, initial_stock=500, seed=42):
+    """ 첫 매장의 상품 hot 개를 인기 상품으로 골라 재고를 initial_stock 으로 맞춤
+
+    반환값: (매장 ID, 인기 상품 ID 목록, 시작 전 마지막 거래 ID)
+    """
+    rng = random.Random(seed)
+    store_id = data['store_ids'][0]
+    product_ids = sorted(rng.sample(data['store_products'][store_id], hot))
+    placeholders = ", ".join(["%s"] * len(product_ids))
+
+    with pool.connection() as conn, conn.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE stock SET quantity = %s WHERE store_id = %s AND product_id IN ({placeholders})",
+            (initial_stock, store_id, *product_ids),
+        )
+        cursor.execute("SELECT COALESCE(MAX(transaction_id), 0) FROM transaction")
+        last_transaction_id = cursor.fetchone()[0]
+        conn.commit()
+    return store_id, product_ids, last_transaction_id
+
+
+def run_stress(pool, store_id, product_ids, employee_ids, threads=16, duration=10.0, seed=42):
+    """ threads 개 단말이 duration 초 동안 같은 인기 상품을 동시에 결제
+
+    반환값: 결과 dict (성공/재고 부족/오류 수, 판매 수량, 지연 시간 목록, 경과 시간)
+    """
+    lock = threading.Lock()
+    result = {'succeeded': 0, 'shortages': 0, 'errors': 0, 'sold': dict.fromkeys(product_ids, 0), 'latencies': []}
+    deadline = time.perf_counter() + duration
+
+    def terminal(index):
+        rng = random.Random(seed + index)
+        sold_out = set()
+        while time.perf_counter() < deadline and len(sold_out) < len(product_ids):
+            lines = [(product_id, rng.randint(1, 3))
+                     for product_id in rng.sample(product_ids, rng.randint(1, min(2, len(product_ids))))]
+            started = time.perf_counter()
+            try:
+                checkout(pool, store_id, rng.choice(employee_ids), rng.choice(PAYMENT_METHODS), lines)
+            except StockShortageError as error:
+                sold_out.update(product_id for product_id, current, _ in error.shortages if not current)
+                with lock:
+                    result['shortages'] += 1
+                continue
+            except Error:
+                with lock:
+                    result['errors'] += 1
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                result['succeeded'] += 1
+                result['latencies'].append(elapsed)
+                for product_id, quantity in lines:
+                    result['sold'][product_id] += quantity
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=terminal, args=(index,)) for index in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    result['elapsed'] = time.perf_counter() - started
+    return result
+
+
+def verify_no_oversell(pool, store_id, product_ids, initial_stock, last_transaction_id):
+    """ 상품별로 (시작 재고 - 기록된 판매 수량 = 현재 재고, 현재 재고 >= 0) 인지 확인
+
+    반환값: [(상품 ID, 현재 재고, 기록된 판매 수량, 일치 여부)]
+    """
+    placeholders = ", ".join(["%s"] * len(product_ids))
+    with pool.connection() as conn, conn.cursor() as cursor:
+        cursor.execute(
+            f"SELECT product_id, quantity FROM stock WHERE store_id = %s AND product_id IN ({placeholders})",
+            (store_id, *product_ids),
+        )
+        current = dict(cursor.fetchall())
+        query = f"""
+            SELECT td.product_id, SUM(td.quantity)
+            FROM transaction t
+            JOIN transaction_details td ON t.transaction_id = td.transaction_id
+            WHERE t.transaction_id > %s AND t.store_id = %s AND td.product_id IN ({placeholders})
+            GROUP BY td.product_id
+        """
+        cursor.execute(query, (last_transaction_id, store_id, *product_ids))
+        sold = {product_id: int(quantity) for product_id, quantity in cursor.fetchall()}
+
+    return [
+        (product_id, current[product_id], sold.get(product_id, 0),
+         current[product_id] >= 0 and current[product_id] == initial_stock - sold.get(product_id, 0))
+        for product_id in product_ids
+    ]
+
+
+def print_report(result, checks, threads):
+    elapsed = result['elapsed']
+    latencies = result['latencies']
+    print(f"\n=== 동시 결제 {threads}개 단말, {elapsed:.1f}초 ===")
+    print(f"성공 {result['succeeded']:,}건 ({result['succeeded'] / elapsed:,.1f}건/초), "
+          f"재고 부족 {result['shortages']:,}건, 오류 {result['errors']:,}건")
+    print(f"지연 시간 p50 {percentile(latencies, 50) * 1000:.2f}ms, p95 {percentile(latencies, 95) * 1000:.2f}ms, "
+          f"p99 {percentile(latencies, 99) * 1000:.2f}ms")
+    print(f"{'상품 ID':>8} {'현재 재고':>10} {'기록된 판매':>12} {'단말 집계':>10}  결과")
+    for product_id, current, sold, ok in checks:
+        print(f"{product_id:>8} {current:>10} {sold:>12} {result['sold'][product_id]:>10}  {'OK' if ok else '초과 판매!'}")
+
+
+# ========================= 실행 코드 =========================
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='인기 상품 동시 결제 부하 테스트 (초과 판매 여부 확인)')
+    parser.add_argument('--database', required=True, help='테스트 전용 DB 이름 (데이터를 모두 지우고 다시 생성)')
+    parser.add_argument('--backend', choices=('mysql', 'sqlite'), default='mysql',
+                        help='저장소 (sqlite 면 --database 는 SQLite 파일 경로)')
+    parser.add_argument('--threads', type=int, default=16, help='동시에 결제하는 단말 수')
+    parser.add_argument('--duration', type=float, default=10.0, help='실행 시간 (초)')
+    parser.add_argument('--hot', type=int, default=3, help='동시에 결제할 인기 상품 수')
+    parser.add_argument('--stock', type=int, default=500, help='인기 상품의 시작 재고')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    pool = bench_pool(args.database, args.backend, pool_size=args.threads, max_overflow=0)
+    try:
+        migrate(pool, log=lambda message: None)
+        reset_data(pool)
+        data = generate_dataset(pool, 0.1, args.seed)
+        store_id, product_ids, last_transaction_id = prepare_hot_rows(pool, data, args.hot, args.stock, args.seed)
+        result = run_stress(pool, store_id, product_ids, data['store_employees'][store_id],
+                            args.threads, args.duration, args.seed)
+        checks = verify_no_oversell(pool, store_id, product_ids, args.stock, last_transaction_id)
+    except Error as error:
+        print(f"부하 테스트 중 오류 발생: {error}")
+        raise SystemExit(1)
+    finally:
+        pool.close()
+
+    print_report(result, checks, args.threads)
+    if not all(ok for *_, ok in checks):
+        raise SystemExit(1)
@@ -0,0 +1,54 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from migrate import migrate  # noqa: E402
+from sqlite_backend import SQLitePool  # noqa: E402
+
+
+# ========================= 공용 fixture =========================
+@pytest.fixture
+def pool():
+    """ 최신 스키마를 적용한 메모리 SQLite 풀 """
+    pool = SQLitePool(':memory:')
+    migrate(pool, log=lambda message: None)
+    yield pool
+    pool.close()
+
+
+def add_catalog(pool):
+    """ 매장 2곳(직원 각 1명), 공급업체 1곳, 상품 2개(라면 1200원, 과자 1500원) """
+    with pool.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.executemany("INSERT INTO store (name, location) VALUES (%s, %s)",
+                               [('GS25 강남', '서울 강남구'), ('CU 해운대', '부산 해운대구')])
+            cursor.execute("INSERT INTO supplier (name) VALUES ('농심')")
+            cursor.executemany("INSERT INTO product (name, category, price, supplier_id) VALUES (%s, %s, %s, 1)",
+                               [('신라면', '라면', 1200), ('새우깡', '과자', 1500)])
+            cursor.executemany("INSERT INTO employee (store_id, name, role, hire_date) VALUES (%s, %s, 'Cashier', '2025-01-02')",
+                               [(1, '김철수'), (2, '이영희')])
+        conn.commit()
+
+
+def add_sale(pool, store_id, employee_id, when, lines, transaction_id=None):
+    """ 거래 한 건을 직접 등록 (lines: [(상품 ID, 수량, 단가)]) → 거래 ID """
+    total = sum(quantity * price for _, quantity, price in lines)
+    with pool.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO transaction (transaction_id, store_id, employee_id, transaction_date, total_amount, payment_method) "
+                "VALUES (%s, %s, %s, %s, %s, 'Card')",
+                (transaction_id, store_id, employee_id, when, total),
+            )
+            transaction_id = cursor.lastrowid
+            cursor.executemany(
+                "INSERT INTO transaction_details (transaction_id, product_id, quantity, unit_price, subtotal) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                [(transaction_id, product_id, quantity, price, quantity * price) for product_id, quantity, price in lines],
+            )
+        conn.commit()
+    return transaction_id
@@ -0,0 +1,92 @@
+from datetime import date, datetime
+from itertools import chain
+
+import pytest
+
+from archive import TransactionArchive, archive_month
+from conftest import add_catalog, add_sale
+from cvs import transaction_pages
+from receipts import ReceiptCache, fetch_transaction_receipt
+from sales_rollup import rebuild_sales_rollup, verify_sales_rollup
+
+JANUARY = date(2026, 1, 1)
+
+
+@pytest.fixture
+def sales(pool):
+    """ 직원 1의 1월 거래 2건, 3월 거래 1건 → 거래 ID 목록 """
+    add_catalog(pool)
+    return [
+        add_sale(pool, 1, 1, datetime(2026, 1, 10, 9), [(1, 2, 1200), (2, 1, 1500)]),
+        add_sale(pool, 1, 1, datetime(2026, 1, 20, 9), [(2, 2, 1500)]),
+        add_sale(pool, 1, 1, datetime(2026, 3, 5, 9), [(1, 1, 1200)]),
+    ]
+
+
+def _rollup(pool):
+    with pool.connection() as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT sales_month, store_id, employee_id, total_sales, total_quantity "
+                       "FROM employee_sales_monthly ORDER BY sales_month")
+        return cursor.fetchall()
+
+
+# ========================= 보관 / 재보관 =========================
+def test_archive_month_moves_rows_and_serves_receipts(pool, sales, tmp_path):
+    before = fetch_transaction_receipt(pool, sales[0])
+    archive = TransactionArchive(str(tmp_path))
+    assert archive_month(pool, archive, JANUARY) == (2, 3)
+
+    with pool.connection() as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT transaction_id FROM transaction")
+        assert cursor.fetchall() == [(sales[2],)]
+        cursor.execute("SELECT COUNT(*) FROM transaction_details")
+        assert cursor.fetchone() == (1,)  # 상세는 FK CASCADE 로 함께 삭제
+
+    entry = archive.manifest()['2026-01']
+    assert (entry['transactions'], entry['details'], entry['min_id'], entry['max_id']) == (2, 3, sales[0], sales[1])
+    assert archive.find_transaction(sales[1]) == (JANUARY, 1)
+    assert archive.find_transaction(sales[2]) == (None, None)
+
+    # 운영 테이블에 없는 거래의 영수증은 보관 파일에서 같은 형식으로
+    assert fetch_transaction_receipt(pool, sales[0]) is None
+    receipt = ReceiptCache(pool, archive=archive).transaction(sales[0])
+    assert receipt == {**before, 'lines': [tuple(line) for line in before['lines']]}
+
+
+def test_rearchive_merges_late_rows(pool, sales, tmp_path):
+    archive = TransactionArchive(str(tmp_path))
+    archive_month(pool, archive, JANUARY)
+    assert archive_month(pool, archive, JANUARY) == (0, 0)  # 다시 실행해도 옮길 거래 없음
+
+    # 저널 반영 등으로 보관한 달에 늦게 들어온 거래
+    late = add_sale(pool, 1, 1, datetime(2026, 1, 31, 22), [(1, 3, 1200)])
+    assert archive_month(pool, archive, JANUARY) == (1, 1)
+
+    data = archive.load(JANUARY)
+    assert data['transaction_id'].tolist() == [sales[0], sales[1], late]
+    assert data['detail_transaction_id'].tolist() == [sales[0], sales[0], sales[1], late]
+    assert archive.manifest()['2026-01']['transactions'] == 3
+    assert archive.transaction_receipt(pool, late)['total_amount'] == 3600
+
+
+# ========================= 보관 경계 전후 조회 =========================
+def test_transaction_pages_and_rollup_across_archive_boundary(pool, sales, tmp_path):
+    rebuild_sales_rollup(pool)
+    expected = _rollup(pool)
+
+    archive = TransactionArchive(str(tmp_path))
+    archive_month(pool, archive, JANUARY)
+    late = add_sale(pool, 1, 1, datetime(2026, 1, 31, 22), [(1, 1, 1200)])  # 경계 이전이지만 운영 테이블에 남은 거래
+    assert archive.boundary() == date(2026, 2, 1)
+
+    pages = list(transaction_pages(pool, 1, page_size=2, archive=archive))
+    rows = list(chain.from_iterable(pages))
+    assert [row[0] for row in rows] == [sales[2], late, sales[1], sales[0]]
+    assert [len(page) for page in pages] == [1, 2, 1]  # 운영 테이블 페이지 다음에 보관 파일 페이지
+
+    assert rebuild_sales_rollup(pool, archive=archive) == 3
+    january, march = _rollup(pool)
+    assert january[:3] == expected[0][:3] and march == expected[1]
+    assert (january[3], january[4]) == (expected[0][3] + 1200, expected[0][4] + 1)
+    assert verify_sales_rollup(pool, archive=archive) == []
+    assert archive.sales_totals(JANUARY) == [(JANUARY, 1, 1, 6900, 5)]
@@ -0,0 +1,148 @@
+import asyncio
+import json
+
+import pytest
+from mysql.connector import DatabaseError, IntegrityError, errorcode
+
+import pos_service
+from conftest import add_catalog
+from cvs import StockShortageError
+from pos_server import PosServer
+from pos_service import PosService, SaleBatcher
+from receipts import ReceiptCache
+from ref_cache import ReferenceCache
+
+
+@pytest.fixture
+def store(pool):
+    """ 매장 1 재고: 신라면(1) 5개, 새우깡(2) 1개 """
+    add_catalog(pool)
+    with pool.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.executemany("INSERT INTO stock (store_id, product_id, quantity) VALUES (1, %s, %s)", [(1, 5), (2, 1)])
+        conn.commit()
+    return pool
+
+
+@pytest.fixture
+def batcher(store):
+    # 한 묶음으로 모이도록 대기 시간을 넉넉히
+    batcher = SaleBatcher(store, max_batch=3, max_wait=0.2, writers=1, backoff=0).start()
+    yield batcher
+    batcher.stop()
+
+
+def _stock(pool):
+    with pool.connection() as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT product_id, quantity FROM stock WHERE store_id = 1 ORDER BY product_id")
+        return dict(cursor.fetchall())
+
+
+# ========================= 그룹 커밋 =========================
+def test_failed_sales_roll_back_only_their_savepoint(store, batcher):
+    ok = batcher.submit(1, 1, 'Card', [(1, 2)])
+    short = batcher.submit(1, 1, 'Cash', [(1, 1), (2, 5)])
+    unknown_employee = batcher.submit(1, 99, 'Card', [(1, 1)])
+
+    transaction_id, remaining = ok.result(5)
+    assert remaining == {1: 3}
+    with pytest.raises(StockShortageError) as error:
+        short.result(5)
+    assert error.value.shortages == [(2, 1, 5)]
+    with pytest.raises(IntegrityError):
+        unknown_employee.result(5)
+
+    assert _stock(store) == {1: 3, 2: 1}
+    with store.connection() as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT transaction_id FROM transaction")
+        assert cursor.fetchall() == [(transaction_id,)]
+    stats = batcher.stats()
+    assert (stats['batches'], stats['sales'], stats['rejected'], stats['max_batch']) == (1, 1, 1, 3)
+
+
+def test_deadlock_retries_the_whole_batch(store, batcher, monkeypatch):
+    calls = []
+    apply_sale = pos_service.apply_sale
+
+    def deadlock_once(cursor, *args):
+        calls.append(args)
+        if len(calls) == 2:  # 첫 시도의 두 번째 결제에서 데드락 → 첫 번째 결제도 함께 롤백
+            raise DatabaseError(msg="Deadlock found", errno=errorcode.ER_LOCK_DEADLOCK)
+        return apply_sale(cursor, *args)
+
+    monkeypatch.setattr(pos_service, 'apply_sale', deadlock_once)
+    first = batcher.submit(1, 1, 'Card', [(1, 1)])
+    second = batcher.submit(1, 1, 'Card', [(1, 2)])
+    assert first.result(5)[1] == {1: 4}
+    assert second.result(5)[1] == {1: 2}
+
+    assert len(calls) == 4
+    assert _stock(store) == {1: 2, 2: 1}  # 두 결제가 한 번씩만 반영
+    assert batcher.stats()['retries'] == 1
+
+
+def test_unexpected_error_fails_the_batch_and_keeps_the_writer(store, batcher, monkeypatch):
+    commit_once = SaleBatcher._commit_once
+    calls = []
+
+    def broken_once(self, batch):
+        calls.append(batch)
+        if len(calls) == 1:
+            raise ZeroDivisionError("예상하지 못한 오류")
+        return commit_once(self, batch)
+
+    monkeypatch.setattr(SaleBatcher, '_commit_once', broken_once)
+    with pytest.raises(ZeroDivisionError):
+        batcher.submit(1, 1, 'Card', [(1, 1)]).result(5)
+    assert batcher.submit(1, 1, 'Card', [(1, 1)]).result(5)[1] == {1: 4}
+    assert batcher.stats()['failed_batches'] == 1
+
+
+def test_invalid_input_is_rejected_before_queueing(batcher):
+    for lines in ([], [["x", 1]], [[1, 1.5]], [[1, True]], [[10 ** 30, 1]]):
+        with pytest.raises(ValueError):
+            batcher.submit(1, 1, 'Card', lines)
+    assert batcher.stats()['pending'] == 0
+
+
+# ========================= JSON 서버 =========================
+async def _round_trip(server, requests):
+    listener = await asyncio.start_server(server.handle, '127.0.0.1', 0)
+    port = listener.sockets[0].getsockname()[1]
+    async with listener:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b''.join(line.encode('utf-8') + b'\n' for line in requests))  # 응답을 기다리지 않고 모두 보냄
+        await writer.drain()
+        responses = [json.loads(await asyncio.wait_for(reader.readline(), 5)) for _ in requests]
+        writer.close()
+        await writer.wait_closed()
+    return {response['id']: response for response in responses}
+
+
+@pytest.mark.parametrize('max_pipeline', [1, 8])
+def test_server_answers_pipelined_requests(store, batcher, max_pipeline):
+    service = PosService(store, ReferenceCache(store), ReceiptCache(store.reader()), batcher)
+    server = PosServer(service, workers=2, max_pipeline=max_pipeline)
+    requests = [
+        json.dumps({'id': 1, 'op': 'find_products', 'args': {'keyword': '신라'}}),
+        json.dumps({'id': 2, 'op': 'checkout', 'args': {'store_id': 1, 'employee_id': 1, 'payment_method': 'Card',
+                                                        'lines': [[1, 2]]}}),
+        json.dumps({'id': 3, 'op': 'checkout', 'args': {'store_id': 1, 'employee_id': 1, 'payment_method': 'Card',
+                                                        'lines': [[2, 9]]}}),
+        json.dumps({'id': 4, 'op': 'checkout', 'args': {'store_id': 1, 'employee_id': 1, 'payment_method': 'Card',
+                                                        'lines': [["1", 1]]}}),
+        json.dumps({'id': 5, 'op': 'store_inventory', 'args': {'store_id': 1}}),
+        '{"id": 6, "op": ',
+    ]
+    try:
+        responses = asyncio.run(_round_trip(server, requests))
+    finally:
+        server._executor.shutdown(wait=True)
+
+    assert responses[1]['result'] == [{'product_id': 1, 'name': '신라면', 'price': 1200}]
+    assert responses[2]['ok'] and responses[2]['result']['remaining'] == [{'product_id': 1, 'quantity': 3}]
+    assert responses[3]['error']['type'] == 'stock_shortage'
+    assert responses[3]['error']['shortages'] == [{'product_id': 2, 'quantity': 1, 'requested': 9}]
+    assert responses[4]['ok']  # 문자열 상품 ID 도 정수로 변환
+    assert {row['product_name']: row['quantity'] for row in responses[5]['result']}.keys() == {'신라면', '새우깡'}
+    assert responses[None]['error']['type'] == 'invalid'
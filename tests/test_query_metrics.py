@@ -0,0 +1,38 @@
+from query_metrics import QueryMetrics, track_operation
+
+
+# ========================= 기능 이름 =========================
+def _operations(metrics):
+    return [(entry['operation'], entry['count']) for entry in metrics.snapshot()['statements']]
+
+
+def test_generator_queries_are_attributed_on_each_next():
+    metrics = QueryMetrics(slow_log=None)
+
+    def pages():
+        for _ in range(2):
+            metrics.record('select.stock', 0.001)
+            yield []
+
+    @track_operation()
+    def inventory_pages():
+        return pages()  # 쿼리는 반환 뒤 next() 때 실행
+
+    assert list(inventory_pages()) == [[], []]
+    assert _operations(metrics) == [('inventory_pages', 2)]
+
+
+def test_outer_operation_wins_for_generators():
+    metrics = QueryMetrics(slow_log=None)
+
+    @track_operation()
+    def order_pages():
+        metrics.record('select.order_table', 0.001)
+        yield []
+
+    @track_operation()
+    def get_order_receipt():
+        return next(order_pages())
+
+    get_order_receipt()
+    assert _operations(metrics) == [('get_order_receipt', 1)]
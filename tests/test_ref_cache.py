@@ -0,0 +1,93 @@
+import threading
+from contextlib import contextmanager
+
+import pytest
+from mysql.connector import InterfaceError
+
+from conftest import add_catalog
+from ref_cache import ReferenceCache
+from sale_journal import SaleJournal
+
+
+class _DownPool:
+    """ MySQL 에 연결할 수 없는 상태의 풀 """
+
+    dialect = 'sqlite'
+
+    @contextmanager
+    def connection(self):
+        raise InterfaceError(msg='Can\'t connect to MySQL server')
+        yield
+
+
+class _SlowPool:
+    """ connection() 이 gate 가 열릴 때까지 기다리는 풀 (장애 중 다시 적재가 연결 대기에 묶인 상황) """
+
+    dialect = 'sqlite'
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.gate = threading.Event()
+        self.waiting = threading.Event()
+
+    @contextmanager
+    def connection(self):
+        self.waiting.set()
+        self.gate.wait(5)
+        with self.pool.connection() as conn:
+            yield conn
+
+
+# ========================= 로컬 저널의 사본 =========================
+def test_offline_start_uses_snapshot_saved_in_journal(pool, tmp_path):
+    add_catalog(pool)
+    journal = SaleJournal(str(tmp_path / 'journal.db'))
+    ReferenceCache(pool, backup=journal).preload()
+    journal.close()
+
+    # 다음 실행은 처음부터 MySQL 에 연결할 수 없어도 저널 파일의 사본으로 검색
+    journal = SaleJournal(str(tmp_path / 'journal.db'))
+    cache = ReferenceCache(_DownPool(), backup=journal)
+    cache.preload()
+    assert cache.search('store', '강남') == [(1, 'GS25 강남')]
+    assert cache.search('employee', '', store_id=2) == [(2, '이영희', 2)]
+    assert cache.get('product', 2) == (2, '새우깡', 1500)
+    assert cache.stats()['stale'] == 4
+    journal.close()
+
+
+def test_offline_start_without_snapshot_raises(tmp_path):
+    journal = SaleJournal(str(tmp_path / 'journal.db'))
+    cache = ReferenceCache(_DownPool(), backup=journal)
+    with pytest.raises(InterfaceError):  # 저장한 사본이 없으면 연결 오류를 그대로 올림
+        cache.search('store', '강남')
+    journal.close()
+
+
+# ========================= 잠금 밖 적재 =========================
+def test_search_uses_stale_copy_while_another_thread_reloads(pool):
+    add_catalog(pool)
+    cache = ReferenceCache(pool, ttl=0)
+    cache.preload()
+
+    cache.loader = slow = _SlowPool(pool)
+    reloader = threading.Thread(target=cache.search, args=('product', '라면'))
+    reloader.start()
+    assert slow.waiting.wait(5)
+    assert cache.search('product', '새우') == [(2, '새우깡', 1500)]  # 적재를 기다리지 않고 이전 사본으로 응답
+    assert cache.stats()['stale'] == 1
+    slow.gate.set()
+    reloader.join()
+
+
+def test_reload_after_invalidate_is_not_cached(pool):
+    add_catalog(pool)
+    cache = ReferenceCache(pool)
+    cache.loader = slow = _SlowPool(pool)
+    reloader = threading.Thread(target=cache.search, args=('store', '강남'))
+    reloader.start()
+    assert slow.waiting.wait(5)
+    cache.invalidate('store')  # 적재 중에 데이터가 바뀜
+    slow.gate.set()
+    reloader.join()
+    assert cache.stats()['tables'] == {}
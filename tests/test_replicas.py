@@ -0,0 +1,136 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from mysql.connector import InterfaceError
+
+from replicas import ReplicaRouter, _Replica
+
+
+# ========================= 가짜 서버 =========================
+class FakeServer:
+    """ 복제 상태(SHOW REPLICA STATUS)와 연결 실패만 흉내 내는 풀 (connection() 이 서버 이름을 돌려줌) """
+
+    dialect = 'mysql'
+    metrics = None
+
+    def __init__(self, name, lag=0, down=False):
+        self.name = name
+        self.lag = lag
+        self.down = down
+        self.db_config = {'host': name}
+        self.status_checks = 0
+        self.gate = None  # 설정하면 상태 확인이 이 Event 를 기다림
+
+    @contextmanager
+    def connection(self):
+        if self.down:
+            raise InterfaceError(msg=f"{self.name} 연결 실패")
+        yield FakeConnection(self)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, server):
+        self.server = server
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self.server)
+
+    def __str__(self):
+        return self.server.name
+
+
+class FakeCursor:
+    def __init__(self, server):
+        self.server = server
+
+    def execute(self, query, params=None):
+        self.server.status_checks += 1
+        if self.server.gate is not None:
+            self.server.gate.wait(5)
+
+    def fetchone(self):
+        return {'Seconds_Behind_Source': self.server.lag}
+
+    def fetchall(self):
+        return []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _router(*replicas, max_lag=5.0):
+    router = ReplicaRouter(FakeServer('primary'), [], max_lag=max_lag, check_interval=60.0)
+    router.replicas = [_Replica(server.name, server) for server in replicas]
+    return router
+
+
+def _read(reader):
+    with reader.connection() as conn:
+        return str(conn)
+
+
+# ========================= 라우팅 =========================
+def test_reads_round_robin_over_replicas():
+    router = _router(FakeServer('a'), FakeServer('b'))
+    reader = router.reader()
+    assert [_read(reader) for _ in range(4)] == ['a', 'b', 'a', 'b']
+    assert [item['reads'] for item in router.replica_stats()['replicas']] == [2, 2]
+
+
+def test_failed_replica_is_marked_down_and_skipped():
+    down = FakeServer('a')
+    router = _router(down, FakeServer('b'))
+    reader = router.reader()
+    down.down = True
+    assert [_read(reader) for _ in range(3)] == ['b', 'b', 'b']
+    stats = router.replica_stats()['replicas'][0]
+    assert not stats['healthy'] and '연결 실패' in stats['error']
+
+
+def test_lagging_or_stopped_replicas_fall_back_to_primary():
+    router = _router(FakeServer('a', lag=30), FakeServer('b', lag=None), max_lag=5.0)
+    assert _read(router.reader()) == 'primary'
+    stats = router.replica_stats()
+    assert [item['healthy'] for item in stats['replicas']] == [False, False]
+    assert stats['primary_reads'] == 1
+
+
+def test_read_your_writes_is_pinned_per_terminal(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('replicas.time.monotonic', lambda: now[0])
+    router = _router(FakeServer('a'), max_lag=5.0)
+    writer, other = router.reader(), router.reader()
+
+    writer.note_write()
+    assert _read(writer) == 'primary'
+    assert _read(other) == 'a'  # 다른 단말의 조회는 계속 복제본
+
+    now[0] += 6.0
+    assert _read(writer) == 'a'
+
+
+def test_concurrent_readers_check_a_replica_once():
+    server = FakeServer('a')
+    server.gate = threading.Event()
+    router = _router(server)
+    first = threading.Thread(target=router.read_candidates)
+    first.start()
+    while server.status_checks == 0:
+        time.sleep(0.001)
+
+    # 확인이 끝나지 않은 동안 들어온 조회는 기다리지 않고 마지막 결과 사용
+    others = [threading.Thread(target=router.read_candidates) for _ in range(7)]
+    for thread in others:
+        thread.start()
+    for thread in others:
+        thread.join(1)
+    server.gate.set()
+    first.join()
+    assert server.status_checks == 1
@@ -0,0 +1,105 @@
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+
+from archive import TransactionArchive, archive_month
+from conftest import add_catalog, add_sale
+from sales_cube import SalesCube
+
+TODAY = date(2026, 3, 31)
+
+
+def _cube(pool, archive=None):
+    cube = SalesCube(pool, days=120, overlap=10, archive=archive)
+    cube.build(today=TODAY)
+    return cube
+
+
+# ========================= 증분 반영 =========================
+def test_refresh_adds_only_new_transactions(pool):
+    add_catalog(pool)
+    add_sale(pool, 1, 1, datetime(2026, 3, 1, 10), [(1, 2, 1200)], transaction_id=1)
+    add_sale(pool, 1, 1, datetime(2026, 3, 2, 10), [(2, 1, 1500)], transaction_id=5)
+    cube = _cube(pool)
+    assert cube.query(by='category') == [('라면', 2400), ('과자', 1500)]
+
+    # 먼저 ID 를 받고 늦게 커밋된 거래(ID 3)는 overlap 범위에서 다시 읽고, 이미 반영한 1, 5 는 건너뜀
+    add_sale(pool, 1, 1, datetime(2026, 3, 2, 11), [(1, 1, 1200)], transaction_id=3)
+    add_sale(pool, 2, 2, datetime(2026, 3, 3, 9), [(1, 1, 1200)], transaction_id=6)
+    assert cube.refresh() == 2
+    assert cube.refresh() == 0
+    assert cube.query(by='store') == [(1, 5100), (2, 1200)]
+    assert cube.query(by='day', measure='quantity') == [(date(2026, 3, 1), 2), (date(2026, 3, 2), 2),
+                                                          (date(2026, 3, 3), 1)]
+    assert cube.last_transaction_id == 6
+
+
+def test_refresh_grows_axes_for_new_store_and_category(pool):
+    add_catalog(pool)
+    add_sale(pool, 1, 1, datetime(2026, 3, 1, 10), [(1, 1, 1200)])
+    cube = _cube(pool)
+    assert cube.stats()['stores'] == 2 and cube.stats()['categories'] == 2
+
+    with pool.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("INSERT INTO store (name, location) VALUES ('세븐일레븐 판교', '경기 성남시')")
+            cursor.execute("INSERT INTO product (name, category, price, supplier_id) VALUES ('삼다수', '음료', 900, 1)")
+            cursor.execute("INSERT INTO employee (store_id, name, role, hire_date) VALUES (3, '박민수', 'Cashier', '2026-01-05')")
+        conn.commit()
+    add_sale(pool, 3, 3, datetime(2026, 3, 30, 18), [(3, 2, 900), (1, 1, 1200)])
+
+    assert cube.refresh() == 1
+    assert cube.stats()['stores'] == 3 and cube.stats()['categories'] == 3
+    assert cube.query(by='store') == [(3, 3000), (1, 1200)]
+    assert cube.query(by='category', store_ids=[3]) == [('음료', 1800), ('라면', 1200)]
+    assert cube.query(by='store', location='성남') == [(3, 3000)]
+
+
+class _SlowPool:
+    """ connection() 이 gate 가 열릴 때까지 기다리는 풀 (refresh 의 DB 조회가 오래 걸리는 상황) """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.gate = threading.Event()
+        self.waiting = threading.Event()
+
+    @contextmanager
+    def connection(self):
+        self.waiting.set()
+        self.gate.wait(5)
+        with self.pool.connection() as conn:
+            yield conn
+
+
+def test_query_does_not_wait_for_refresh_db_read(pool):
+    add_catalog(pool)
+    add_sale(pool, 1, 1, datetime(2026, 3, 1, 10), [(1, 1, 1200)])
+    cube = _cube(pool)
+    add_sale(pool, 1, 1, datetime(2026, 3, 2, 10), [(1, 1, 1200)])
+
+    cube.pool = slow = _SlowPool(pool)
+    refresher = threading.Thread(target=cube.refresh)
+    refresher.start()
+    assert slow.waiting.wait(5)
+    assert cube.query(by='store') == [(1, 1200)]  # 조회 중에는 이전 큐브로 바로 응답
+    slow.gate.set()
+    refresher.join()
+    assert cube.query(by='store') == [(1, 2400)]
+
+
+# ========================= 보관 파일 =========================
+def test_archive_and_hot_rows_are_counted_once(pool, tmp_path):
+    add_catalog(pool)
+    add_sale(pool, 1, 1, datetime(2026, 1, 10, 10), [(1, 2, 1200)])
+    add_sale(pool, 2, 2, datetime(2026, 1, 20, 10), [(2, 1, 1500)])
+    add_sale(pool, 1, 1, datetime(2026, 3, 5, 10), [(2, 2, 1500)])
+    expected = _cube(pool).query(by='month')
+    assert expected == [(date(2026, 1, 1), 3900), (date(2026, 3, 1), 3000)]
+
+    archive = TransactionArchive(str(tmp_path))
+    assert archive_month(pool, archive, date(2026, 1, 1)) == (2, 2)
+    assert _cube(pool, archive).query(by='month') == expected
+
+    # 보관한 달에 늦게 들어온 거래는 운영 테이블에서 한 번만 집계
+    add_sale(pool, 1, 1, datetime(2026, 1, 31, 23), [(1, 1, 1200)])
+    assert _cube(pool, archive).query(by='month') == [(date(2026, 1, 1), 5100), (date(2026, 3, 1), 3000)]
@@ -0,0 +1,29 @@
+from search_index import NgramIndex
+
+
+# ========================= n-gram 색인 =========================
+def _index():
+    index = NgramIndex()
+    for key, name in [(3, '농심 신라면'), (1, 'GS25 강남'), (2, '짜파게티'), (4, '신라면 블랙')]:
+        index.add(key, name)
+    return index
+
+
+def test_ranking_and_limit():
+    index = _index()
+    assert index.search('신라면') == [4, 3]  # 앞부분 일치가 먼저
+    assert index.search('gs') == [1]          # 대소문자 무시
+    assert index.search('라면', limit=1) == [4]
+
+
+def test_empty_keyword_uses_sorted_keys():
+    index = _index()
+    assert index.search('', limit=2) == [1, 2]
+    assert index.search('', accept=lambda key: key % 2 == 0) == [2, 4]
+
+    index.remove(1)
+    index.add(2, '너구리')  # 이름 변경
+    index.add(0, '진라면')
+    assert index.keys == [0, 2, 3, 4]
+    assert index.search('') == [0, 2, 3, 4]
+    assert index.search('짜파') == []
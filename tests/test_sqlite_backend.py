@@ -0,0 +1,206 @@
+import pytest
+from mysql.connector import Error
+
+import bulk_import
+from bulk_import import import_csv
+from cvs import StockShortageError, apply_deliveries, checkout
+from migrate import MIGRATIONS, applied_versions, migrate
+from receipts import fetch_transaction_receipt
+from ref_cache import ReferenceCache
+from sqlite_backend import SQLitePool, translate, translate_schema
+
+
+# ========================= 방언 변환 =========================
+def test_update_join_reorders_bind_params():
+    translated = translate(
+        "UPDATE stock s JOIN order_details d ON s.product_id = d.product_id AND d.order_id = %s "
+        "SET s.quantity = s.quantity + d.quantity * %s WHERE s.store_id = %s"
+    )
+    assert translated.statements == (
+        "UPDATE stock AS s SET quantity = s.quantity + d.quantity * ? FROM order_details AS d "
+        "WHERE (s.product_id = d.product_id AND d.order_id = ?) AND (s.store_id = ?)",
+    )
+    # SET 의 파라미터(원래 두 번째)가 FROM/WHERE 의 파라미터보다 앞으로
+    assert translated.order == [1, 0, 2]
+    assert translated.write
+
+
+def test_update_join_executes_with_reordered_params():
+    pool = SQLitePool(':memory:')
+    try:
+        with pool.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("CREATE TABLE stock (store_id INT, product_id INT, quantity INT)")
+                cursor.execute("CREATE TABLE order_details (order_id INT, product_id INT, quantity INT)")
+                cursor.executemany("INSERT INTO stock VALUES (%s, %s, %s)", [(1, 10, 5), (2, 10, 5), (1, 20, 5)])
+                cursor.executemany("INSERT INTO order_details VALUES (%s, %s, %s)", [(7, 10, 3), (8, 20, 4)])
+                cursor.execute(
+                    "UPDATE stock s JOIN order_details d ON s.product_id = d.product_id AND d.order_id = %s "
+                    "SET s.quantity = s.quantity + d.quantity * %s WHERE s.store_id = %s",
+                    (7, 2, 1),
+                )
+                cursor.execute("SELECT store_id, product_id, quantity FROM stock ORDER BY store_id, product_id")
+                assert cursor.fetchall() == [(1, 10, 11), (1, 20, 5), (2, 10, 5)]
+            conn.commit()
+    finally:
+        pool.close()
+
+
+def test_on_duplicate_key_update():
+    translated = translate("INSERT INTO t (a, b) VALUES (%s, %s) ON DUPLICATE KEY UPDATE b = b + VALUES(b)")
+    assert translated.statements == ("INSERT INTO t (a, b) VALUES (?, ?) ON CONFLICT DO UPDATE SET b = b + excluded.b",)
+    assert translated.order is None
+
+
+def test_for_update_is_stripped_and_takes_write_lock():
+    for suffix in ("FOR UPDATE", "FOR UPDATE SKIP LOCKED"):
+        translated = translate(f"SELECT quantity FROM stock WHERE store_id = %s {suffix}")
+        assert translated.statements == ("SELECT quantity FROM stock WHERE store_id = ?",)
+        assert translated.write
+    assert not translate("SELECT quantity FROM stock WHERE store_id = %s").write
+
+
+def test_transaction_table_is_quoted():
+    translated = translate("SELECT t.transaction_id FROM transaction t WHERE t.transaction_id = %s")
+    assert translated.statements == ('SELECT t.transaction_id FROM "transaction" t WHERE t.transaction_id = ?',)
+
+
+def test_foreign_keys_get_indexes():
+    statements = translate_schema([
+        "CREATE TABLE parent (id INT AUTO_INCREMENT, PRIMARY KEY (id))",
+        "CREATE TABLE child (id INT AUTO_INCREMENT, parent_id INT, other_id INT, PRIMARY KEY (id), "
+        "INDEX idx_child_other (other_id, id), "
+        "FOREIGN KEY (parent_id) REFERENCES parent(id), FOREIGN KEY (other_id) REFERENCES parent(id))",
+    ])
+    assert "CREATE INDEX IF NOT EXISTS idx_child_parent_id ON child (parent_id)" in statements
+    # 같은 컬럼으로 시작하는 인덱스가 이미 있으면 추가하지 않음
+    assert not any('idx_child_other_id' in statement for statement in statements)
+
+
+# ========================= 마이그레이션 + 결제 =========================
+def _seed(pool, quantity):
+    with pool.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("INSERT INTO store (name, location) VALUES ('GS25 강남', '서울')")
+            cursor.execute("INSERT INTO supplier (name) VALUES ('농심')")
+            cursor.execute("INSERT INTO product (name, category, price, supplier_id) VALUES ('신라면', '라면', 1200, 1)")
+            cursor.execute("INSERT INTO employee (store_id, name, role, hire_date) VALUES (1, '김철수', 'Cashier', '2025-01-02')")
+            cursor.execute("INSERT INTO stock (store_id, product_id, quantity) VALUES (1, 1, %s)", (quantity,))
+        conn.commit()
+
+
+def test_migrate_applies_every_version(pool):
+    assert [row[0] for row in applied_versions(pool)] == [version for version, _, _ in MIGRATIONS]
+    # 다시 실행해도 적용할 버전이 없음
+    assert migrate(pool, log=lambda message: None) == []
+
+
+def test_receipt_lookup_uses_foreign_key_index(pool):
+    with pool.connection() as conn, conn.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN SELECT * FROM transaction_details WHERE transaction_id = %s", (1,))
+        plan = ' '.join(row[-1] for row in cursor.fetchall())
+    assert 'USING INDEX' in plan.upper()
+
+
+def test_checkout_round_trip(pool):
+    _seed(pool, quantity=5)
+    transaction_id, remaining = checkout(pool, 1, 1, 'Card', [(1, 2), (1, 1)])
+    assert remaining == {1: 2}
+
+    receipt = fetch_transaction_receipt(pool, transaction_id)
+    assert receipt['total_amount'] == 3600
+    assert receipt['lines'] == [(1, '신라면', 3, 1200, 3600)]
+
+    with pytest.raises(StockShortageError) as error:
+        checkout(pool, 1, 1, 'Cash', [(1, 3)])
+    assert error.value.shortages == [(1, 2, 3)]
+
+    with pool.connection() as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT quantity FROM stock WHERE store_id = 1 AND product_id = 1")
+        assert cursor.fetchone() == (2,)
+        cursor.execute("SELECT total_sales, total_quantity FROM employee_sales_monthly WHERE employee_id = 1")
+        assert cursor.fetchone() == (3600, 3)
+
+
+def test_bulk_import_refreshes_reference_cache(pool, tmp_path):
+    _seed(pool, quantity=5)
+    cache = ReferenceCache(pool)
+    assert [row[1] for row in cache.search('product', '라면')] == ['신라면']
+
+    path = tmp_path / 'product.csv'
+    path.write_text("name,category,price,supplier_name\n짜파게티,라면,1300,농심\n", encoding='utf-8')
+    result = import_csv(pool, 'product', str(path), cache=cache)
+    assert result['loaded'] == 1
+
+    # ttl 이 지나지 않았어도 적재한 상품이 바로 검색됨
+    assert [row[1] for row in cache.search('product', '짜파')] == ['짜파게티']
+    assert cache.stats()['misses'] == 1
+
+
+def test_unique_stock_migration_merges_duplicates(pool):
+    _seed(pool, quantity=5)
+    with pool.connection() as conn:
+        with conn.cursor() as cursor:
+            # 유일 인덱스 이전 DB: 같은 (매장, 상품)의 재고 행이 두 개
+            cursor.execute("DROP INDEX idx_stock_store_product")
+            cursor.execute("CREATE INDEX idx_stock_store_product ON stock (store_id, product_id)")
+            cursor.execute("INSERT INTO stock (store_id, product_id, quantity) VALUES (1, 1, 3)")
+            cursor.execute("DELETE FROM schema_version WHERE version = 7")
+        conn.commit()
+
+    assert migrate(pool, log=lambda message: None) == [7]
+    with pool.connection() as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT stock_id, quantity FROM stock")
+        assert cursor.fetchall() == [(1, 8)]
+        cursor.execute("SELECT \"unique\" FROM pragma_index_list('stock') WHERE name = 'idx_stock_store_product'")
+        assert cursor.fetchone() == (1,)
+
+
+def test_apply_deliveries_upserts_stock(pool):
+    _seed(pool, quantity=5)
+    with pool.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("INSERT INTO product (name, category, price, supplier_id) VALUES ('짜파게티', '라면', 1300, 1)")
+            cursor.execute("INSERT INTO order_table (store_id, supplier_id, status) VALUES (1, 1, 'Delivered')")
+            cursor.executemany("INSERT INTO order_details (order_id, product_id, quantity) VALUES (1, %s, %s)",
+                               [(1, 4), (2, 6)])
+        conn.commit()
+
+    assert apply_deliveries(pool) == (1, 2)
+    assert apply_deliveries(pool) == (0, 0)
+    with pool.connection() as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT product_id, quantity FROM stock ORDER BY product_id")
+        assert cursor.fetchall() == [(1, 9), (2, 6)]
+
+
+def test_bulk_import_rejects_duplicate_stock_rows_once(pool, tmp_path, monkeypatch):
+    _seed(pool, quantity=5)
+    with pool.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM stock")
+        conn.commit()
+
+    path = tmp_path / 'stock.csv'
+    path.write_text("store_id,product_id,quantity\n1,1,4\n1,1,9\n1,1,-1\n", encoding='utf-8')
+    rejects = tmp_path / 'rejects.csv'
+
+    # 배치 커밋 전에 중단되면 거부 행도 기록하지 않음
+    def fail(*args):
+        raise Error(msg="중단")
+    with monkeypatch.context() as patch:
+        patch.setattr(bulk_import, '_save_checkpoint', fail)
+        with pytest.raises(Error):
+            import_csv(pool, 'stock', str(path), reject_path=str(rejects))
+    assert rejects.read_text(encoding='utf-8') == ''
+
+    result = import_csv(pool, 'stock', str(path), reject_path=str(rejects))
+    assert (result['loaded'], result['rejected']) == (1, 2)
+    assert [line.split(',')[0] for line in rejects.read_text(encoding='utf-8').splitlines()] == ['3', '4']
+
+    # 다시 실행하면 체크포인트 이후 줄이 없으므로 거부 행을 다시 기록하지 않음
+    result = import_csv(pool, 'stock', str(path), reject_path=str(rejects))
+    assert (result['loaded'], result['rejected'], result['skipped']) == (0, 0, 3)
+    assert len(rejects.read_text(encoding='utf-8').splitlines()) == 2
+    with pool.connection() as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT quantity FROM stock")
+        assert cursor.fetchall() == [(4,)]